@@ -0,0 +1,71 @@
+"""
+JWT authentication with a short-lived user cache.
+
+Access tokens carry a token-version claim (``tv``) taken from
+UserSessionStatus.token_version when they are issued. Authenticated
+users are cached under ``(user id, token version)`` for
+AUTH_USER_CACHE_TTL seconds, so most requests don't touch the user table.
+
+``revoke_tokens`` bumps the stored version, which invalidates every token
+issued before it and, with it, every cache entry; other processes drop
+their stale entries within the TTL. It runs on logout, password changes
+and deactivation. Refresh tokens carry the same claim and
+/api/auth/refresh/ refuses stale ones (VersionedTokenRefreshSerializer).
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import F
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import UserSessionStatus
+
+TOKEN_VERSION_CLAIM = "tv"
+
+
+def user_cache_key(user_id, version):
+    return f"auth:user:{user_id}:{version}"
+
+
+def token_version(user):
+    return UserSessionStatus.objects.filter(user=user).values_list("token_version", flat=True).first() or 0
+
+
+def revoke_tokens(user):
+    """Invalidate every token issued to ``user`` so far."""
+    version = token_version(user)
+    updated = UserSessionStatus.objects.filter(user=user).update(token_version=F("token_version") + 1)
+    if not updated:
+        UserSessionStatus.objects.create(user=user, token_version=1)
+    cache.delete(user_cache_key(user.pk, version))
+
+
+def forget_user(user):
+    """Drop this process's cached copy of ``user`` without revoking tokens."""
+    cache.delete(user_cache_key(user.pk, token_version(user)))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+        version = validated_token.get(TOKEN_VERSION_CLAIM, 0)
+
+        key = user_cache_key(user_id, version)
+        user = cache.get(key)
+        if user is None:
+            try:
+                user = User.objects.select_related("session_status").get(pk=user_id)
+            except User.DoesNotExist:
+                raise AuthenticationFailed("User not found", code="user_not_found")
+            status = getattr(user, "session_status", None)
+            if (status.token_version if status else 0) != version:
+                raise AuthenticationFailed("Token revocado", code="token_revoked")
+            if not user.is_active:
+                raise AuthenticationFailed("User is inactive", code="user_inactive")
+            cache.set(key, user, settings.AUTH_USER_CACHE_TTL)
+        return user
@@ -0,0 +1,169 @@
+"""
+Side effects of a successful token login: session status and login
+notifications.
+
+Everything critical runs in one transaction with a handful of queries.
+With LOGIN_DEFER_NOTIFICATIONS (or the "login_defer_notifications" flag,
+which overrides it at runtime) the informational "login successful"
+notification is queued and a background thread writes the queue in
+batches, one transaction per batch, so token issuance isn't slowed down
+by it; the concurrent-login alert is always written inline. The queue is
+bounded (a full queue is written inline) and drained at exit, like the
+audit buffer.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connections, router, transaction
+from django.utils import timezone
+
+from apps.core.flags import get_flag
+from apps.core.versions import bump
+from .models import SecurityNotification, UserSessionStatus
+from .notifications import notify_many
+from .serializers import invalidate_me
+
+logger = logging.getLogger(__name__)
+
+
+def record_login(user, ip):
+    with transaction.atomic():
+        previous = UserSessionStatus.objects.filter(user=user).values_list("is_logged_in", "last_ip").first()
+        if previous is None:
+            UserSessionStatus.objects.create(user=user, is_logged_in=True, last_ip=ip)
+        else:
+            UserSessionStatus.objects.filter(user=user).update(
+                is_logged_in=True, last_ip=ip, last_login_at=timezone.now()
+            )
+
+        critical = []
+        if previous is not None and previous[0]:
+            critical.append(dict(
+                title="Intento de Inicio de Sesión Concurrente",
+                message=f"Se ha detectado un inicio de sesión desde IP: {ip} mientras existía una sesión activa (Última IP: {previous[1]}).",
+                alert_type="CONCURRENT_LOGIN",
+                ip_address=ip,
+            ))
+        informational = [dict(
+            title="Inicio de Sesión Exitoso",
+            message=f"Se ha iniciado sesión existosamente desde IP: {ip}",
+            alert_type="LOGIN_SUCCESS",
+            ip_address=ip,
+        )]
+
+        if get_flag("login_defer_notifications", getattr(settings, "LOGIN_DEFER_NOTIFICATIONS", False)):
+            notify_many(user, critical)
+            transaction.on_commit(lambda: defer_notifications(user, informational))
+        else:
+            notify_many(user, critical + informational)
+
+    # The session status update above bypasses post_save
+    bump("users")
+    invalidate_me(user.pk)
+
+
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.5
+# Logins queued before callers write their notifications inline instead
+MAX_QUEUE = 10000
+
+_queue = queue.Queue(maxsize=MAX_QUEUE)
+_stop = threading.Event()
+_worker = None
+_worker_pid = None
+_worker_lock = threading.Lock()
+
+
+def defer_notifications(user, items):
+    """Queue notifications for the background writer, which commits them in batches."""
+    global _queue, _worker, _worker_pid
+    with _worker_lock:
+        if _worker_pid != os.getpid() or _worker is None or not _worker.is_alive():
+            if _worker_pid is None:
+                atexit.register(shutdown)
+            if _worker_pid != os.getpid():
+                _queue = queue.Queue(maxsize=MAX_QUEUE)
+            _worker = threading.Thread(target=_run, name="login-notifications", daemon=True)
+            _worker.start()
+            _worker_pid = os.getpid()
+    try:
+        _queue.put_nowait((user, items))
+    except queue.Full:
+        # The writer can't keep up: don't lose the notification, write it here
+        _write([(user, items)])
+
+
+def wait_deferred():
+    """Block until every deferred notification has been written (tests, benchmarks)."""
+    _queue.join()
+
+
+def shutdown():
+    """Stop the writer and write whatever is still queued (registered with atexit)."""
+    _stop.set()
+    if _worker is not None and _worker.is_alive():
+        _worker.join(timeout=FLUSH_INTERVAL + 5)
+    batch = _drain(block=False)
+    while batch:
+        _write_queued(batch)
+        batch = _drain(block=False)
+
+
+def _drain(block):
+    batch = []
+    # Collect for up to FLUSH_INTERVAL so bursts share one transaction
+    deadline = time.monotonic() + FLUSH_INTERVAL
+    while len(batch) < BATCH_SIZE:
+        try:
+            if block:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                batch.append(_queue.get(timeout=timeout))
+            else:
+                batch.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+def _write(batch):
+    """
+    One transaction per batch on the notifications database, one savepoint
+    per login, so a failing user doesn't discard the others.
+    """
+    using = router.db_for_write(SecurityNotification)
+    try:
+        with transaction.atomic(using=using):
+            for user, items in batch:
+                try:
+                    with transaction.atomic(using=using):
+                        notify_many(user, items)
+                except Exception:
+                    logger.exception("Could not write deferred login notifications for user %s", user.pk)
+    except Exception:
+        logger.exception("Could not write %d deferred login notifications", len(batch))
+
+
+def _write_queued(batch):
+    try:
+        _write(batch)
+    finally:
+        for _ in batch:
+            _queue.task_done()
+
+
+def _run():
+    try:
+        while not _stop.is_set():
+            batch = _drain(block=True)
+            if batch:
+                _write_queued(batch)
+                close_old_connections()
+    finally:
+        connections.close_all()
@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+from apps.accounts.login import wait_deferred
+from apps.accounts.models import UserSessionStatus
+
+PASSWORD = "bench-login-password"
+
+
+class Command(BaseCommand):
+    help = "Measure token issuance throughput (tokens/sec) of /api/auth/token/ on a throwaway test database"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=500)
+        parser.add_argument("--defer", action="store_true",
+                            help="Run with LOGIN_DEFER_NOTIFICATIONS enabled")
+        parser.add_argument("--real-hasher", action="store_true",
+                            help="Keep the configured password hasher (default: MD5, so hashing doesn't hide the pipeline cost)")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        # A file (not in-memory) database so deferred writes from other threads behave as in production
+        tmpdir = tempfile.mkdtemp()
+        connection.settings_dict["TEST"]["NAME"] = os.path.join(tmpdir, "bench_login.sqlite3")
+        if connection.vendor == "sqlite":
+            # Writers from the deferred thread would otherwise hit SQLite's
+            # lock-upgrade deadlock instead of waiting for the busy timeout
+            connection.settings_dict["OPTIONS"].setdefault("transaction_mode", "IMMEDIATE")
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            overrides = {"LOGIN_DEFER_NOTIFICATIONS": options["defer"],
+                         "AUDIT_BUFFER": {"ENABLED": False}}
+            if not options["real_hasher"]:
+                overrides["PASSWORD_HASHERS"] = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+            with override_settings(**overrides):
+                self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            shutil.rmtree(tmpdir, ignore_errors=True)
+            teardown_test_environment()
+
+    def run(self, options):
+        n = options["logins"]
+        usernames = [f"bench{i}" for i in range(n)]
+        for username in usernames:
+            User.objects.create_user(username, password=PASSWORD)
+
+        client = Client()
+        # Warm-up: first logins create per-user rows (session status, read
+        # state); then log everyone out so the timed logins are the common
+        # case, not concurrent-login alerts.
+        for username in usernames:
+            client.post("/api/auth/token/", {"username": username, "password": PASSWORD})
+        wait_deferred()
+        UserSessionStatus.objects.update(is_logged_in=False)
+
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            for i in range(n):
+                response = client.post("/api/auth/token/", {"username": usernames[i], "password": PASSWORD})
+                if response.status_code != 200:
+                    self.stderr.write(f"login failed: {response.status_code} {response.content[:200]}")
+                    return
+            elapsed = time.perf_counter() - start
+        wait_deferred()
+        if options["verbosity"] > 1:
+            for query in queries.captured_queries[-(len(queries) // n):]:
+                self.stdout.write(query["sql"][:160])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{n} logins in {elapsed:.2f}s: {n / elapsed:.1f} tokens/sec, "
+            f"{len(queries) / n:.1f} queries/login"
+            + (" (notifications deferred)" if options["defer"] else "")
+        ))
@@ -0,0 +1,46 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Max
+from apps.accounts.models import BroadcastNotification, NotificationReadState, SecurityNotification
+from apps.accounts.notifications import unread_broadcasts
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized unread notification counters and repair drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report drifted counters")
+
+    def handle(self, *args, **options):
+        personal = dict(
+            SecurityNotification.objects.filter(is_read=False)
+            .values_list("user_id")
+            .annotate(n=Count("id"))
+        )
+        latest = BroadcastNotification.objects.aggregate(latest=Max("id"))["latest"] or 0
+        states = list(NotificationReadState.objects.all())
+        # By id rather than a join: the notification tables may live in their own database
+        users = User.objects.in_bulk([state.user_id for state in states])
+
+        drifted = 0
+        for state in states:
+            user = users[state.user_id]
+            expected_personal = personal.get(state.user_id, 0)
+            expected_broadcasts = unread_broadcasts(user, state).filter(id__lte=latest).count()
+            if (state.unread_personal == expected_personal
+                    and state.unread_broadcasts == expected_broadcasts
+                    and state.broadcast_counted_until >= latest):
+                continue
+            drifted += 1
+            self.stdout.write(
+                f"{user.username}: personal {state.unread_personal} -> {expected_personal}, "
+                f"broadcast {state.unread_broadcasts} -> {expected_broadcasts}"
+            )
+            if not options["dry_run"]:
+                NotificationReadState.objects.filter(pk=state.pk).update(
+                    unread_personal=expected_personal,
+                    unread_broadcasts=expected_broadcasts,
+                    broadcast_counted_until=max(latest, state.broadcast_counted_until),
+                )
+
+        verb = "Found" if options["dry_run"] else "Repaired"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {drifted} drifted counters"))
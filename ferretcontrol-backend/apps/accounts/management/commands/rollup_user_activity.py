@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.accounts.stats import hour_bucket, record_rollup, user_counts
+
+class Command(BaseCommand):
+    help = "Record the current hour's active/inactive user counts (run hourly)"
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        rollup = record_rollup(hour_bucket(now), user_counts(now))
+        self.stdout.write(self.style.SUCCESS(
+            f"{rollup.hour:%Y-%m-%d %H:00}: {rollup.total_users} users, "
+            f"{rollup.active_users} active, {rollup.inactive_users} inactive"
+        ))
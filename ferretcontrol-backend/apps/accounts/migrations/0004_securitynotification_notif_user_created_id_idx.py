@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0003_passwordresetcode"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="securitynotification",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"], name="notif_user_created_id_idx"
+            ),
+        ),
+    ]
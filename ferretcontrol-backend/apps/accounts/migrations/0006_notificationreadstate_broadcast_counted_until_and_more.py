@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:37
+
+from django.db import migrations, models
+
+
+def init_unread_personal(apps, schema_editor):
+    # Broadcast counters catch up lazily from broadcast_counted_until=0.
+    NotificationReadState = apps.get_model("accounts", "NotificationReadState")
+    SecurityNotification = apps.get_model("accounts", "SecurityNotification")
+    for state in NotificationReadState.objects.all():
+        state.unread_personal = SecurityNotification.objects.filter(
+            user_id=state.user_id, is_read=False
+        ).count()
+        state.save(update_fields=["unread_personal"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0005_broadcastnotification_broadcastreceipt_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notificationreadstate",
+            name="broadcast_counted_until",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="notificationreadstate",
+            name="unread_broadcasts",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="notificationreadstate",
+            name="unread_personal",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(init_unread_personal, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0006_notificationreadstate_broadcast_counted_until_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="usersessionstatus",
+            name="token_version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0007_usersessionstatus_token_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserActivityRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("hour", models.DateTimeField(unique=True)),
+                ("total_users", models.PositiveIntegerField(default=0)),
+                ("active_users", models.PositiveIntegerField(default=0)),
+                ("inactive_users", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["hour"],
+            },
+        ),
+    ]
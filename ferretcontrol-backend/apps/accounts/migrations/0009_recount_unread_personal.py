@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:20
+
+from django.db import migrations
+
+
+def recount_unread_personal(apps, schema_editor):
+    # Runs only on the database holding the notification tables (see the
+    # hints below), so it also fills the counters when they live in
+    # their own file.
+    db_alias = schema_editor.connection.alias
+    NotificationReadState = apps.get_model("accounts", "NotificationReadState")
+    SecurityNotification = apps.get_model("accounts", "SecurityNotification")
+    for state in NotificationReadState.objects.using(db_alias):
+        unread = (
+            SecurityNotification.objects.using(db_alias)
+            .filter(user_id=state.user_id, is_read=False)
+            .count()
+        )
+        if unread != state.unread_personal:
+            state.unread_personal = unread
+            state.save(update_fields=["unread_personal"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0008_useractivityrollup"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            recount_unread_personal,
+            migrations.RunPython.noop,
+            hints={"model_name": "notificationreadstate"},
+        ),
+    ]
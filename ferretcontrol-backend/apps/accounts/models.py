@@ -6,6 +6,8 @@ class UserSessionStatus(models.Model):
     is_logged_in = models.BooleanField(default=False)
     last_ip = models.GenericIPAddressField(null=True, blank=True)
     last_login_at = models.DateTimeField(auto_now=True)
+    # Stamped into issued tokens; bumping it revokes them (see authentication.py)
+    token_version = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return f"{self.user.username} - {'Online' if self.is_logged_in else 'Offline'}"
@@ -25,9 +27,61 @@ class SecurityNotification(models.Model):
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of a user's inbox: ORDER BY created_at DESC, id DESC
+            models.Index(fields=["user", "-created_at", "-id"], name="notif_user_created_id_idx"),
+        ]
+
     def __str__(self):
         return f"{self.user.username}: {self.title}"
 
+class BroadcastNotification(models.Model):
+    """
+    One row per event shown to every user (e.g. a forum post), instead of
+    one SecurityNotification per recipient. Read state lives in
+    NotificationReadState (watermark) and BroadcastReceipt.
+    """
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    alert_type = models.CharField(max_length=50, choices=SecurityNotification.ALERT_TYPES)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='broadcasts')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="broadcast_created_id_idx"),
+        ]
+
+    def __str__(self):
+        return self.title
+
+class NotificationReadState(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='notification_state')
+    # Every broadcast with id <= this value is read (advanced by mark_all_read)
+    broadcast_read_until = models.BigIntegerField(default=0)
+
+    # Denormalized unread counters (see apps.accounts.notifications)
+    unread_personal = models.PositiveIntegerField(default=0)
+    unread_broadcasts = models.PositiveIntegerField(default=0)
+    # Broadcasts with id <= this value are already included in unread_broadcasts
+    broadcast_counted_until = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user.username} <= {self.broadcast_read_until}"
+
+class BroadcastReceipt(models.Model):
+    """A broadcast above the user's watermark that was marked read individually."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='broadcast_receipts')
+    broadcast = models.ForeignKey(BroadcastNotification, on_delete=models.CASCADE, related_name='receipts')
+    read_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('user', 'broadcast')
+
+    def __str__(self):
+        return f"{self.user.username}: {self.broadcast_id}"
+
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     display_name = models.CharField(max_length=100, blank=True)
@@ -47,3 +101,18 @@ class PasswordResetCode(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.code}"
 
+
+
+class UserActivityRollup(models.Model):
+    """Hourly snapshot of the access-control user counts (see apps.accounts.stats)."""
+    hour = models.DateTimeField(unique=True)
+    total_users = models.PositiveIntegerField(default=0)
+    active_users = models.PositiveIntegerField(default=0)
+    inactive_users = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["hour"]
+
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H:00} {self.active_users}/{self.total_users}"
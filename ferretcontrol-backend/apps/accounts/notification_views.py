@@ -1,13 +1,19 @@
 from rest_framework import viewsets, mixins
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from .models import SecurityNotification
-from .serializers import SecurityNotificationSerializer
+from .models import SecurityNotification, BroadcastNotification
+from . import notifications
+from .notifications import NotificationFeedPagination
+from .serializers import SecurityNotificationSerializer, BroadcastNotificationSerializer
+from apps.core.conditional import ConditionalGetMixin
 
-class SecurityNotificationViewSet(viewsets.ReadOnlyModelViewSet):
+class SecurityNotificationViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = SecurityNotificationSerializer
+    etag_collections = ("notifications",)
+    pagination_class = NotificationFeedPagination
 
     def get_queryset(self):
         # Admin sees all? Or user sees only theirs? 
@@ -15,21 +21,48 @@ class SecurityNotificationViewSet(viewsets.ReadOnlyModelViewSet):
         # Assuming for now user sees their own notifications, enforcing privacy. 
         # Or if admin, sees high priority alerts? 
         # Let's start with: Users see their own notifications.
-        return SecurityNotification.objects.filter(user=self.request.user).order_by('-created_at')
+        return SecurityNotification.objects.filter(user=self.request.user).order_by('-created_at', '-id')
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(self.list_feed, request, *args, **kwargs)
+
+    def list_feed(self, request, *args, **kwargs):
+        # Personal notifications merged with forum/system broadcasts
+        user = request.user
+        page = self.paginator.paginate_feed([self.get_queryset(), notifications.visible_broadcasts(user)], request)
+
+        broadcasts = [n for n in page if isinstance(n, BroadcastNotification)]
+        context = self.get_serializer_context()
+        if broadcasts:
+            context['read_broadcasts'] = notifications.read_broadcast_ids(user, notifications.get_read_state(user), broadcasts)
+
+        data = []
+        for notification in page:
+            if isinstance(notification, BroadcastNotification):
+                data.append(BroadcastNotificationSerializer(notification, context=context).data)
+            else:
+                data.append(SecurityNotificationSerializer(notification, context=context).data)
+        return self.paginator.get_paginated_response(data)
 
     @action(detail=False, methods=['get'])
     def unread_count(self, request):
-        count = self.get_queryset().filter(is_read=False).count()
-        return Response({"count": count})
+        return Response({"count": notifications.unread_count(request.user)})
 
     @action(detail=False, methods=['post'])
     def mark_all_read(self, request):
-        self.get_queryset().filter(is_read=False).update(is_read=True)
+        notifications.mark_all_read(request.user)
         return Response({"status": "marked as read"})
 
     @action(detail=True, methods=['post'])
     def mark_read(self, request, pk=None):
+        if pk.startswith(BroadcastNotificationSerializer.ID_PREFIX):
+            try:
+                broadcast = notifications.visible_broadcasts(request.user).get(pk=int(pk[1:]))
+            except (ValueError, BroadcastNotification.DoesNotExist):
+                raise NotFound()
+            notifications.mark_broadcast_read(request.user, broadcast)
+            return Response({"status": "marked as read"})
+
         notification = self.get_object()
-        notification.is_read = True
-        notification.save()
+        notifications.mark_personal_read(request.user, notification.pk)
         return Response({"status": "marked as read"})
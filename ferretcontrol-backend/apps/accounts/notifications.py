@@ -0,0 +1,246 @@
+"""
+Notification feed: personal SecurityNotification rows merged with
+BroadcastNotification rows (fan-out on read).
+
+A broadcast is visible to every user who joined before it was sent,
+except its author. It counts as read when its id is at or below the
+user's ``broadcast_read_until`` watermark or a BroadcastReceipt exists.
+
+Unread totals are denormalized on NotificationReadState: personal
+notifications bump ``unread_personal`` when created through ``notify``,
+and ``unread_broadcasts`` catches up lazily by counting only the
+broadcasts above ``broadcast_counted_until``. The bell's unread count is
+therefore a primary-key lookup plus a cache read of the latest broadcast
+id. ``manage.py reconcile_notification_counters`` repairs any drift.
+"""
+from django.core.cache import cache
+from django.db import router, transaction
+from django.db.models import F, Max, Q
+from django.db.models.functions import Greatest
+from rest_framework.utils.urls import replace_query_param
+
+from apps.core.events import notification_event_data, publish_on_commit
+from apps.core.pagination import KeysetPagination, encode_position
+from apps.core.versions import bump
+from .models import BroadcastNotification, BroadcastReceipt, NotificationReadState, SecurityNotification
+
+# Feed sources, in tie-break order for rows with the same created_at
+PERSONAL, BROADCAST = 0, 1
+
+
+def _db():
+    """Alias of the notification tables (their own file in settings_production)."""
+    return router.db_for_write(SecurityNotification)
+
+
+def visible_broadcasts(user):
+    return BroadcastNotification.objects.filter(created_at__gte=user.date_joined).exclude(created_by=user)
+
+
+LATEST_BROADCAST_KEY = "notifications:latest_broadcast_id"
+# Other worker processes notice a new broadcast at most this late
+LATEST_BROADCAST_TTL = 10
+
+
+def latest_broadcast_id():
+    latest = cache.get(LATEST_BROADCAST_KEY)
+    if latest is None:
+        latest = BroadcastNotification.objects.aggregate(latest=Max("id"))["latest"] or 0
+        cache.set(LATEST_BROADCAST_KEY, latest, LATEST_BROADCAST_TTL)
+    return latest
+
+
+def get_read_state(user):
+    try:
+        return NotificationReadState.objects.get(user=user)
+    except NotificationReadState.DoesNotExist:
+        unread = SecurityNotification.objects.filter(user=user, is_read=False).count()
+        state, _ = NotificationReadState.objects.get_or_create(user=user, defaults={"unread_personal": unread})
+        return state
+
+
+def notify(user, **fields):
+    """Create a personal notification and bump the user's unread counter."""
+    return notify_many(user, [fields])[0]
+
+
+def notify_many(user, items):
+    """
+    Create several personal notifications with one INSERT and one counter
+    UPDATE. bulk_create sends no post_save, so the collection version and
+    stream events are handled here.
+    """
+    if not items:
+        return []
+    using = _db()
+    with transaction.atomic(using=using, savepoint=False):
+        notifications = SecurityNotification.objects.bulk_create(
+            [SecurityNotification(user=user, **fields) for fields in items]
+        )
+        updated = NotificationReadState.objects.filter(user=user).update(
+            unread_personal=F("unread_personal") + len(notifications)
+        )
+        if not updated:
+            # First notification for this user: the initial count includes the new rows
+            get_read_state(user)
+        for notification in notifications:
+            publish_on_commit("notification", notification_event_data(notification), using=using,
+                              user_ids=[user.pk])
+    bump("notifications")
+    return notifications
+
+
+def broadcast(created_by, **fields):
+    """Create one notification shown to every other user."""
+    notification = BroadcastNotification.objects.create(created_by=created_by, **fields)
+    cache.set(LATEST_BROADCAST_KEY, notification.id, LATEST_BROADCAST_TTL)
+    return notification
+
+
+def unread_count(user):
+    state = _catch_up_broadcasts(user, get_read_state(user))
+    return state.unread_personal + state.unread_broadcasts
+
+
+def _catch_up_broadcasts(user, state):
+    latest = latest_broadcast_id()
+    while latest > state.broadcast_counted_until:
+        start = max(state.broadcast_counted_until, state.broadcast_read_until)
+        new = (
+            visible_broadcasts(user)
+            .filter(id__gt=start, id__lte=latest)
+            .exclude(receipts__user=user)
+            .count()
+        )
+        # Conditional on the old mark so concurrent catch-ups can't double count
+        NotificationReadState.objects.filter(
+            pk=state.pk, broadcast_counted_until=state.broadcast_counted_until
+        ).update(unread_broadcasts=F("unread_broadcasts") + new, broadcast_counted_until=latest)
+        state.refresh_from_db()
+    return state
+
+
+def mark_personal_read(user, notification_id):
+    with transaction.atomic(using=_db()):
+        updated = SecurityNotification.objects.filter(
+            pk=notification_id, user=user, is_read=False
+        ).update(is_read=True)
+        if updated:
+            NotificationReadState.objects.filter(user=user).update(
+                unread_personal=Greatest(F("unread_personal") - updated, 0)
+            )
+    if updated:
+        bump("notifications")
+    return updated
+
+
+def mark_broadcast_read(user, broadcast):
+    state = get_read_state(user)
+    if broadcast.id <= state.broadcast_read_until:
+        return
+    with transaction.atomic(using=_db()):
+        _, created = BroadcastReceipt.objects.get_or_create(user=user, broadcast=broadcast)
+        if created:
+            NotificationReadState.objects.filter(
+                pk=state.pk, broadcast_counted_until__gte=broadcast.id
+            ).update(unread_broadcasts=Greatest(F("unread_broadcasts") - 1, 0))
+
+
+def mark_all_read(user):
+    with transaction.atomic(using=_db()):
+        state = get_read_state(user)
+        SecurityNotification.objects.filter(user=user, is_read=False).update(is_read=True)
+        latest = BroadcastNotification.objects.aggregate(latest=Max("id"))["latest"] or 0
+        watermark = max(latest, state.broadcast_read_until)
+        NotificationReadState.objects.filter(pk=state.pk).update(
+            unread_personal=0,
+            unread_broadcasts=0,
+            broadcast_read_until=watermark,
+            broadcast_counted_until=Greatest(F("broadcast_counted_until"), watermark),
+        )
+        BroadcastReceipt.objects.filter(user=user, broadcast_id__lte=watermark).delete()
+    bump("notifications")
+
+
+def unread_broadcasts(user, state):
+    return (
+        visible_broadcasts(user)
+        .filter(id__gt=state.broadcast_read_until)
+        .exclude(receipts__user=user)
+    )
+
+
+def read_broadcast_ids(user, state, broadcasts):
+    """Ids of the given broadcasts that the user has read."""
+    read = {b.id for b in broadcasts if b.id <= state.broadcast_read_until}
+    pending = [b.id for b in broadcasts if b.id > state.broadcast_read_until]
+    if pending:
+        read.update(
+            BroadcastReceipt.objects.filter(user=user, broadcast_id__in=pending)
+            .values_list("broadcast_id", flat=True)
+        )
+    return read
+
+
+class NotificationFeedPagination(KeysetPagination):
+    """
+    Keyset pagination over several querysets merged by
+    (created_at, source, id). Each source is seeked independently with its
+    own (created_at, id) index and at most page_size + 1 rows are read
+    from each, so deep pages stay as cheap as the first one.
+    """
+
+    def paginate_feed(self, sources, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position, self.reverse = self.decode_cursor(request)
+
+        rows = []
+        for source, queryset in enumerate(sources):
+            for obj in self._seek(queryset, source, position)[:self.page_size + 1]:
+                obj.feed_source = source
+                rows.append(obj)
+        rows.sort(key=self._sort_key, reverse=not self.reverse)
+
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+
+        self.page = rows
+        if self.reverse:
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        return rows
+
+    def _sort_key(self, obj):
+        return (getattr(obj, self.timestamp_field), obj.feed_source, obj.pk)
+
+    def _seek(self, queryset, source, position):
+        ts = self.timestamp_field
+        if self.reverse:
+            queryset = queryset.order_by(ts, "id")
+        else:
+            queryset = queryset.order_by(f"-{ts}", "-id")
+        if position is None:
+            return queryset
+
+        pos_ts, pos_id, pos_source = position
+        pos_source = pos_source or PERSONAL
+        before = "gt" if self.reverse else "lt"
+        same_ts_rule = Q(**{ts: pos_ts, f"id__{before}": pos_id})
+        if source == pos_source:
+            return queryset.filter(Q(**{f"{ts}__{before}": pos_ts}) | same_ts_rule)
+        # Rows with the same timestamp from a source that sorts on the
+        # cursor's far side are included; the others were already served.
+        on_far_side = (source > pos_source) if self.reverse else (source < pos_source)
+        if on_far_side:
+            return queryset.filter(**{f"{ts}__{before}e": pos_ts})
+        return queryset.filter(**{f"{ts}__{before}": pos_ts})
+
+    def encode_cursor(self, obj, reverse):
+        token = encode_position(getattr(obj, self.timestamp_field), obj.pk, reverse, source=obj.feed_source)
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, token)
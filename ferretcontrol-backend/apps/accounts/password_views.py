@@ -4,11 +4,12 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from django.contrib.auth.models import User
 from django.utils import timezone
+from .authentication import revoke_tokens
 from .models import PasswordResetCode
 import random
 import datetime
-
-from django.core.mail import send_mail
+from django.db import transaction
+from apps.core.outbox import enqueue
 
 class RequestPasswordResetView(APIView):
     permission_classes = [AllowAny]
@@ -27,20 +28,14 @@ class RequestPasswordResetView(APIView):
         code = str(random.randint(100000, 999999))
         expires_at = timezone.now() + datetime.timedelta(minutes=15)
 
-        PasswordResetCode.objects.create(user=user, code=code, expires_at=expires_at)
-
-        # Send Email
-        try:
-            send_mail(
+        # The code and its email are stored together; manage.py send_outbox delivers it
+        with transaction.atomic():
+            PasswordResetCode.objects.create(user=user, code=code, expires_at=expires_at)
+            enqueue(
                 subject='Código de Recuperación - FerretControl',
                 message=f'Tu código de verificación es: {code}\n\nEste código expira en 15 minutos.',
-                from_email=None, # Uses DEFAULT_FROM_EMAIL
                 recipient_list=[email],
-                fail_silently=False,
             )
-        except Exception as e:
-            print(f"Error sending email: {e}")
-            return Response({"error": "Error enviando el correo."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
         return Response({"message": "Código enviado a tu correo."}, status=status.HTTP_200_OK)
 
@@ -67,6 +62,7 @@ class ResetPasswordView(APIView):
 
         user.set_password(new_password)
         user.save()
+        revoke_tokens(user)
 
         # Clean up used codes
         PasswordResetCode.objects.filter(user=user).delete()
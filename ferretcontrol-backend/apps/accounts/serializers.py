@@ -1,5 +1,21 @@
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from .authentication import TOKEN_VERSION_CLAIM, forget_user, revoke_tokens, token_version
+
+ME_CACHE_TTL = 300
+
+
+def me_cache_key(user_id):
+    return f"users:me:{user_id}"
+
+
+def invalidate_me(user_id):
+    cache.delete(me_cache_key(user_id))
+
 
 class UserSerializer(serializers.ModelSerializer):
     display_name = serializers.CharField(source='profile.display_name', required=False)
@@ -29,6 +45,7 @@ class UserSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         profile_data = validated_data.pop('profile', {})
+        was_active = instance.is_active
         # Update User fields
         for attr, value in validated_data.items():
             if attr == 'password':
@@ -37,6 +54,12 @@ class UserSerializer(serializers.ModelSerializer):
                 setattr(instance, attr, value)
         instance.save()
 
+        if 'password' in validated_data or (was_active and not instance.is_active):
+            revoke_tokens(instance)
+        else:
+            # Flags such as is_staff must not outlive the auth cache entry
+            forget_user(instance)
+
         # Update Profile fields
         if hasattr(instance, 'profile'):
             profile = instance.profile
@@ -47,12 +70,89 @@ class UserSerializer(serializers.ModelSerializer):
             # Create if missing (migration safety)
             from .models import UserProfile
             UserProfile.objects.create(user=instance, **profile_data)
-        
+
+        invalidate_me(instance.pk)
         return instance
 
-from .models import SecurityNotification
+
+class UserListSerializer(UserSerializer):
+    """List representation: skips bio and social_links (use ?full=1 for them)."""
+    is_logged_in = serializers.BooleanField(source='session_status.is_logged_in', read_only=True)
+
+    class Meta(UserSerializer.Meta):
+        fields = ['id', 'username', 'email', 'is_staff', 'is_active', 'last_login', 'date_joined',
+                  'display_name', 'avatar', 'is_logged_in']
+
+
+class VersionedTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Stamps the user's token version into issued tokens."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token[TOKEN_VERSION_CLAIM] = token_version(user)
+        return token
+
+
+class VersionedTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refuses refresh tokens issued before the user's last revoke_tokens."""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        if refresh.payload.get(TOKEN_VERSION_CLAIM, 0) != token_version(user_id):
+            raise AuthenticationFailed("Token revocado", code="token_revoked")
+        return super().validate(attrs)
+
+
+class MeSerializer(UserSerializer):
+    """The current user plus their session status (GET /api/users/me/)."""
+    is_logged_in = serializers.BooleanField(source='session_status.is_logged_in', read_only=True)
+    last_ip = serializers.IPAddressField(source='session_status.last_ip', read_only=True)
+    last_login_at = serializers.DateTimeField(source='session_status.last_login_at', read_only=True)
+
+    class Meta(UserSerializer.Meta):
+        fields = UserSerializer.Meta.fields + ['is_logged_in', 'last_ip', 'last_login_at']
+
+from .models import SecurityNotification, BroadcastNotification
 
 class SecurityNotificationSerializer(serializers.ModelSerializer):
+    kind = serializers.SerializerMethodField()
+
     class Meta:
         model = SecurityNotification
         fields = '__all__'
+
+    def get_kind(self, obj):
+        return 'personal'
+
+class BroadcastNotificationSerializer(serializers.ModelSerializer):
+    """Renders a broadcast in the same shape as a personal notification."""
+    ID_PREFIX = 'b'
+
+    id = serializers.SerializerMethodField()
+    user = serializers.SerializerMethodField()
+    is_read = serializers.SerializerMethodField()
+    ip_address = serializers.SerializerMethodField()
+    kind = serializers.SerializerMethodField()
+
+    class Meta:
+        model = BroadcastNotification
+        fields = ['id', 'user', 'title', 'message', 'alert_type', 'is_read', 'ip_address', 'created_at', 'kind']
+
+    def get_id(self, obj):
+        # Prefixed so it can't collide with personal ids in the merged feed
+        return f"{self.ID_PREFIX}{obj.id}"
+
+    def get_user(self, obj):
+        request = self.context.get('request')
+        return request.user.id if request else None
+
+    def get_is_read(self, obj):
+        return obj.id in self.context.get('read_broadcasts', ())
+
+    def get_ip_address(self, obj):
+        return None
+
+    def get_kind(self, obj):
+        return 'broadcast'
@@ -0,0 +1,91 @@
+"""
+Access-control statistics.
+
+``get_stats()`` counts users with one conditional aggregate over
+``auth_user`` and open high/critical risks with one over ``risks_risk``,
+and caches the result under the "users" and "risks" collection versions,
+so any write to either invalidates it. The "active in the last 24h"
+window moves with time, hence the short STATS_CACHE_TTL on top.
+
+``UserActivityRollup`` keeps one snapshot of the user counts per hour
+for the trend charts. The current hour is recorded by the first stats
+computation that hour and refreshed by ``manage.py rollup_user_activity``
+(run it hourly from cron), so reading a trend never scans ``auth_user``.
+"""
+import datetime
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from apps.core.versions import get_versions
+from apps.risks.models import Risk
+from .models import UserActivityRollup
+
+ACTIVE_WINDOW = datetime.timedelta(hours=24)
+ALERT_LEVELS = ("high", "critical")
+STATS_CACHE_TTL = 60
+MAX_TREND_HOURS = 24 * 90
+
+
+def hour_bucket(when):
+    return when.replace(minute=0, second=0, microsecond=0)
+
+
+def user_counts(now=None):
+    now = now or timezone.now()
+    return User.objects.aggregate(
+        total_users=Count("id"),
+        active_users=Count("id", filter=Q(last_login__gte=now - ACTIVE_WINDOW)),
+        inactive_users=Count("id", filter=Q(last_login__isnull=True)),
+    )
+
+
+def compute_stats(now=None):
+    stats = user_counts(now)
+    stats.update(Risk.objects.aggregate(
+        security_alerts=Count("id", filter=Q(level__in=ALERT_LEVELS, status="open")),
+    ))
+    return stats
+
+
+def get_stats():
+    users_version, risks_version = get_versions("users", "risks")
+    key = f"access-stats:{users_version}:{risks_version}"
+    stats = cache.get(key)
+    if stats is None:
+        now = timezone.now()
+        stats = compute_stats(now)
+        cache.set(key, stats, STATS_CACHE_TTL)
+        # First computation this hour also records the hour's snapshot
+        hour = hour_bucket(now)
+        if cache.add(f"access-stats:rollup:{hour.isoformat()}", True, 3600):
+            record_rollup(hour, stats)
+    return stats
+
+
+ROLLUP_FIELDS = ("total_users", "active_users", "inactive_users")
+
+
+def record_rollup(hour, counts):
+    """Insert or overwrite the hour's snapshot in a single upsert."""
+    rollup = UserActivityRollup(hour=hour, **{field: counts[field] for field in ROLLUP_FIELDS})
+    UserActivityRollup.objects.bulk_create(
+        [rollup],
+        update_conflicts=True,
+        unique_fields=["hour"],
+        update_fields=[*ROLLUP_FIELDS, "updated_at"],
+    )
+    return rollup
+
+
+def trend(hours=24, now=None):
+    """Hourly rollups of the last ``hours`` hours, oldest first."""
+    now = now or timezone.now()
+    since = hour_bucket(now) - datetime.timedelta(hours=hours - 1)
+    return (
+        UserActivityRollup.objects.filter(hour__gte=since)
+        .order_by("hour")
+        .values("hour", *ROLLUP_FIELDS)
+    )
@@ -1,30 +1,19 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.contrib.auth.models import User
-from django.utils import timezone
-from datetime import timedelta
-from apps.risks.models import Risk
+from .stats import MAX_TREND_HOURS, get_stats, trend
 
 class AccessControlStatsView(APIView):
     def get(self, request):
-        total_users = User.objects.count()
-        
-        # Active users: Logged in within last 24 hours
-        time_threshold = timezone.now() - timedelta(hours=24)
-        active_users = User.objects.filter(last_login__gte=time_threshold).count()
-        
-        # Inactive users: Never logged in
-        inactive_users = User.objects.filter(last_login__isnull=True).count()
-        
-        # Security alerts: High/Critical risks that are Open
-        security_alerts = Risk.objects.filter(
-            level__in=['High', 'Critical'], 
-            status='open'
-        ).count()
-        
-        return Response({
-            "total_users": total_users,
-            "active_users": active_users,
-            "inactive_users": inactive_users,
-            "security_alerts": security_alerts
-        })
+        return Response(get_stats())
+
+
+class AccessControlTrendView(APIView):
+    """Hourly user counts for the trend charts: ``?hours=24`` (max 90 days)."""
+
+    def get(self, request):
+        try:
+            hours = int(request.query_params.get("hours", 24))
+        except ValueError:
+            hours = 24
+        hours = min(max(hours, 1), MAX_TREND_HOURS)
+        return Response({"hours": hours, "results": list(trend(hours))})
@@ -1,3 +1,348 @@
-from django.test import TestCase
+import datetime
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from apps.assets.models import InformationAsset
+from apps.risks.models import Risk
+from .models import (
+    BroadcastNotification, BroadcastReceipt, NotificationReadState, PasswordResetCode, SecurityNotification,
+    UserActivityRollup, UserProfile, UserSessionStatus,
+)
+from .authentication import CachedJWTAuthentication, revoke_tokens
+from .notifications import broadcast, notify
+from .serializers import VersionedTokenObtainPairSerializer
+
+
+@override_settings(AUDIT_BUFFER={"ENABLED": False})
+class UserListQueryCountTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user("admin", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def add_users(self, n, start=0):
+        for i in range(start, start + n):
+            user = User.objects.create_user(f"user{i}")
+            UserProfile.objects.create(user=user, display_name=f"User {i}", bio="bio", social_links={"x": i})
+            UserSessionStatus.objects.create(user=user, is_logged_in=bool(i % 2))
+
+    def test_list_runs_in_fixed_number_of_queries(self):
+        self.add_users(3)
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/users/")
+        self.assertEqual(len(response.json()), 4)
+
+        self.add_users(20, start=3)
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/users/")
+        self.assertEqual(len(response.json()), 24)
+
+    def test_full_list_runs_in_fixed_number_of_queries(self):
+        self.add_users(10)
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/users/?full=1")
+        self.assertEqual(len(response.json()), 11)
+
+    def test_list_skips_heavy_fields_unless_asked(self):
+        self.add_users(1)
+        row = next(u for u in self.client.get("/api/users/").json() if u["username"] == "user0")
+        self.assertEqual(row["display_name"], "User 0")
+        self.assertFalse(row["is_logged_in"])
+        self.assertNotIn("bio", row)
+        self.assertNotIn("social_links", row)
+
+        row = next(u for u in self.client.get("/api/users/?full=1").json() if u["username"] == "user0")
+        self.assertEqual(row["bio"], "bio")
+        self.assertEqual(row["social_links"], {"x": 0})
+
+    def test_users_without_profile_are_listed(self):
+        response = self.client.get("/api/users/")
+        self.assertEqual(response.json()[0]["username"], "admin")
+        self.assertIsNone(response.json()[0]["display_name"])
+
+
+@override_settings(AUDIT_BUFFER={"ENABLED": False})
+class AccessControlStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user("admin", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        now = timezone.now()
+        User.objects.create_user("recent", last_login=now - datetime.timedelta(hours=1))
+        User.objects.create_user("stale", last_login=now - datetime.timedelta(days=3))
+        self.asset = InformationAsset.objects.create(name="Servidor")
+        Risk.objects.create(title="a", likelihood=5, impact=5, status="open", asset=self.asset)
+        Risk.objects.create(title="b", likelihood=4, impact=4, status="closed", asset=self.asset)
+        Risk.objects.create(title="c", likelihood=1, impact=1, status="open", asset=self.asset)
+
+    def test_counts_and_alerts(self):
+        with self.assertNumQueries(3):  # two aggregates + the hourly rollup upsert
+            response = self.client.get("/api/access-control/stats/")
+        self.assertEqual(response.json(), {
+            "total_users": 3, "active_users": 1, "inactive_users": 1, "security_alerts": 1,
+        })
+        self.assertEqual(UserActivityRollup.objects.get().active_users, 1)
+
+    def test_cached_until_write(self):
+        self.client.get("/api/access-control/stats/")
+        with self.assertNumQueries(0):
+            self.client.get("/api/access-control/stats/")
+
+        Risk.objects.create(title="d", likelihood=5, impact=4, status="open", asset=self.asset)
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/access-control/stats/")
+        self.assertEqual(response.json()["security_alerts"], 2)
+
+    def test_trend(self):
+        hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+        for i in range(30):
+            UserActivityRollup.objects.create(hour=hour - datetime.timedelta(hours=i), total_users=i)
+        response = self.client.get("/api/access-control/stats/trend/?hours=6")
+        results = response.json()["results"]
+        self.assertEqual([r["total_users"] for r in results], [5, 4, 3, 2, 1, 0])
+
+
+@override_settings(AUDIT_BUFFER={"ENABLED": False})
+class NotificationFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.start = timezone.now() - datetime.timedelta(days=1)
+        self.user = User.objects.create_user("reader", date_joined=self.start - datetime.timedelta(days=1))
+        self.author = User.objects.create_user("author")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def personal(self, minutes):
+        notification = notify(self.user, title="p", message="m", alert_type="LOGIN_SUCCESS")
+        SecurityNotification.objects.filter(pk=notification.pk).update(
+            created_at=self.start + datetime.timedelta(minutes=minutes)
+        )
+        return notification.pk
+
+    def broadcast(self, minutes):
+        notification = broadcast(self.author, title="b", message="m", alert_type="FORUM_POST")
+        BroadcastNotification.objects.filter(pk=notification.pk).update(
+            created_at=self.start + datetime.timedelta(minutes=minutes)
+        )
+        return f"b{notification.pk}"
+
+    def walk(self, url, link):
+        ids = []
+        while url:
+            body = self.client.get(url).json()
+            ids.append([row["id"] for row in body["results"]])
+            url = body[link]
+        return ids
+
+    def test_pages_merge_sources_with_same_timestamp_ties(self):
+        # Newest first; on equal created_at broadcasts sort before personal
+        # rows, and rows of one source by id descending.
+        p1 = self.personal(1)
+        b1 = self.broadcast(2)
+        p2 = self.personal(2)
+        p3 = self.personal(2)
+        b2 = self.broadcast(2)
+        b3 = self.broadcast(3)
+        p4 = self.personal(4)
+        expected = [p4, b3, b2, b1, p3, p2, p1]
+
+        pages = self.walk("/api/notifications/?page_size=2", "next")
+        self.assertEqual([len(page) for page in pages], [2, 2, 2, 1])
+        self.assertEqual(sum(pages, []), expected)
+
+        for size in (1, 3, 4):
+            pages = self.walk(f"/api/notifications/?page_size={size}", "next")
+            self.assertEqual(sum(pages, []), expected, size)
+
+    def test_previous_links_walk_back_over_the_same_rows(self):
+        p1 = self.personal(5)
+        b1 = self.broadcast(4)
+        p2 = self.personal(4)
+        b2 = self.broadcast(4)
+        p3 = self.personal(3)
+        expected = [p1, b2, b1, p2, p3]
+
+        forward = []
+        url = "/api/notifications/?page_size=2"
+        while url:
+            body = self.client.get(url).json()
+            forward.append([row["id"] for row in body["results"]])
+            last_previous, url = body["previous"], body["next"]
+        self.assertEqual(sum(forward, []), expected)
+
+        # From the last page, follow previous back to the first one
+        backward = self.walk(last_previous, "previous")
+        self.assertEqual(sum(reversed(backward), []) + forward[-1], expected)
+
+    def test_feed_excludes_own_and_older_broadcasts(self):
+        self.broadcast(1)
+        own = broadcast(self.user, title="mine", message="m", alert_type="FORUM_POST")
+        old = broadcast(self.author, title="old", message="m", alert_type="FORUM_POST")
+        BroadcastNotification.objects.filter(pk=old.pk).update(
+            created_at=self.user.date_joined - datetime.timedelta(days=1)
+        )
+        ids = sum(self.walk("/api/notifications/", "next"), [])
+        self.assertNotIn(f"b{own.pk}", ids)
+        self.assertNotIn(f"b{old.pk}", ids)
+        self.assertEqual(len(ids), 1)
+
+
+@override_settings(AUDIT_BUFFER={"ENABLED": False})
+class NotificationCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("reader")
+        self.author = User.objects.create_user("author")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def unread(self):
+        return self.client.get("/api/notifications/unread_count/").json()["count"]
+
+    def test_counters_follow_broadcast_read_and_mark_all_read(self):
+        personal = notify(self.user, title="p", message="m", alert_type="LOGIN_SUCCESS")
+        notify(self.user, title="p", message="m", alert_type="LOGIN_SUCCESS")
+        first = broadcast(self.author, title="b", message="m", alert_type="FORUM_POST")
+        broadcast(self.user, title="own", message="m", alert_type="FORUM_POST")
+        second = broadcast(self.author, title="b", message="m", alert_type="FORUM_POST")
+        self.assertEqual(self.unread(), 4)
+
+        self.client.post(f"/api/notifications/b{first.pk}/mark_read/")
+        self.client.post(f"/api/notifications/b{first.pk}/mark_read/")
+        self.assertEqual(self.unread(), 3)
+        self.client.post(f"/api/notifications/{personal.pk}/mark_read/")
+        self.client.post(f"/api/notifications/{personal.pk}/mark_read/")
+        self.assertEqual(self.unread(), 2)
+
+        self.client.post("/api/notifications/mark_all_read/")
+        self.assertEqual(self.unread(), 0)
+        state = NotificationReadState.objects.get(user=self.user)
+        self.assertEqual(state.broadcast_read_until, second.pk)
+        self.assertFalse(BroadcastReceipt.objects.filter(user=self.user).exists())
+
+        broadcast(self.author, title="b", message="m", alert_type="FORUM_POST")
+        notify(self.user, title="p", message="m", alert_type="LOGIN_SUCCESS")
+        self.assertEqual(self.unread(), 2)
+
+    def test_broadcast_read_before_it_is_counted(self):
+        # A receipt for a broadcast above broadcast_counted_until must not
+        # be subtracted before the catch-up counts that broadcast.
+        self.assertEqual(self.unread(), 0)
+        new = broadcast(self.author, title="b", message="m", alert_type="FORUM_POST")
+        self.client.post(f"/api/notifications/b{new.pk}/mark_read/")
+        self.assertEqual(self.unread(), 0)
+        broadcast(self.author, title="b", message="m", alert_type="FORUM_POST")
+        self.assertEqual(self.unread(), 1)
+
+    def test_reconcile_repairs_drift(self):
+        notify(self.user, title="p", message="m", alert_type="LOGIN_SUCCESS")
+        broadcast(self.author, title="b", message="m", alert_type="FORUM_POST")
+        self.assertEqual(self.unread(), 2)
+        NotificationReadState.objects.filter(user=self.user).update(unread_personal=7, unread_broadcasts=0)
+        call_command("reconcile_notification_counters", stdout=StringIO())
+        self.assertEqual(self.unread(), 2)
+
+
+@override_settings(AUDIT_BUFFER={"ENABLED": False}, LOGIN_DEFER_NOTIFICATIONS=False,
+                   PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class TokenRevocationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("ana", email="ana@example.com", password="vieja-clave-1")
+        self.admin = User.objects.create_user("admin", password="admin-clave-1", is_staff=True)
+        self.client = APIClient()
+
+    def login(self, username="ana", password="vieja-clave-1"):
+        response = self.client.post("/api/auth/token/", {"username": username, "password": password})
+        self.assertEqual(response.status_code, 200)
+        return response.data["access"], response.data["refresh"]
+
+    def me(self, access):
+        return self.client.get("/api/users/me/", HTTP_AUTHORIZATION=f"Bearer {access}").status_code
+
+    def refresh(self, refresh):
+        return self.client.post("/api/auth/refresh/", {"refresh": refresh})
+
+    def assert_revoked(self, access, refresh):
+        self.assertEqual(self.me(access), 401)
+        response = self.refresh(refresh)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data["code"], "token_revoked")
+
+    def test_refresh_before_revocation(self):
+        access, refresh = self.login()
+        response = self.refresh(refresh)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.me(response.data["access"]), 200)
+
+    def test_logout_revokes_access_and_refresh(self):
+        access, refresh = self.login()
+        self.assertEqual(self.me(access), 200)
+        response = self.client.post("/api/auth/logout/", HTTP_AUTHORIZATION=f"Bearer {access}")
+        self.assertEqual(response.status_code, 200)
+        self.assert_revoked(access, refresh)
+        # A new login works again
+        self.assertEqual(self.me(self.login()[0]), 200)
+
+    def test_password_change_revokes(self):
+        access, refresh = self.login()
+        self.client.force_authenticate(self.user)
+        response = self.client.patch(f"/api/users/{self.user.pk}/", {"password": "nueva-clave-2"})
+        self.assertEqual(response.status_code, 200)
+        self.client.force_authenticate(None)
+        self.assert_revoked(access, refresh)
+        self.login(password="nueva-clave-2")
+
+    def test_password_reset_revokes(self):
+        access, refresh = self.login()
+        self.client.post("/api/auth/password_reset/request/", {"email": "ana@example.com"})
+        response = self.client.post("/api/auth/password_reset/confirm/", {
+            "email": "ana@example.com", "code": PasswordResetCode.objects.get().code,
+            "new_password": "nueva-clave-2",
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assert_revoked(access, refresh)
+
+    def test_deactivation_revokes(self):
+        access, refresh = self.login()
+        admin_access, _ = self.login("admin", "admin-clave-1")
+        response = self.client.patch(f"/api/users/{self.user.pk}/", {"is_active": False},
+                                     HTTP_AUTHORIZATION=f"Bearer {admin_access}")
+        self.assertEqual(response.status_code, 200)
+        self.assert_revoked(access, refresh)
+
+    def test_user_cache_hits_and_misses(self):
+        token = VersionedTokenObtainPairSerializer.get_token(self.user).access_token
+        auth = CachedJWTAuthentication()
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        with self.assertNumQueries(1):
+            self.assertEqual(auth.authenticate(request)[0], self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(auth.authenticate(request)[0], self.user)
+
+        # Revoking drops the cached entry and the old version is refused
+        revoke_tokens(self.user)
+        with self.assertRaises(AuthenticationFailed):
+            auth.authenticate(request)
+
+        # A token with the new version misses once, then hits
+        token = VersionedTokenObtainPairSerializer.get_token(self.user).access_token
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        with self.assertNumQueries(1):
+            auth.authenticate(request)
+        with self.assertNumQueries(0):
+            auth.authenticate(request)
+
+        # Flag changes without revocation are seen at once (forget_user)
+        self.client.force_authenticate(self.admin)
+        self.client.patch(f"/api/users/{self.user.pk}/", {"is_staff": True})
+        self.assertTrue(auth.authenticate(request)[0].is_staff)
@@ -1,12 +1,33 @@
 from rest_framework import viewsets, filters
 from django.contrib.auth.models import User
-from .serializers import UserSerializer
+from django.core.cache import cache
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from .serializers import ME_CACHE_TTL, MeSerializer, UserListSerializer, UserSerializer, me_cache_key
 from rest_framework.permissions import IsAuthenticated
+from apps.core.conditional import ConditionalGetMixin
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'head', 'put', 'patch']
-    queryset = User.objects.all().order_by('-date_joined')
+    queryset = User.objects.select_related('profile', 'session_status').order_by('-date_joined')
+    etag_collections = ("users",)
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [filters.SearchFilter]
     search_fields = ['username', 'email']
+
+    def get_serializer_class(self):
+        if self.action == 'list' and self.request.query_params.get('full') not in ('1', 'true'):
+            return UserListSerializer
+        return UserSerializer
+
+    @action(detail=False, methods=['get'])
+    def me(self, request):
+        """The current user with profile and session status, cached per user."""
+        key = me_cache_key(request.user.pk)
+        data = cache.get(key)
+        if data is None:
+            user = User.objects.select_related('profile', 'session_status').get(pk=request.user.pk)
+            data = MeSerializer(user, context=self.get_serializer_context()).data
+            cache.set(key, data, ME_CACHE_TTL)
+        return Response(data)
@@ -0,0 +1,25 @@
+from django.db.models import Count
+from rest_framework.filters import BaseFilterBackend
+
+from .models import InformationAsset, parse_tags
+
+
+class AssetTagFilter(BaseFilterBackend):
+    """
+    Exact tag filters over the tag_set index:
+    ``?tags=pii,ventas`` matches assets with every tag,
+    ``?tags=pii,ventas&tags_match=any`` assets with at least one.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        names = parse_tags(request.query_params.get("tags"))
+        if not names:
+            return queryset
+        links = InformationAsset.tag_set.through.objects.filter(tag__name__in=names)
+        if request.query_params.get("tags_match") != "any" and len(names) > 1:
+            links = (
+                links.values("informationasset_id")
+                .annotate(n=Count("tag_id"))
+                .filter(n=len(names))
+            )
+        return queryset.filter(pk__in=links.values("informationasset_id"))
@@ -0,0 +1,17 @@
+from apps.core.bulk_import import BulkImporter
+from apps.core.search import get_index, index_documents
+from .models import InformationAsset, assign_tags
+from .serializers import InformationAssetImportSerializer
+
+
+class AssetImporter(BulkImporter):
+    model = InformationAsset
+    serializer_class = InformationAssetImportSerializer
+    version = "assets"
+
+    def build(self, data, context):
+        return InformationAsset(owner=self.user, **data)
+
+    def after_insert(self, objs):
+        assign_tags(objs)
+        index_documents(get_index("assets"), objs)
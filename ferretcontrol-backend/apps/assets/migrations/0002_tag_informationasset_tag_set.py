@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:46
+
+from django.db import migrations, models
+
+
+def parse_existing_tags(apps, schema_editor):
+    InformationAsset = apps.get_model("assets", "InformationAsset")
+    Tag = apps.get_model("assets", "Tag")
+    Through = InformationAsset.tag_set.through
+    tag_ids = {}
+    links = []
+    for asset in (
+        InformationAsset.objects.exclude(tags="").only("id", "tags").iterator()
+    ):
+        names = []
+        for part in asset.tags.split(","):
+            name = part.strip().lower()[:50]
+            if name and name not in names:
+                names.append(name)
+        for name in names:
+            if name not in tag_ids:
+                tag_ids[name] = Tag.objects.get_or_create(name=name)[0].id
+            links.append(Through(informationasset_id=asset.id, tag_id=tag_ids[name]))
+    Through.objects.bulk_create(links, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assets", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tag",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50, unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="informationasset",
+            name="tag_set",
+            field=models.ManyToManyField(
+                blank=True, editable=False, related_name="assets", to="assets.tag"
+            ),
+        ),
+        migrations.RunPython(parse_existing_tags, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,26 @@
-from django.db import models
+from django.db import models, router, transaction
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+
+def parse_tags(value):
+    """Split a CSV tag string into normalized names: trimmed, lowercase, unique, in order."""
+    names = []
+    for part in (value or "").split(","):
+        name = part.strip().lower()[:50]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+
+    def __str__(self):
+        return self.name
+
+
 class InformationAsset(models.Model):
     ASSET_TYPES = [
         ("dataset", "Dataset"),
@@ -30,7 +48,8 @@ class InformationAsset(models.Model):
     owner = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     classification = models.CharField(max_length=20, choices=CLASSIFICATIONS, default="internal")
     criticality = models.IntegerField(choices=CRITICALITY, default=2)
-    tags = models.CharField(max_length=300, blank=True)  # MVP: CSV tags "pii,ventas,precios"
+    tags = models.CharField(max_length=300, blank=True)  # CSV tags "pii,ventas,precios" as entered; normalized into tag_set
+    tag_set = models.ManyToManyField(Tag, related_name="assets", blank=True, editable=False)
     description = models.TextField(blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
@@ -38,6 +57,46 @@ class InformationAsset(models.Model):
     def __str__(self):
         return self.name
 
+    # ``tags`` as last loaded or saved; tag_set only changes when its parsed names do
+    _saved_tags = ""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_tags = instance.__dict__.get("tags")  # None if deferred
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._saved_tags = self.__dict__.get("tags")
+
+    def save(self, *args, **kwargs):
+        # One transaction with the heatmap signals, which move this asset's
+        # risks between classification cells (apps.risks.heatmap)
+        with transaction.atomic(using=kwargs.get("using") or router.db_for_write(InformationAsset, instance=self)):
+            super().save(*args, **kwargs)
+            update_fields = kwargs.get("update_fields")
+            if update_fields is None or "tags" in update_fields:
+                if self._saved_tags is None or set(parse_tags(self.tags)) != set(parse_tags(self._saved_tags)):
+                    assign_tags([self])
+                self._saved_tags = self.tags
+
     @property
     def criticality_display(self):
         return dict(self.CRITICALITY).get(self.criticality, "Unknown")
+
+
+def assign_tags(assets):
+    """Point the tag_set of saved assets at the tags in their ``tags`` strings."""
+    wanted = {asset.pk: parse_tags(asset.tags) for asset in assets}
+    names = {name for names in wanted.values() for name in names}
+    if names:
+        Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+    tag_ids = dict(Tag.objects.filter(name__in=names).values_list("name", "id"))
+    through = InformationAsset.tag_set.through
+    through.objects.filter(informationasset_id__in=wanted).delete()
+    through.objects.bulk_create([
+        through(informationasset_id=pk, tag_id=tag_ids[name])
+        for pk, asset_names in wanted.items()
+        for name in asset_names
+    ])
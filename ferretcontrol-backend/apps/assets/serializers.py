@@ -1,9 +1,24 @@
 from rest_framework import serializers
-from .models import InformationAsset
+from .models import InformationAsset, parse_tags
 
 class InformationAssetSerializer(serializers.ModelSerializer):
     owner_username = serializers.CharField(source="owner.username", read_only=True)
+    # ``tags`` stays the writable CSV string, as entered; this is the normalized list
+    tag_list = serializers.SerializerMethodField()
 
     class Meta:
         model = InformationAsset
-        fields = "__all__"
+        exclude = ["tag_set"]  # served as tag_list
+
+    def get_tag_list(self, obj):
+        # Names from the prefetched tag_set, in the order the CSV lists them
+        names = {tag.name for tag in obj.tag_set.all()}
+        return [name for name in parse_tags(obj.tags) if name in names]
+
+
+class InformationAssetImportSerializer(serializers.ModelSerializer):
+    """Row validation for bulk imports; the owner is the importing user."""
+
+    class Meta:
+        model = InformationAsset
+        exclude = ["id", "owner", "created_at"]
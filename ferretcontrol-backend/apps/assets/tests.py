@@ -1,3 +1,49 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .models import InformationAsset, Tag
+
+
+@override_settings(AUDIT_BUFFER={"ENABLED": False})
+class AssetTagTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("owner")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_tags_string_is_kept_as_entered(self):
+        response = self.client.post("/api/assets/", {
+            "name": "CRM", "asset_type": "database", "tags": "PII, Ventas,pii",
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["tags"], "PII, Ventas,pii")
+        self.assertEqual(response.data["tag_list"], ["pii", "ventas"])
+        asset = InformationAsset.objects.get()
+        self.assertEqual(asset.tags, "PII, Ventas,pii")
+        self.assertEqual(sorted(asset.tag_set.values_list("name", flat=True)), ["pii", "ventas"])
+
+        # tag_list follows the CSV order, not the order the links were written in
+        response = self.client.patch(f"/api/assets/{asset.pk}/", {"tags": "ventas, gdpr, pii"})
+        self.assertEqual(response.data["tags"], "ventas, gdpr, pii")
+        self.assertEqual(response.data["tag_list"], ["ventas", "gdpr", "pii"])
+        self.assertEqual(self.client.get("/api/assets/").data[0]["tag_list"], ["ventas", "gdpr", "pii"])
+        self.assertEqual(len(self.client.get("/api/assets/?tags=GDPR").data), 1)
+        self.assertEqual(len(self.client.get("/api/assets/?tags=precios").data), 0)
+
+    def test_tag_links_only_rewritten_when_names_change(self):
+        asset = InformationAsset.objects.create(name="ERP", asset_type="database", tags="pii,ventas")
+        asset = InformationAsset.objects.get(pk=asset.pk)
+
+        asset.tags = "Ventas, PII"  # same names, different spelling
+        with CaptureQueriesContext(connection) as queries:
+            asset.save()
+        self.assertFalse([q["sql"] for q in queries if "assets_tag" in q["sql"] or "_tag_set" in q["sql"]])
+        self.assertEqual(InformationAsset.objects.get(pk=asset.pk).tags, "Ventas, PII")
+
+        asset.tags = "ventas"
+        asset.save()
+        self.assertEqual(list(asset.tag_set.values_list("name", flat=True)), ["ventas"])
+        self.assertEqual(Tag.objects.count(), 2)
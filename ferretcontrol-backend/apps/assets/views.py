@@ -1,20 +1,54 @@
 from rest_framework import viewsets, filters
+from apps.core.search import FullTextSearchFilter
 from rest_framework.decorators import action
+from django.db.models import Count
 from django.http import HttpResponse
-from .models import InformationAsset
+from rest_framework.response import Response
+from .filters import AssetTagFilter
+from .models import InformationAsset, Tag
 from .serializers import InformationAssetSerializer
+from apps.core.bulk_import import import_response
+from apps.core.conditional import ConditionalGetMixin
+from .importers import AssetImporter
 
-class InformationAssetViewSet(viewsets.ModelViewSet):
+class InformationAssetViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'head', 'put', 'patch']
-    queryset = InformationAsset.objects.all().order_by("-created_at")
+    queryset = InformationAsset.objects.select_related("owner").prefetch_related("tag_set").all().order_by("-created_at")
+    etag_collections = ("assets", "users")
     serializer_class = InformationAssetSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [AssetTagFilter, FullTextSearchFilter, filters.OrderingFilter]
+    search_index = "assets"
     search_fields = ["name", "source", "tags", "description"]
     ordering_fields = ["created_at", "criticality", "classification"]
 
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
 
+    @action(detail=False, methods=['get'], url_path='tags')
+    def tag_cloud(self, request):
+        """GET /api/assets/tags/?limit=50 — tags with the number of assets using each."""
+        return self.conditional_response(self._tag_cloud, request)
+
+    def _tag_cloud(self, request):
+        tags = (
+            Tag.objects.annotate(count=Count("assets"))
+            .filter(count__gt=0)
+            .order_by("-count", "name")
+            .values("name", "count")
+        )
+        try:
+            limit = int(request.query_params.get("limit", 0))
+        except ValueError:
+            limit = 0
+        if limit > 0:
+            tags = tags[:limit]
+        return Response(list(tags))
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_records(self, request):
+        """POST /api/assets/import/ — bulk load from CSV or NDJSON."""
+        return import_response(AssetImporter, request)
+
     @action(detail=True, methods=['get'])
     def download_authorship(self, request, pk=None):
         asset = self.get_object()
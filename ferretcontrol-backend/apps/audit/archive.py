@@ -0,0 +1,261 @@
+"""
+Audit log retention.
+
+Rows older than the retention window are moved out of SQLite into one
+gzip NDJSON segment per UTC day::
+
+    AUDIT_ARCHIVE_DIR/2025/01/audit-2025-01-31.ndjson.gz
+
+Every segment is sorted newest first, (-timestamp, -id), the order the
+archive is queried in, so a page is read by streaming the file from the
+start. A run that adds rows to an existing day merges them into the
+sorted stream, writes a side file and swaps it in. ``AuditArchiveSegment``
+keeps the time range, row count, byte size and highest archived id of
+every segment, so queries only open the days they need. Records above
+``last_id`` were written by a run that crashed before indexing them;
+they are ignored and archived again from the table, so an interrupted
+run never duplicates or loses rows. A segment that can't be read back in
+full (truncated, corrupt, missing) stops the merge with ArchiveError
+before anything is swapped in or deleted; queries skip its unreadable
+tail instead.
+"""
+import datetime
+import gzip
+import heapq
+import json
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.db import router, transaction
+from django.utils import timezone
+
+from apps.core.versions import bump
+from .filters import with_users
+from .models import AuditArchiveSegment, AuditLog
+
+SEARCH_KEYS = ("action", "entity", "entity_id", "path", "user_username")
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def archive_dir():
+    return Path(settings.AUDIT_ARCHIVE_DIR)
+
+
+def segment_relpath(day):
+    return f"{day:%Y}/{day:%m}/audit-{day.isoformat()}.ndjson.gz"
+
+
+def retention_cutoff(days=None, now=None):
+    """Start of the UTC day ``days`` ago; only whole days are archived."""
+    if days is None:
+        days = settings.AUDIT_RETENTION_DAYS
+    now = now or timezone.now()
+    day = (now - datetime.timedelta(days=days)).astimezone(datetime.timezone.utc).date()
+    return datetime.datetime.combine(day, datetime.time.min, tzinfo=datetime.timezone.utc)
+
+
+def record_key(record):
+    return datetime.datetime.fromisoformat(record["timestamp"]), record["id"]
+
+
+def to_record(log):
+    # Same shape as AuditLogSerializer so archived rows render like live ones.
+    return {
+        "id": log.id,
+        "user": log.user_id,
+        "user_username": log.user.username if log.user_id else None,
+        "action": log.action,
+        "entity": log.entity,
+        "entity_id": log.entity_id,
+        "path": log.path,
+        "method": log.method,
+        "ip": log.ip,
+        "user_agent": log.user_agent,
+        "success": log.success,
+        "timestamp": log.timestamp.isoformat(),
+        "meta": log.meta,
+    }
+
+
+def archive_older_than(cutoff, batch_size=5000, dry_run=False):
+    """
+    Move every AuditLog row with ``timestamp < cutoff`` into day segments.
+
+    Returns ``{"days": n, "rows": n}``. With ``dry_run`` nothing is written
+    or deleted and the counts describe what would be archived.
+    """
+    first = (
+        AuditLog.objects.filter(timestamp__lt=cutoff)
+        .order_by("timestamp")
+        .values_list("timestamp", flat=True)
+        .first()
+    )
+    result = {"days": 0, "rows": 0}
+    if first is None:
+        return result
+
+    day = first.astimezone(datetime.timezone.utc).date()
+    while True:
+        start = datetime.datetime.combine(day, datetime.time.min, tzinfo=datetime.timezone.utc)
+        if start >= cutoff:
+            break
+        end = min(start + datetime.timedelta(days=1), cutoff)
+        rows = _archive_day(day, start, end, batch_size, dry_run)
+        if rows:
+            result["days"] += 1
+            result["rows"] += rows
+        day += datetime.timedelta(days=1)
+    return result
+
+
+def _archive_day(day, start, end, batch_size, dry_run):
+    day_qs = AuditLog.objects.filter(timestamp__gte=start, timestamp__lt=end)
+    segment = AuditArchiveSegment.objects.filter(day=day).first()
+    last_id = segment.last_id if segment else 0
+    pending = day_qs.filter(id__gt=last_id)
+
+    if dry_run:
+        return pending.count()
+    if not pending.exists():
+        if segment:
+            # Rows a previous, interrupted run already archived.
+            day_qs.filter(id__lte=last_id).delete()
+        return 0
+
+    root = archive_dir()
+    relpath = segment_relpath(day)
+    path = root / relpath
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    count = 0
+    first_ts = last_ts = None
+    max_id = last_id
+
+    def new_records():
+        nonlocal count, first_ts, last_ts, max_id
+        rows = with_users(pending).order_by("-timestamp", "-id").iterator(chunk_size=batch_size)
+        for log in rows:
+            count += 1
+            max_id = max(max_id, log.id)
+            if first_ts is None or log.timestamp < first_ts:
+                first_ts = log.timestamp
+            if last_ts is None or log.timestamp > last_ts:
+                last_ts = log.timestamp
+            yield to_record(log)
+
+    # Write the merged day to a side file and swap it in, so a crash never
+    # leaves a half-written segment behind.
+    tmp_path = path.with_name(path.name + ".tmp")
+    old_count = 0
+
+    def archived():
+        nonlocal old_count
+        for record in iter_segment(segment, strict=True):
+            old_count += 1
+            yield record
+
+    try:
+        with open(tmp_path, "wb") as raw:
+            with gzip.open(raw, "wt", encoding="utf-8") as out:
+                merged = heapq.merge(archived() if segment else iter(()), new_records(),
+                                     key=record_key, reverse=True)
+                for record in merged:
+                    out.write(json.dumps(record, ensure_ascii=False, default=str))
+                    out.write("\n")
+            raw.flush()
+            os.fsync(raw.fileno())
+            size = raw.tell()
+        if segment and old_count != segment.row_count:
+            raise ArchiveError(f"{segment.path}: read {old_count} of {segment.row_count} archived rows")
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    if count == 0:
+        # The pending rows went away meanwhile
+        tmp_path.unlink()
+        return 0
+    os.replace(tmp_path, path)
+
+    # Segment index and rows live wherever the audit tables are routed
+    with transaction.atomic(using=router.db_for_write(AuditLog)):
+        if segment is None:
+            segment = AuditArchiveSegment(day=day, path=relpath, first_timestamp=first_ts,
+                                          last_timestamp=last_ts, last_id=max_id)
+        else:
+            segment.first_timestamp = min(segment.first_timestamp, first_ts)
+            segment.last_timestamp = max(segment.last_timestamp, last_ts)
+            segment.last_id = max_id
+        segment.row_count += count
+        segment.size_bytes = size
+        segment.save()
+        day_qs.filter(id__lte=max_id).delete()
+    bump("audit")
+    return count
+
+
+def iter_segment(segment, strict=False):
+    """
+    Stream a segment's indexed records, newest first. A missing or damaged
+    file ends the stream early, or raises ArchiveError when ``strict``.
+    """
+    path = archive_dir() / segment.path
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    # Written by a run that crashed before indexing it; still in the table
+                    if record["id"] <= segment.last_id:
+                        yield record
+    except (OSError, EOFError, ValueError) as exc:
+        # FileNotFoundError, gzip.BadGzipFile, truncated streams, bad JSON
+        if strict:
+            raise ArchiveError(f"{segment.path}: {exc}") from exc
+
+
+def matches(record, filters, search=None):
+    ts = datetime.datetime.fromisoformat(record["timestamp"])
+    if "since" in filters and ts < filters["since"]:
+        return False
+    if "until" in filters and ts >= filters["until"]:
+        return False
+    for key in ("action", "entity", "entity_id"):
+        if key in filters and record.get(key) != filters[key]:
+            return False
+    if "user" in filters and record.get("user_username") != filters["user"]:
+        return False
+    if search:
+        # Same semantics as SearchFilter: every term must match some field.
+        haystack = " ".join(str(record.get(k) or "") for k in SEARCH_KEYS).lower()
+        if not all(term in haystack for term in search.lower().split()):
+            return False
+    return True
+
+
+def query_archive(filters, search=None, before=None):
+    """
+    Yield archived records newest first, i.e. ordered by (-timestamp, -id).
+
+    ``before`` is a ``(timestamp, id)`` keyset position; only records that
+    sort after it are yielded.
+    """
+    segments = AuditArchiveSegment.objects.order_by("-day")
+    if "since" in filters:
+        segments = segments.filter(last_timestamp__gte=filters["since"])
+    if "until" in filters:
+        segments = segments.filter(first_timestamp__lt=filters["until"])
+    if before is not None:
+        segments = segments.filter(first_timestamp__lte=before[0])
+
+    for segment in segments.iterator():
+        # Segments are stored newest first: stream them, no sorting
+        for record in iter_segment(segment):
+            if before is not None and record_key(record) >= before:
+                continue
+            if matches(record, filters, search):
+                yield record
@@ -0,0 +1,181 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+from apps.core.events import audit_event_data, get_broker
+from apps.core.versions import bump
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": True,
+    "MAX_QUEUE": 10000,      # events held in memory before overflow kicks in
+    "BATCH_SIZE": 200,       # flush as soon as this many events are waiting
+    "FLUSH_INTERVAL": 1.0,   # ...or after this many seconds
+    "OVERFLOW": "drop",      # "drop": discard the new event, "sync": write it inline
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "AUDIT_BUFFER", {}))
+    return config
+
+
+class AuditBuffer:
+    """
+    In-process audit sink.
+
+    Requests only enqueue unsaved ``AuditLog`` instances; a daemon thread
+    drains the queue and writes them with ``bulk_create``. The thread is
+    started lazily (and restarted after a fork) so management commands and
+    pre-forking servers don't inherit a dead writer.
+    """
+
+    def __init__(self, max_queue, batch_size, flush_interval, overflow):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.enqueued = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def submit(self, entry):
+        self._ensure_started()
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            if self.overflow == "sync":
+                self._write([entry])
+            else:
+                with self._lock:
+                    self.dropped += 1
+            return
+        with self._lock:
+            self.enqueued += 1
+
+    def flush(self):
+        """Write everything currently queued from the calling thread."""
+        batch = self._drain(block=False)
+        while batch:
+            self._write(batch)
+            batch = self._drain(block=False)
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enqueued": self.enqueued,
+                "flushed": self.flushed,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "batches": self.batches,
+                "pending": self.queue.qsize(),
+            }
+
+    def _ensure_started(self):
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == pid and self._thread is not None and self._thread.is_alive():
+                return
+            if self._pid != pid:
+                # Forked child: the parent's queue and thread are not ours.
+                self.queue = queue.Queue(maxsize=self.queue.maxsize)
+                self._stop = threading.Event()
+            self._pid = pid
+            self._thread = threading.Thread(target=self._run, name="audit-buffer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                batch = self._drain(block=True)
+                if batch:
+                    self._write(batch)
+        finally:
+            # The writer thread has its own connections (default, and audit when split)
+            connections.close_all()
+
+    def _drain(self, block):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                if block:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    batch.append(self.queue.get(timeout=timeout))
+                else:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        from .models import AuditLog
+
+        try:
+            AuditLog.objects.bulk_create(batch, batch_size=self.batch_size)
+        except Exception:
+            logger.exception("Audit buffer failed to write %d events", len(batch))
+            with self._lock:
+                self.failed += len(batch)
+            return
+        with self._lock:
+            self.flushed += len(batch)
+            self.batches += 1
+        # bulk_create sends no post_save: invalidate audit-derived caches and
+        # push the stream events here instead.
+        bump("audit")
+        broker = get_broker()
+        for entry in batch:
+            broker.publish("audit", audit_event_data(entry), staff_only=True)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                config = get_config()
+                _buffer = AuditBuffer(
+                    max_queue=config["MAX_QUEUE"],
+                    batch_size=config["BATCH_SIZE"],
+                    flush_interval=config["FLUSH_INTERVAL"],
+                    overflow=config["OVERFLOW"],
+                )
+                atexit.register(_buffer.close)
+    return _buffer
+
+
+def record(entry):
+    """Persist an unsaved AuditLog, buffered unless AUDIT_BUFFER is disabled."""
+    if not get_config()["ENABLED"]:
+        entry.save()
+        return
+    get_buffer().submit(entry)
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from apps.audit.archive import ArchiveError, archive_older_than, retention_cutoff
+
+class Command(BaseCommand):
+    help = "Move audit rows older than the retention window into gzip NDJSON day segments"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=settings.AUDIT_RETENTION_DAYS,
+                            help="Keep this many days in the database (default: AUDIT_RETENTION_DAYS)")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would be archived")
+
+    def handle(self, *args, **options):
+        cutoff = retention_cutoff(options["days"])
+        try:
+            result = archive_older_than(cutoff, batch_size=options["batch_size"], dry_run=options["dry_run"])
+        except ArchiveError as e:
+            raise CommandError(f"Archiving stopped, nothing was deleted for that day: {e}")
+        verb = "Would archive" if options["dry_run"] else "Archived"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result['rows']} audit rows from {result['days']} days before {cutoff:%Y-%m-%d}"
+        ))
@@ -1,5 +1,6 @@
 from django.utils.deprecation import MiddlewareMixin
 from django.contrib.auth.models import AnonymousUser
+from .buffer import record
 from .models import AuditLog
 
 SENSITIVE_PATH_PREFIXES = (
@@ -39,7 +40,7 @@ class AuditMiddleware(MiddlewareMixin):
             elif path.startswith("/api/controls/"):
                 entity = "Control"
 
-            AuditLog.objects.create(
+            record(AuditLog(
                 user=user,
                 action=action,
                 entity=entity,
@@ -50,7 +51,7 @@ class AuditMiddleware(MiddlewareMixin):
                 user_agent=(request.META.get("HTTP_USER_AGENT") or "")[:300],
                 success=(200 <= response.status_code < 400),
                 meta={"status_code": response.status_code},
-            )
+            ))
         except Exception:
             # MVP: no rompas la app por auditoría
             pass
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0003_alter_auditlog_timestamp"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuditArchiveSegment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(unique=True)),
+                ("path", models.CharField(max_length=300)),
+                ("first_timestamp", models.DateTimeField()),
+                ("last_timestamp", models.DateTimeField()),
+                ("last_id", models.BigIntegerField()),
+                ("row_count", models.IntegerField(default=0)),
+                ("size_bytes", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["-day"],
+            },
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -15,9 +16,33 @@ class AuditLog(models.Model):
     user_agent = models.CharField(max_length=300, blank=True)
 
     success = models.BooleanField(default=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the event happens, not when the buffered writer flushes it.
+    timestamp = models.DateTimeField(default=timezone.now)
 
     meta = models.JSONField(default=dict, blank=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination: ORDER BY timestamp DESC, id DESC
+            models.Index(fields=["-timestamp", "-id"], name="audit_ts_id_idx"),
+        ]
+
     def __str__(self):
         return f"{self.timestamp} {self.action} {self.entity}:{self.entity_id}"
+
+class AuditArchiveSegment(models.Model):
+    """Index entry for one day of archived audit rows (gzip NDJSON on disk)."""
+    day = models.DateField(unique=True)
+    path = models.CharField(max_length=300)       # relative to AUDIT_ARCHIVE_DIR
+    first_timestamp = models.DateTimeField()
+    last_timestamp = models.DateTimeField()
+    last_id = models.BigIntegerField()            # highest AuditLog id already written
+    row_count = models.IntegerField(default=0)
+    size_bytes = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-day"]
+
+    def __str__(self):
+        return f"{self.day} ({self.row_count} rows)"
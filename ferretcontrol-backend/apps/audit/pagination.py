@@ -0,0 +1,5 @@
+from apps.core.pagination import KeysetPagination
+
+
+class AuditLogPagination(KeysetPagination):
+    timestamp_field = "timestamp"
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import AuditLog
+from .models import AuditLog, AuditArchiveSegment
 
 class AuditLogSerializer(serializers.ModelSerializer):
     user_username = serializers.CharField(source="user.username", read_only=True)
@@ -7,3 +7,8 @@ class AuditLogSerializer(serializers.ModelSerializer):
     class Meta:
         model = AuditLog
         fields = "__all__"
+
+class AuditArchiveSegmentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AuditArchiveSegment
+        fields = "__all__"
@@ -1,3 +1,237 @@
-from django.test import TestCase
+import datetime
+import gzip
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from . import buffer
+from .archive import ArchiveError, archive_dir, archive_older_than, iter_segment, query_archive
+from .models import AuditArchiveSegment, AuditLog
+
+UTC = datetime.timezone.utc
+DAY1 = datetime.datetime(2026, 1, 10, tzinfo=UTC)
+DAY2 = datetime.datetime(2026, 1, 11, tzinfo=UTC)
+CUTOFF = datetime.datetime(2026, 1, 12, tzinfo=UTC)
+
+
+@override_settings(AUDIT_BUFFER={"ENABLED": False})
+class AuditArchiveTests(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir, ignore_errors=True)
+        settings_override = override_settings(AUDIT_ARCHIVE_DIR=tmpdir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user("auditor", is_staff=True)
+
+    def log(self, when, **fields):
+        return AuditLog.objects.create(user=self.user, action="VIEW", entity="Risk", timestamp=when, **fields)
+
+    def archived_ids(self, **filters):
+        return [record["id"] for record in query_archive(filters)]
+
+    def test_archives_whole_days_newest_first(self):
+        a = self.log(DAY1 + datetime.timedelta(hours=1))
+        b = self.log(DAY1 + datetime.timedelta(hours=5))
+        c = self.log(DAY1 + datetime.timedelta(hours=5))  # same timestamp, higher id
+        d = self.log(DAY2 + datetime.timedelta(hours=2))
+        recent = self.log(CUTOFF + datetime.timedelta(hours=1))
+
+        self.assertEqual(archive_older_than(CUTOFF, dry_run=True), {"days": 2, "rows": 4})
+        self.assertEqual(AuditLog.objects.count(), 5)
+
+        self.assertEqual(archive_older_than(CUTOFF), {"days": 2, "rows": 4})
+        self.assertEqual(list(AuditLog.objects.values_list("id", flat=True)), [recent.id])
+        self.assertEqual(self.archived_ids(), [d.id, c.id, b.id, a.id])
+        segment = AuditArchiveSegment.objects.get(day=DAY1.date())
+        self.assertEqual((segment.row_count, segment.last_id), (3, c.id))
+        self.assertTrue((archive_dir() / segment.path).exists())
+        record = next(query_archive({}))
+        self.assertEqual((record["user_username"], record["action"]), ("auditor", "VIEW"))
+
+        # Rows that show up later for an archived day are merged into its segment
+        e = self.log(DAY1 + datetime.timedelta(hours=3))
+        f = self.log(DAY1 + datetime.timedelta(hours=23))
+        self.assertEqual(archive_older_than(CUTOFF), {"days": 1, "rows": 2})
+        self.assertEqual(self.archived_ids(), [d.id, f.id, c.id, b.id, e.id, a.id])
+        segment.refresh_from_db()
+        self.assertEqual((segment.row_count, segment.last_id), (5, f.id))
+        self.assertEqual(archive_older_than(CUTOFF), {"days": 0, "rows": 0})
+
+    def test_resumes_after_a_crash_without_duplicates(self):
+        a = self.log(DAY1 + datetime.timedelta(hours=1))
+        archive_older_than(CUTOFF)
+        b = self.log(DAY1 + datetime.timedelta(hours=2))
+
+        # The merged file is swapped in, then the run dies before indexing it
+        with mock.patch.object(AuditArchiveSegment, "save", side_effect=RuntimeError("crash")):
+            with self.assertRaises(RuntimeError):
+                archive_older_than(CUTOFF)
+        self.assertEqual(list(AuditLog.objects.values_list("id", flat=True)), [b.id])
+        self.assertEqual(self.archived_ids(), [a.id])
+
+        self.assertEqual(archive_older_than(CUTOFF), {"days": 1, "rows": 1})
+        self.assertEqual(self.archived_ids(), [b.id, a.id])
+        self.assertEqual(AuditArchiveSegment.objects.get().row_count, 2)
+        self.assertFalse(AuditLog.objects.exists())
+
+    def test_damaged_segment_stops_the_merge(self):
+        logs = [self.log(DAY1 + datetime.timedelta(minutes=i)) for i in range(50)]
+        archive_older_than(CUTOFF)
+        segment = AuditArchiveSegment.objects.get()
+        path = archive_dir() / segment.path
+        with gzip.open(path, "rb") as f:
+            data = f.read()
+        # Cut the stream after about half the records
+        with open(path, "wb") as f:
+            f.write(gzip.compress(data)[: len(gzip.compress(data)) // 2])
+        damaged = path.read_bytes()
+
+        new = self.log(DAY1 + datetime.timedelta(hours=12))
+        with self.assertRaises(ArchiveError):
+            archive_older_than(CUTOFF)
+        # Nothing was swapped in or deleted
+        self.assertEqual(path.read_bytes(), damaged)
+        self.assertFalse(Path(str(path) + ".tmp").exists())
+        self.assertTrue(AuditLog.objects.filter(pk=new.pk).exists())
+        segment.refresh_from_db()
+        self.assertEqual(segment.row_count, 50)
+
+        # Reads still return whatever is readable
+        readable = self.archived_ids()
+        self.assertLess(len(readable), 50)
+        self.assertEqual(readable, [log.id for log in reversed(logs)][: len(readable)])
+        with self.assertRaises(ArchiveError):
+            list(iter_segment(segment, strict=True))
+
+    def test_missing_segment_file_stops_the_merge(self):
+        self.log(DAY1)
+        archive_older_than(CUTOFF)
+        segment = AuditArchiveSegment.objects.get()
+        (archive_dir() / segment.path).unlink()
+        self.log(DAY1 + datetime.timedelta(hours=1))
+        with self.assertRaises(ArchiveError):
+            archive_older_than(CUTOFF)
+        self.assertEqual(AuditLog.objects.count(), 1)
+        self.assertEqual(self.archived_ids(), [])
+
+    def test_query_archive_pages_by_keyset(self):
+        logs = []
+        for day in (DAY1, DAY2):
+            for hour in (1, 1, 1, 6, 9):
+                logs.append(self.log(day + datetime.timedelta(hours=hour)))
+        archive_older_than(CUTOFF)
+        expected = [log.id for log in sorted(logs, key=lambda log: (log.timestamp, log.id), reverse=True)]
+        self.assertEqual(self.archived_ids(), expected)
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url, seen = "/api/audit/archive/?page_size=3", []
+        while url:
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data["results"]), 3)
+            seen += [record["id"] for record in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(seen, expected)
+
+        # Filters apply across segments
+        self.assertEqual(self.archived_ids(since=DAY2), expected[:5])
+        self.assertEqual(self.archived_ids(until=DAY2), expected[5:])
+        self.assertEqual(client.get("/api/audit/archive/?cursor=nope").status_code, 404)
+
+
+def event(n=0):
+    return AuditLog(action="VIEW", entity="Risk", entity_id=str(n))
+
+
+@override_settings(AUDIT_BUFFER={"ENABLED": False})
+class AuditBufferTests(TestCase):
+    def make_buffer(self, **options):
+        config = {"max_queue": 2, "batch_size": 2, "flush_interval": 0.05, "overflow": "drop"}
+        config.update(options)
+        audit_buffer = buffer.AuditBuffer(**config)
+        # No writer thread: the queue only drains when the test says so
+        patcher = mock.patch.object(audit_buffer, "_ensure_started")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return audit_buffer
+
+    def test_drop_overflow_discards_new_events(self):
+        audit_buffer = self.make_buffer()
+        for n in range(5):
+            audit_buffer.submit(event(n))
+        self.assertEqual(audit_buffer.stats(), {
+            "enqueued": 2, "flushed": 0, "dropped": 3, "failed": 0, "batches": 0, "pending": 2,
+        })
+        self.assertFalse(AuditLog.objects.exists())
+
+        audit_buffer.flush()
+        self.assertEqual(sorted(AuditLog.objects.values_list("entity_id", flat=True)), ["0", "1"])
+        stats = audit_buffer.stats()
+        self.assertEqual((stats["flushed"], stats["batches"], stats["pending"]), (2, 1, 0))
+
+    def test_sync_overflow_writes_inline(self):
+        audit_buffer = self.make_buffer(max_queue=1, overflow="sync")
+        for n in range(3):
+            audit_buffer.submit(event(n))
+        self.assertEqual(sorted(AuditLog.objects.values_list("entity_id", flat=True)), ["1", "2"])
+        stats = audit_buffer.stats()
+        self.assertEqual((stats["enqueued"], stats["flushed"], stats["dropped"], stats["pending"]), (1, 2, 0, 1))
+
+    def test_batches_close_on_size_or_interval(self):
+        audit_buffer = self.make_buffer(max_queue=10, batch_size=3, flush_interval=0.2)
+        for n in range(4):
+            audit_buffer.submit(event(n))
+
+        started = time.monotonic()
+        self.assertEqual(len(audit_buffer._drain(block=True)), 3)
+        self.assertLess(time.monotonic() - started, 0.2)  # full batch: no wait
+
+        started = time.monotonic()
+        self.assertEqual(len(audit_buffer._drain(block=True)), 1)
+        self.assertGreaterEqual(time.monotonic() - started, 0.15)  # partial batch: waits out the interval
+
+    def test_failed_writes_are_counted(self):
+        audit_buffer = self.make_buffer()
+        audit_buffer.submit(event())
+        with mock.patch.object(AuditLog.objects, "bulk_create", side_effect=RuntimeError("db")):
+            with self.assertLogs("apps.audit.buffer", "ERROR"):
+                audit_buffer.flush()
+        stats = audit_buffer.stats()
+        self.assertEqual((stats["flushed"], stats["failed"], stats["pending"]), (0, 1, 0))
+
+
+@override_settings(AUDIT_BUFFER={"ENABLED": True, "MAX_QUEUE": 4, "BATCH_SIZE": 2, "FLUSH_INTERVAL": 0.05})
+class AuditBufferThreadTests(TransactionTestCase):
+    # The writer thread has its own connection, so the rows must be committed
+
+    def test_writer_thread_flushes_and_exit_drains(self):
+        with mock.patch.object(buffer, "_buffer", None), mock.patch.object(buffer.atexit, "register") as register:
+            audit_buffer = buffer.get_buffer()
+            register.assert_called_once_with(audit_buffer.close)
+            self.assertEqual(audit_buffer.queue.maxsize, 4)
+
+            for n in range(3):
+                buffer.record(event(n))
+            deadline = time.monotonic() + 5
+            while audit_buffer.stats()["flushed"] < 3 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(AuditLog.objects.count(), 3)
+            self.assertGreaterEqual(audit_buffer.stats()["batches"], 2)
+
+            # What the interpreter runs on exit: stop the writer, write what is left
+            audit_buffer._stop.set()
+            audit_buffer._thread.join(timeout=5)
+            self.assertFalse(audit_buffer._thread.is_alive())
+            audit_buffer.queue.put_nowait(event(3))
+            register.call_args.args[0]()
+            self.assertEqual(AuditLog.objects.count(), 4)
+            self.assertEqual(audit_buffer.stats()["pending"], 0)
+            self.assertEqual(audit_buffer.stats()["flushed"], 4)
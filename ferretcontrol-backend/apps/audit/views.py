@@ -1,10 +1,97 @@
-from rest_framework import viewsets, filters
-from .models import AuditLog
-from .serializers import AuditLogSerializer
+from datetime import datetime
+from itertools import islice
 
-class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = AuditLog.objects.select_related("user").all().order_by("-timestamp")
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import viewsets, filters, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from apps.core.pagination import decode_position, encode_position
+from .archive import query_archive
+from .buffer import get_buffer
+from .export import FORMATS, encode_chunks, iter_records
+from .filters import AuditLogFilter, get_audit_filters, users_joinable, with_users
+from .models import AuditLog, AuditArchiveSegment
+from .pagination import AuditLogPagination
+from apps.core.conditional import ConditionalGetMixin
+from .serializers import AuditLogSerializer, AuditArchiveSegmentSerializer
+
+class AuditLogViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    # Ordering is fixed to (-timestamp, -id) by the keyset paginator.
+    queryset = AuditLog.objects.all().order_by("-timestamp", "-id")
+    etag_collections = ("audit", "users")
     serializer_class = AuditLogSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ["action", "entity", "entity_id", "path", "user__username"]
-    ordering_fields = ["timestamp", "action", "entity"]
+    pagination_class = AuditLogPagination
+    filter_backends = [AuditLogFilter, filters.SearchFilter]
+
+    @property
+    def search_fields(self):
+        # Usernames can't be joined when the audit tables live in their own database
+        fields = ["action", "entity", "entity_id", "path"]
+        return fields + ["user__username"] if users_joinable() else fields
+
+    def get_queryset(self):
+        return with_users(super().get_queryset())
+
+    @action(detail=False, methods=['get'])
+    def archive(self, request):
+        """Query archived (retention) segments with the same filters as the list."""
+        audit_filters = get_audit_filters(request.query_params)
+        page_size = self.paginator.get_page_size(request)
+
+        before = None
+        token = request.query_params.get(self.paginator.cursor_query_param)
+        if token:
+            try:
+                position, _ = decode_position(token)
+                before = position[:2]
+            except ValueError:
+                raise NotFound(self.paginator.invalid_cursor_message)
+
+        search = request.query_params.get("search")
+        records = list(islice(query_archive(audit_filters, search, before), page_size + 1))
+        next_link = None
+        if len(records) > page_size:
+            records = records[:page_size]
+            last = records[-1]
+            token = encode_position(datetime.fromisoformat(last["timestamp"]), last["id"])
+            next_link = replace_query_param(
+                request.build_absolute_uri(), self.paginator.cursor_query_param, token
+            )
+        return Response({"next": next_link, "previous": None, "results": records})
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        GET /api/audit/export/?type=csv|ndjson&compress=gzip plus the list
+        filters (since, until, action, entity, entity_id, user, search).
+        Streams every matching row, oldest first.
+        """
+        fmt = request.query_params.get("type", "csv")
+        if fmt not in FORMATS:
+            return Response({"error": "Formato no soportado: use csv o ndjson"}, status=status.HTTP_400_BAD_REQUEST)
+        compress = request.query_params.get("compress") == "gzip"
+
+        queryset = self.filter_queryset(self.get_queryset()).order_by("timestamp", "id")
+        filename = f"audit-{timezone.now():%Y%m%d-%H%M%S}.{fmt}"
+        if compress:
+            filename += ".gz"
+        response = StreamingHttpResponse(
+            encode_chunks(iter_records(queryset, fmt), compress=compress),
+            content_type="application/gzip" if compress else f"{FORMATS[fmt]}; charset=utf-8",
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def archive_segments(self, request):
+        segments = AuditArchiveSegment.objects.all()
+        return Response(AuditArchiveSegmentSerializer(segments, many=True).data)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def buffer_stats(self, request):
+        # Counters of this worker process's audit buffer
+        return Response(get_buffer().stats())
@@ -1,15 +1,20 @@
 from rest_framework import viewsets, filters
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.search import FullTextSearchFilter
 from .models import Control, RiskControl
 from .serializers import ControlSerializer, RiskControlSerializer
 
-class ControlViewSet(viewsets.ModelViewSet):
+class ControlViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Control.objects.all().order_by("code")
+    etag_collections = ("controls",)
     serializer_class = ControlSerializer
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [FullTextSearchFilter]
+    search_index = "controls"
     search_fields = ["code", "name", "domain", "description"]
 
-class RiskControlViewSet(viewsets.ModelViewSet):
+class RiskControlViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = RiskControl.objects.select_related("risk", "control").all()
+    etag_collections = ("risk_controls", "risks", "controls")
     serializer_class = RiskControlSerializer
     filter_backends = [filters.SearchFilter]
     search_fields = ["risk__title", "control__code", "control__name"]
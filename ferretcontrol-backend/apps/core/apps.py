@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.core"
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from . import events, flags, search, versions
+
+        search.connect_signals()
+        versions.connect_signals()
+        events.connect_signals()
+        flags.connect_signals()
+        post_migrate.connect(search.create_missing_indexes, sender=self)
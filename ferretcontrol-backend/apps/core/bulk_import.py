@@ -0,0 +1,175 @@
+"""
+Streaming bulk import for the asset and risk registers.
+
+Rows are read one at a time from CSV or NDJSON, validated ``chunk_size``
+at a time and inserted with ``bulk_create``, one transaction per chunk.
+Invalid rows are skipped and reported by line number while the valid rows
+of the same chunk are still imported. Memory use is bounded by the chunk
+size and MAX_REPORTED_ERRORS, not by the size of the file.
+
+bulk_create sends no signals, so each importer updates what the signals
+would have (search index, collection versions, ...) in ``after_insert``.
+"""
+import codecs
+import csv
+import json
+
+from django.db import transaction
+from django.utils.module_loading import import_string
+from rest_framework import serializers, status
+from rest_framework.response import Response
+
+from .versions import bump
+
+FORMATS = ("csv", "ndjson")
+MAX_REPORTED_ERRORS = 1000
+
+IMPORTERS = {
+    "assets": "apps.assets.importers.AssetImporter",
+    "risks": "apps.risks.importers.RiskImporter",
+}
+
+
+def get_importer(name):
+    return import_string(IMPORTERS[name])
+
+
+def iter_lines(stream):
+    """Decode a binary stream (request body, upload, file) line by line."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    for line in stream:
+        yield decoder.decode(line)
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def read_rows(stream, fmt):
+    """Yield ``(line, row, error)``; exactly one of ``row`` and ``error`` is set."""
+    if fmt == "csv":
+        reader = csv.DictReader(iter_lines(stream))
+        for row in reader:
+            if None in row:
+                yield reader.line_num, None, {"non_field_errors": ["Más columnas que en la cabecera."]}
+                continue
+            # Empty cells mean "use the default", like a missing JSON key
+            yield reader.line_num, {k: v for k, v in row.items() if v != ""}, None
+    elif fmt == "ndjson":
+        for line_num, line in enumerate(iter_lines(stream), 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_num, None, {"non_field_errors": ["JSON inválido."]}
+                continue
+            if not isinstance(row, dict):
+                yield line_num, None, {"non_field_errors": ["Se esperaba un objeto JSON."]}
+                continue
+            yield line_num, row, None
+    else:
+        raise ValueError(f"Unknown import format: {fmt}")
+
+
+class BulkImporter:
+    """
+    Subclasses set ``model``, ``serializer_class`` (input validation, no
+    relational fields) and ``version``, and may override ``prepare_chunk``
+    (one query per chunk for lookups), ``build`` and ``after_insert``.
+    """
+    model = None
+    serializer_class = None
+    version = None
+    chunk_size = 500
+
+    def __init__(self, user=None, dry_run=False, chunk_size=None):
+        self.user = user
+        self.dry_run = dry_run
+        if chunk_size:
+            self.chunk_size = chunk_size
+
+    def run(self, rows):
+        report = {"imported": 0, "failed": 0, "errors": [], "errors_truncated": False, "dry_run": self.dry_run}
+        chunk = []
+        for item in rows:
+            chunk.append(item)
+            if len(chunk) >= self.chunk_size:
+                self.process_chunk(chunk, report)
+                chunk = []
+        if chunk:
+            self.process_chunk(chunk, report)
+        return report
+
+    def process_chunk(self, chunk, report):
+        context = self.prepare_chunk([row for _, row, error in chunk if error is None])
+        objs = []
+        for line, row, error in chunk:
+            if error is None:
+                serializer = self.serializer_class(data=row)
+                if serializer.is_valid():
+                    try:
+                        objs.append(self.build(serializer.validated_data, context))
+                        continue
+                    except serializers.ValidationError as exc:
+                        error = exc.detail
+                else:
+                    error = serializer.errors
+            report["failed"] += 1
+            if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                report["errors"].append({"line": line, "errors": error})
+            else:
+                report["errors_truncated"] = True
+
+        if objs and not self.dry_run:
+            with transaction.atomic():
+                objs = self.model.objects.bulk_create(objs)
+                self.after_insert(objs)
+            bump(self.version)
+        report["imported"] += len(objs)
+
+    def prepare_chunk(self, rows):
+        return {}
+
+    def build(self, data, context):
+        return self.model(**data)
+
+    def after_insert(self, objs):
+        pass
+
+
+def detect_format(request):
+    fmt = request.query_params.get("type")
+    if fmt:
+        return fmt
+    upload = request.FILES.get("file") if request.content_type.startswith("multipart/") else None
+    name = upload.name.lower() if upload else ""
+    if name.endswith(".csv") or request.content_type.startswith("text/csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in request.content_type:
+        return "ndjson"
+    return None
+
+
+def import_response(importer_class, request):
+    """
+    Shared body of the ``import`` actions. Accepts the file as the raw
+    request body (``Content-Type: text/csv`` or ``application/x-ndjson``)
+    or as a multipart ``file`` upload; ``?type=csv|ndjson`` overrides the
+    detection and ``?dry_run=1`` only validates.
+    """
+    fmt = detect_format(request)
+    if fmt not in FORMATS:
+        return Response({"error": "Formato no soportado: use CSV o NDJSON"}, status=status.HTTP_400_BAD_REQUEST)
+    if request.content_type.startswith("multipart/"):
+        stream = request.FILES.get("file")
+    else:
+        stream = request.stream
+    if stream is None:
+        return Response({"error": "Archivo requerido"}, status=status.HTTP_400_BAD_REQUEST)
+
+    importer = importer_class(user=request.user, dry_run=request.query_params.get("dry_run") in ("1", "true"))
+    try:
+        report = importer.run(read_rows(stream, fmt))
+    except (UnicodeDecodeError, csv.Error) as e:
+        return Response({"error": f"Archivo ilegible: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(report)
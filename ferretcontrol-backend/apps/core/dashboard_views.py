@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.assets.models import InformationAsset
+from apps.audit.models import AuditLog
+from apps.risks.models import Risk
+from .versions import get_versions
+
+MAX_RECENT = 20
+
+
+def _counts(queryset, field):
+    return {row[field]: row["n"] for row in queryset.values(field).annotate(n=Count("id")).order_by()}
+
+
+def _recent_audit(recent):
+    # Usernames are looked up by id rather than joined: the audit tables may
+    # live in their own database (settings_production).
+    rows = list(
+        AuditLog.objects.order_by("-timestamp", "-id")
+        .values("id", "action", "entity", "entity_id", "success", "timestamp", "user_id")[:recent]
+    )
+    usernames = dict(
+        User.objects.filter(pk__in={row["user_id"] for row in rows if row["user_id"]})
+        .values_list("pk", "username")
+    )
+    for row in rows:
+        row["user_username"] = usernames.get(row.pop("user_id"))
+    return rows
+
+
+def build_summary(recent):
+    risk_totals = Risk.objects.aggregate(
+        total=Count("id"),
+        open_high_critical=Count("id", filter=Q(status="open", level__in=["high", "critical"])),
+    )
+    since = timezone.now() - timedelta(hours=24)
+    return {
+        "assets": {
+            "total": InformationAsset.objects.count(),
+            "by_classification": _counts(InformationAsset.objects.all(), "classification"),
+            "by_criticality": _counts(InformationAsset.objects.all(), "criticality"),
+        },
+        "risks": {
+            "total": risk_totals["total"],
+            "open_high_critical": risk_totals["open_high_critical"],
+            "by_level": _counts(Risk.objects.all(), "level"),
+            "by_status": _counts(Risk.objects.all(), "status"),
+            "recent": list(
+                Risk.objects.order_by("-created_at")
+                .values("id", "title", "level", "score", "status", "created_at", "asset_id", asset_name=F("asset__name"))[:recent]
+            ),
+        },
+        "audit": {
+            "last_24h": AuditLog.objects.filter(timestamp__gte=since).count(),
+            "recent": _recent_audit(recent),
+        },
+        "generated_at": timezone.now(),
+    }
+
+
+class DashboardSummaryView(APIView):
+    """
+    Counts and recent items for the Dashboard, computed with aggregate
+    queries and cached for DASHBOARD_SUMMARY_TTL seconds. The cache key
+    embeds the assets/risks collection versions, so any write to those
+    tables invalidates it immediately. The audit part is only as fresh as
+    the TTL: every audited GET writes an audit row, so keying on the audit
+    version would drop the cache on every buffer flush while anyone browses.
+    """
+
+    def get(self, request):
+        try:
+            recent = min(max(int(request.query_params.get("recent", 5)), 0), MAX_RECENT)
+        except ValueError:
+            recent = 5
+
+        versions = get_versions("assets", "risks")
+        key = "dashboard-summary:{}:{}".format(recent, ":".join(str(v) for v in versions))
+        summary = cache.get(key)
+        if summary is None:
+            summary = build_summary(recent)
+            cache.set(key, summary, settings.DASHBOARD_SUMMARY_TTL)
+        return Response(summary)
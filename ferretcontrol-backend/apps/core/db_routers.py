@@ -0,0 +1,45 @@
+"""
+Routing of whole apps or single models to their own database.
+
+``AppDatabaseRouter`` reads DATABASE_APPS_MAPPING. Its keys are app
+labels ("audit") or model labels ("accounts.SecurityNotification"); a
+model label wins over its app label. Mapped models are read, written and
+migrated only on their alias. Everything else stays on "default".
+
+Relations across databases are allowed, but only as plain ids: SQL
+can't join two SQLite files. Code that joins a mapped model to the
+models on "default" must check ``same_database`` first and fall back to
+prefetching or an id lookup.
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, router
+
+
+def mapped_alias(app_label, model_name=None):
+    mapping = getattr(settings, "DATABASE_APPS_MAPPING", {})
+    if model_name:
+        for label, alias in mapping.items():
+            if label.lower() == f"{app_label}.{model_name}".lower():
+                return alias
+    return mapping.get(app_label)
+
+
+def same_database(*models):
+    return len({router.db_for_read(model) for model in models}) == 1
+
+
+class AppDatabaseRouter:
+    def _alias(self, model):
+        return mapped_alias(model._meta.app_label, model._meta.model_name) or DEFAULT_DB_ALIAS
+
+    def db_for_read(self, model, **hints):
+        return self._alias(model)
+
+    def db_for_write(self, model, **hints):
+        return self._alias(model)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == (mapped_alias(app_label, model_name) or DEFAULT_DB_ALIAS)
@@ -0,0 +1,220 @@
+"""
+Real-time events pushed to /api/stream/ (Server-Sent Events).
+
+Code publishes through ``get_broker().publish(...)``; the stream view
+subscribes per connection. ``InProcessBroker`` fans out to the
+connections of the current process and keeps a short history so a client
+reconnecting with ``Last-Event-ID`` gets what it missed. A shared backend
+(e.g. Redis pub/sub) can be plugged in through EVENT_STREAM["BROKER"] by
+implementing the same ``publish``/``subscribe`` methods.
+
+With ``InProcessBroker``, event ids and history belong to one process and
+start again at 1 on restart. ``Last-Event-ID`` resume therefore only
+works when the client reconnects to the same, still running worker.
+Anywhere else the id means nothing: the client gets no backlog, just new
+events, and should refetch what it shows. A shared broker has to issue
+ids that are global and increasing for resume to work across workers.
+"""
+import asyncio
+import itertools
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+DEFAULTS = {
+    "BROKER": "apps.core.events.InProcessBroker",
+    "HEARTBEAT": 15,      # seconds between keep-alive comments
+    "HISTORY": 1000,      # events kept for Last-Event-ID resume
+    "QUEUE_SIZE": 500,    # events buffered per slow connection before it is dropped
+    "TICKET_TTL": 30,     # seconds a /api/stream/ticket/ ticket can be used to connect
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "EVENT_STREAM", {}))
+    return config
+
+
+@dataclass
+class Event:
+    id: int
+    type: str
+    data: dict
+    user_ids: frozenset = None              # None: every authenticated user
+    exclude_user_ids: frozenset = frozenset()
+    staff_only: bool = False
+
+    def visible_to(self, user):
+        if self.staff_only and not user.is_staff:
+            return False
+        if user.pk in self.exclude_user_ids:
+            return False
+        return self.user_ids is None or user.pk in self.user_ids
+
+
+@dataclass(eq=False)
+class Subscription:
+    broker: "InProcessBroker"
+    user: object
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue
+    overflowed: bool = field(default=False)
+
+    def deliver(self, event):
+        if event.visible_to(self.user):
+            self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # The client can't keep up; end the stream and let it resume
+            # from its Last-Event-ID.
+            self.overflowed = True
+            self.close()
+
+    async def get(self):
+        """Next event, or None once the connection has overflowed."""
+        if self.overflowed:
+            return None
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    def __init__(self, history=1000, queue_size=500):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._history = deque(maxlen=history)
+        self._subscribers = set()
+
+    def publish(self, type, data, user_ids=None, exclude_user_ids=(), staff_only=False):
+        with self._lock:
+            event = Event(
+                id=next(self._ids),
+                type=type,
+                data=data,
+                user_ids=None if user_ids is None else frozenset(user_ids),
+                exclude_user_ids=frozenset(exclude_user_ids),
+                staff_only=staff_only,
+            )
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.deliver(event)
+        return event
+
+    def subscribe(self, user, last_event_id=None):
+        """
+        Register a connection from inside its event loop. Events newer than
+        ``last_event_id`` that are still in the history are queued first.
+        """
+        subscription = Subscription(
+            broker=self,
+            user=user,
+            loop=asyncio.get_running_loop(),
+            queue=asyncio.Queue(maxsize=self.queue_size),
+        )
+        with self._lock:
+            self._subscribers.add(subscription)
+            backlog = [e for e in self._history if last_event_id is not None and e.id > last_event_id]
+        for event in backlog[-self.queue_size:]:
+            if event.visible_to(user):
+                subscription.queue.put_nowait(event)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                config = get_config()
+                _broker = import_string(config["BROKER"])(
+                    history=config["HISTORY"], queue_size=config["QUEUE_SIZE"]
+                )
+    return _broker
+
+
+def publish_on_commit(type, data, using=None, **audience):
+    """
+    Publish once the surrounding transaction on database ``using`` commits
+    (immediately in autocommit).
+    """
+    transaction.on_commit(lambda: get_broker().publish(type, data, **audience), using=using)
+
+
+def notification_event_data(notification):
+    return {
+        "id": notification.id,
+        "title": notification.title,
+        "alert_type": notification.alert_type,
+        "created_at": notification.created_at.isoformat(),
+    }
+
+
+def audit_event_data(log):
+    return {
+        "id": log.id,
+        "action": log.action,
+        "entity": log.entity,
+        "path": log.path,
+        "success": log.success,
+        "user_username": log.user.username if log.user_id else None,
+        "timestamp": log.timestamp.isoformat(),
+    }
+
+
+def connect_signals():
+    from django.db.models.signals import post_save
+
+    def on_notification(sender, instance, created, **kwargs):
+        if created:
+            publish_on_commit("notification", notification_event_data(instance), using=kwargs["using"],
+                              user_ids=[instance.user_id])
+
+    def on_broadcast(sender, instance, created, **kwargs):
+        if created:
+            publish_on_commit("notification", {
+                "id": f"b{instance.id}",
+                "title": instance.title,
+                "alert_type": instance.alert_type,
+                "created_at": instance.created_at.isoformat(),
+            }, using=kwargs["using"], exclude_user_ids=[instance.created_by_id] if instance.created_by_id else ())
+
+    def on_forum_post(sender, instance, created, **kwargs):
+        if created:
+            publish_on_commit("forum", {
+                "id": instance.id,
+                "parent": instance.parent_id,
+                "author_username": instance.author.username,
+                "content": instance.content[:200],
+                "created_at": instance.created_at.isoformat(),
+            }, using=kwargs["using"])
+
+    def on_audit(sender, instance, created, **kwargs):
+        if created:
+            publish_on_commit("audit", audit_event_data(instance), using=kwargs["using"], staff_only=True)
+
+    post_save.connect(on_notification, sender="accounts.SecurityNotification", weak=False,
+                      dispatch_uid="events_notification")
+    post_save.connect(on_broadcast, sender="accounts.BroadcastNotification", weak=False,
+                      dispatch_uid="events_broadcast")
+    post_save.connect(on_forum_post, sender="forum.ForumPost", weak=False, dispatch_uid="events_forum")
+    post_save.connect(on_audit, sender="audit.AuditLog", weak=False, dispatch_uid="events_audit")
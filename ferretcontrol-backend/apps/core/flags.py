@@ -0,0 +1,65 @@
+"""
+Feature flags backed by SystemSetting.
+
+``get_flag(key, default)`` reads from a process-local snapshot of every
+setting. The snapshot is stamped with the "settings" collection version
+(apps.core.versions), which every SystemSetting write bumps; each worker
+compares its stamp with the shared version at most once every
+FLAGS_RECHECK_INTERVAL seconds and reloads lazily when it changed. A flag
+check is therefore a dict lookup, plus one cache read per interval.
+
+Versions live in the configured cache, so workers only see each other's
+writes if CACHES points at a shared backend.
+"""
+import threading
+import time
+
+from django.conf import settings
+
+from .versions import get_version
+
+_lock = threading.Lock()
+_snapshot = {}
+_version = None
+_checked_at = 0.0
+
+
+def get_flag(key, default=False):
+    return _current().get(key, default)
+
+
+def all_flags():
+    return dict(_current())
+
+
+def invalidate():
+    """Force a reload on the next check (used after local writes)."""
+    global _version
+    with _lock:
+        _version = None
+
+
+def _current():
+    global _snapshot, _version, _checked_at
+    now = time.monotonic()
+    if _version is not None and now - _checked_at < getattr(settings, "FLAGS_RECHECK_INTERVAL", 1.0):
+        return _snapshot
+    version = get_version("settings")
+    with _lock:
+        if version != _version:
+            from .models import SystemSetting
+
+            _snapshot = dict(SystemSetting.objects.values_list("key", "value"))
+            _version = version
+        _checked_at = now
+        return _snapshot
+
+
+def connect_signals():
+    from django.db.models.signals import post_delete, post_save
+
+    def on_change(sender, **kwargs):
+        invalidate()
+
+    post_save.connect(on_change, sender="core.SystemSetting", weak=False, dispatch_uid="flags_save")
+    post_delete.connect(on_change, sender="core.SystemSetting", weak=False, dispatch_uid="flags_delete")
@@ -0,0 +1,169 @@
+"""
+Per-request SQL instrumentation.
+
+``SQLInstrumentationMiddleware`` samples SQL_INSTRUMENTATION["SAMPLE_RATE"]
+of the requests. For a sampled request it wraps every database
+connection with ``execute_wrapper`` to count and time the statements. It
+then adds a ``Server-Timing`` header that browser dev tools show under
+Timing:
+
+    db;dur=12.4;desc="37 queries", serialize;dur=3.1, total;dur=20.8
+
+``serialize`` is the time spent rendering a DRF/template response.
+Requests slower than SLOW_MS or issuing more than MAX_QUERIES statements
+are logged with their endpoint and their most expensive statements. Those
+statements are grouped by SQL text, so an N+1 shows up as a single
+statement that ran N times. Requests that are not sampled skip all of
+this, so the cost in production is one ``random()`` call each.
+
+The middleware runs sync or async, whichever the stack below it is, so
+under ASGI it doesn't force async views such as /api/stream/ through a
+sync adapter. Streaming responses (exports, the event stream) run most
+of their queries after the headers are sent, so they are not measured.
+"""
+import contextlib
+import logging
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": True,
+    "SAMPLE_RATE": 0.05,    # fraction of requests instrumented
+    "SLOW_MS": 500,         # log requests slower than this...
+    "MAX_QUERIES": 50,      # ...or issuing more statements than this
+    "TOP_STATEMENTS": 5,    # statements included in the log entry
+    "SERVER_TIMING": True,  # add the Server-Timing header to sampled responses
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "SQL_INSTRUMENTATION", {}))
+    return config
+
+
+class QueryRecorder:
+    """``execute_wrapper`` callable collecting count and time per SQL statement."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = {}    # sql -> [executions, seconds]
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            stat = self.statements.setdefault(sql, [0, 0.0])
+            stat[0] += 1
+            stat[1] += elapsed
+
+    def top(self, n):
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)
+        return [
+            {"sql": sql[:500], "count": count, "ms": round(seconds * 1000, 2)}
+            for sql, (count, seconds) in ranked[:n]
+        ]
+
+
+class SQLInstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        config = get_config()
+        if not config["ENABLED"] or random.random() >= config["SAMPLE_RATE"]:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        request._sql_instrumentation = {"render": 0.0}
+        start = time.perf_counter()
+        with self.recording(recorder):
+            response = self.get_response(request)
+        return self.report(request, response, recorder, time.perf_counter() - start, config)
+
+    async def __acall__(self, request):
+        config = get_config()
+        if not config["ENABLED"] or random.random() >= config["SAMPLE_RATE"]:
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        request._sql_instrumentation = {"render": 0.0}
+        start = time.perf_counter()
+        # The connections are shared with the sync views' thread (see asgiref.local)
+        with self.recording(recorder):
+            response = await self.get_response(request)
+        return self.report(request, response, recorder, time.perf_counter() - start, config)
+
+    @contextlib.contextmanager
+    def recording(self, recorder):
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            yield
+
+    def report(self, request, response, recorder, total, config):
+        if response.streaming:
+            return response
+        render = request._sql_instrumentation["render"]
+
+        if config["SERVER_TIMING"]:
+            metrics = [
+                f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries"',
+                f"serialize;dur={render * 1000:.1f}",
+                f"total;dur={total * 1000:.1f}",
+            ]
+            existing = response.get("Server-Timing")
+            response["Server-Timing"] = ", ".join([existing, *metrics] if existing else metrics)
+
+        if total * 1000 > config["SLOW_MS"] or recorder.count > config["MAX_QUERIES"]:
+            match = request.resolver_match
+            # Group by URL pattern rather than by concrete path (ids, slugs)
+            route = match.route.replace("^", "").replace("$", "") if match else None
+            endpoint = f"{request.method} /{route}" if route else f"{request.method} {request.path}"
+            top = recorder.top(config["TOP_STATEMENTS"])
+            logger.warning(
+                "Slow request %s: %.1fms total, %d queries in %.1fms, serialize %.1fms (status %s)\n%s",
+                endpoint, total * 1000, recorder.count, recorder.duration * 1000, render * 1000,
+                response.status_code,
+                "\n".join(f"  {stat['count']}x {stat['ms']:.1f}ms {stat['sql']}" for stat in top),
+                # Structured copy for JSON log formatters
+                extra={
+                    "endpoint": endpoint,
+                    "path": request.path,
+                    "queries": recorder.count,
+                    "db_ms": round(recorder.duration * 1000, 2),
+                    "total_ms": round(total * 1000, 2),
+                    "top_statements": top,
+                },
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        # Called just before the response is rendered; time the rendering.
+        timing = getattr(request, "_sql_instrumentation", None)
+        if timing is not None:
+            start = time.perf_counter()
+
+            def rendered(response):
+                timing["render"] += time.perf_counter() - start
+
+            response.add_post_render_callback(rendered)
+        return response
@@ -0,0 +1,226 @@
+import contextlib
+import json
+import math
+import os
+import platform
+import shutil
+import tempfile
+import time
+
+import django
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_databases, setup_test_environment, teardown_databases,
+    teardown_test_environment,
+)
+from django.utils import timezone
+from apps.core.synthetic import DEFAULT_COUNTS, SYNTHETIC_PASSWORD, generate
+
+# Routes outside the router that are read on every page load
+EXTRA_GETS = [
+    "/api/access-control/stats/",
+    "/api/access-control/stats/trend/",
+    "/api/dashboard/summary/",
+]
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Command(BaseCommand):
+    help = ("Benchmark every API endpoint on a throwaway database seeded with synthetic data: "
+            "p50/p95/p99 latency, SQL queries and response size, optionally compared with a previous run")
+
+    def add_arguments(self, parser):
+        for name, default in DEFAULT_COUNTS.items():
+            parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default,
+                                help=f"Synthetic {name.replace('_', ' ')} to create (default {default})")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--iterations", type=int, default=30, help="Timed requests per endpoint")
+        parser.add_argument("--warmup", type=int, default=2, help="Untimed requests per endpoint before timing")
+        parser.add_argument("--only", action="append", default=[],
+                            help="Only endpoints whose path contains this text (repeatable)")
+        parser.add_argument("--output", default="bench_endpoints.json", help="Where to write the JSON results")
+        parser.add_argument("--compare", help="Previous results file; exit non-zero on regression")
+        parser.add_argument("--tolerance", type=float, default=0.25,
+                            help="Allowed relative p95 slowdown before it counts as a regression (default 0.25)")
+        parser.add_argument("--min-delta-ms", type=float, default=2.0,
+                            help="Ignore p95 slowdowns smaller than this many ms (timer noise)")
+        parser.add_argument("--real-hasher", action="store_true",
+                            help="Keep the configured password hasher (default: MD5, so hashing doesn't dominate login)")
+
+    def handle(self, *args, **options):
+        previous = None
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                previous = json.load(f)
+
+        setup_test_environment()
+        tmpdir = tempfile.mkdtemp()
+        # A throwaway file for every alias, so routed models (audit, notifications
+        # in settings_production) never write to the real databases
+        for alias in connections:
+            if connections[alias].vendor == "sqlite":
+                connections[alias].settings_dict["TEST"]["NAME"] = os.path.join(tmpdir, f"bench_{alias}.sqlite3")
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            overrides = {"AUDIT_BUFFER": {"ENABLED": False}, "SQL_INSTRUMENTATION": {"ENABLED": False}}
+            if not options["real_hasher"]:
+                overrides["PASSWORD_HASHERS"] = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+            with override_settings(**overrides):
+                cache.clear()
+                results = self.run(options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            shutil.rmtree(tmpdir, ignore_errors=True)
+            teardown_test_environment()
+
+        with open(options["output"], "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        self.stdout.write(f"Results written to {options['output']}")
+
+        if previous is not None:
+            regressions = self.compare(previous, results, options)
+            if regressions:
+                raise CommandError(f"{len(regressions)} endpoint(s) regressed against {options['compare']}")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['compare']}"))
+
+    def run(self, options):
+        counts = {name: options[name] for name in DEFAULT_COUNTS}
+        started = time.perf_counter()
+        generate(counts, seed=options["seed"],
+                 log=(lambda msg: self.stdout.write(f"  seeded {msg}")) if options["verbosity"] > 1 else None)
+        self.stdout.write(f"Seeded synthetic data in {time.perf_counter() - started:.1f}s")
+
+        admin = User.objects.filter(is_staff=True).order_by("pk").first()
+        if admin is None:
+            raise CommandError("Need at least one synthetic user (--users)")
+        client = Client()
+        response = client.post("/api/auth/token/", {"username": admin.username, "password": SYNTHETIC_PASSWORD})
+        if response.status_code != 200:
+            raise CommandError(f"Could not log in as {admin.username}: {response.status_code}")
+        tokens = response.json()
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {tokens['access']}"}
+
+        requests = [("GET", path, None) for path in self.router_paths() + EXTRA_GETS]
+        requests += [
+            ("POST", "/api/auth/token/", {"username": admin.username, "password": SYNTHETIC_PASSWORD}),
+            ("POST", "/api/auth/refresh/", {"refresh": tokens["refresh"]}),
+        ]
+        if options["only"]:
+            requests = [r for r in requests if any(text in r[1] for text in options["only"])]
+
+        endpoints = {}
+        for method, path, data in requests:
+            name = f"{method} {path}"
+            endpoints[name] = self.measure(client, method, path, data, headers, options)
+            self.report(name, endpoints[name])
+
+        return {
+            "meta": {
+                "created_at": timezone.now().isoformat(),
+                "counts": counts,
+                "seed": options["seed"],
+                "iterations": options["iterations"],
+                "warmup": options["warmup"],
+                "database": connection.vendor,
+                "django": django.get_version(),
+                "python": platform.python_version(),
+            },
+            "endpoints": endpoints,
+        }
+
+    def router_paths(self):
+        """List, detail and GET extra-action URLs of every router registration."""
+        from ferretcontrol.urls import router
+
+        paths = []
+        for prefix, viewset, basename in router.registry:
+            base = f"/api/{prefix}/"
+            paths.append(base)
+            model = getattr(viewset, "queryset", None)
+            pk = model.model.objects.order_by("pk").values_list("pk", flat=True).first() if model is not None else None
+            if pk is not None:
+                paths.append(f"{base}{pk}/")
+            for extra in viewset.get_extra_actions():
+                if "get" not in extra.mapping:
+                    continue
+                if extra.detail:
+                    if pk is not None:
+                        paths.append(f"{base}{pk}/{extra.url_path}/")
+                else:
+                    paths.append(f"{base}{extra.url_path}/")
+        return paths
+
+    def request(self, client, method, path, data, headers):
+        with contextlib.ExitStack() as stack:
+            captures = [stack.enter_context(CaptureQueriesContext(connections[alias])) for alias in connections]
+            start = time.perf_counter()
+            if method == "GET":
+                response = client.get(path, **headers)
+            else:
+                response = client.post(path, data, **headers)
+            if response.streaming:
+                size = sum(len(chunk) for chunk in response.streaming_content)
+            else:
+                size = len(response.content)
+            elapsed = (time.perf_counter() - start) * 1000
+        return response.status_code, elapsed, sum(len(queries) for queries in captures), size
+
+    def measure(self, client, method, path, data, headers, options):
+        status, cold_ms, cold_queries, _ = self.request(client, method, path, data, headers)
+        for _ in range(options["warmup"] - 1):
+            self.request(client, method, path, data, headers)
+        timings, queries, sizes = [], [], []
+        for _ in range(options["iterations"]):
+            status, elapsed, n, size = self.request(client, method, path, data, headers)
+            timings.append(elapsed)
+            queries.append(n)
+            sizes.append(size)
+        timings.sort()
+        return {
+            "status": status,
+            "cold_ms": round(cold_ms, 3),
+            "cold_queries": cold_queries,
+            "p50_ms": round(percentile(timings, 50), 3),
+            "p95_ms": round(percentile(timings, 95), 3),
+            "p99_ms": round(percentile(timings, 99), 3),
+            "queries": max(queries),
+            "bytes": max(sizes),
+        }
+
+    def report(self, name, result):
+        line = (f"{name:<45} {result['status']:>3}  p50 {result['p50_ms']:8.2f}ms  "
+                f"p95 {result['p95_ms']:8.2f}ms  p99 {result['p99_ms']:8.2f}ms  "
+                f"{result['queries']:>3} q (cold {result['cold_queries']:>3})  {result['bytes']:>9} B")
+        self.stdout.write(line if result["status"] < 400 else self.style.WARNING(line))
+
+    def compare(self, previous, current, options):
+        if previous.get("meta", {}).get("counts") != current["meta"]["counts"]:
+            self.stdout.write(self.style.WARNING("Dataset sizes differ from the previous run; comparing anyway"))
+        regressions = []
+        for name, now in current["endpoints"].items():
+            before = previous.get("endpoints", {}).get(name)
+            if before is None:
+                continue
+            problems = []
+            if before["status"] < 400 <= now["status"]:
+                problems.append(f"status {before['status']} -> {now['status']}")
+            if now["queries"] > before["queries"]:
+                problems.append(f"queries {before['queries']} -> {now['queries']}")
+            slower = now["p95_ms"] - before["p95_ms"]
+            if slower > options["min_delta_ms"] and now["p95_ms"] > before["p95_ms"] * (1 + options["tolerance"]):
+                problems.append(f"p95 {before['p95_ms']:.2f}ms -> {now['p95_ms']:.2f}ms")
+            if problems:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(f"REGRESSION {name}: {', '.join(problems)}"))
+        return regressions
@@ -0,0 +1,37 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.bulk_import import FORMATS, IMPORTERS, get_importer, read_rows
+
+class Command(BaseCommand):
+    help = "Bulk import assets or risks from a CSV or NDJSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(IMPORTERS))
+        parser.add_argument("path")
+        parser.add_argument("--type", choices=FORMATS, help="File format (default: from the extension)")
+        parser.add_argument("--owner", help="Username recorded as owner of imported assets")
+        parser.add_argument("--chunk-size", type=int, default=None)
+        parser.add_argument("--dry-run", action="store_true", help="Only validate")
+
+    def handle(self, *args, **options):
+        fmt = options["type"] or ("csv" if options["path"].lower().endswith(".csv") else "ndjson")
+        owner = None
+        if options["owner"]:
+            owner = User.objects.filter(username=options["owner"]).first()
+            if owner is None:
+                raise CommandError(f"Unknown user: {options['owner']}")
+
+        importer = get_importer(options["kind"])(
+            user=owner, dry_run=options["dry_run"], chunk_size=options["chunk_size"]
+        )
+        with open(options["path"], "rb") as f:
+            report = importer.run(read_rows(f, fmt))
+
+        for error in report["errors"]:
+            self.stdout.write(self.style.WARNING(f"line {error['line']}: {error['errors']}"))
+        if report["errors_truncated"]:
+            self.stdout.write(self.style.WARNING("(more errors not shown)"))
+        verb = "Validated" if options["dry_run"] else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {report['imported']} {options['kind']}, {report['failed']} rows failed"
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from apps.core.search import INDEXES, fts5_available, rebuild_index
+
+class Command(BaseCommand):
+    help = "Rebuild the SQLite FTS5 search indexes (run after bulk imports)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("indexes", nargs="*", help="Index names (default: all)")
+
+    def handle(self, *args, **options):
+        names = options["indexes"]
+        for index in INDEXES:
+            if names and index.name not in names:
+                continue
+            if not fts5_available(index.model.objects.db):
+                self.stdout.write(self.style.WARNING("FTS5 not available; search uses LIKE fallback"))
+                return
+            n = rebuild_index(index)
+            self.stdout.write(self.style.SUCCESS(f"Indexed {index.name}: {n} rows"))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from apps.core.outbox import send_pending
+
+class Command(BaseCommand):
+    help = "Send queued emails from the outbox (once, or continuously with --loop)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None, help="Emails per connection (default: EMAIL_OUTBOX)")
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new emails")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls with --loop")
+        parser.add_argument("--backend", help="Email backend path overriding EMAIL_BACKEND, e.g. "
+                                                "django.core.mail.backends.console.EmailBackend")
+
+    def handle(self, *args, **options):
+        while True:
+            connection = get_connection(options["backend"]) if options["backend"] else None
+            result = send_pending(batch_size=options["batch_size"], connection=connection)
+            if any(result.values()) or not options["loop"]:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Sent {result['sent']}, retrying {result['retried']}, dead-lettered {result['dead']}"
+                ))
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,133 @@
+"""
+Durable email outbox.
+
+Request code calls ``enqueue(...)``, which only inserts an OutboxEmail
+row, so it returns immediately and the email survives restarts and SMTP
+outages. ``manage.py send_outbox`` claims due rows in batches and sends
+each batch over one reused connection. A failed email is retried with
+exponential backoff and marked ``dead`` after MAX_ATTEMPTS; rows left in
+``sending`` by a crashed worker are reclaimed after CLAIM_TIMEOUT.
+
+Any Django email backend works: the locmem backend (used automatically
+by the test runner) or a local SMTP stand-in such as
+``python -m aiosmtpd -n -l localhost:1025`` via ``--backend``/EMAIL_*.
+"""
+import datetime
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "BATCH_SIZE": 50,
+    "MAX_ATTEMPTS": 5,
+    "BACKOFF": 30,          # seconds before the first retry, doubled on each attempt
+    "MAX_BACKOFF": 3600,
+    "CLAIM_TIMEOUT": 300,   # seconds before a "sending" row is considered abandoned
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "EMAIL_OUTBOX", {}))
+    return config
+
+
+def enqueue(subject, message, recipient_list, from_email=None):
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email or "",
+        to=list(recipient_list),
+    )
+
+
+def claim_batch(batch_size, now=None):
+    """Mark up to ``batch_size`` due emails as ``sending`` and return them."""
+    now = now or timezone.now()
+    stale = now - datetime.timedelta(seconds=get_config()["CLAIM_TIMEOUT"])
+    due = Q(status="pending", next_attempt_at__lte=now) | Q(status="sending", claimed_at__lt=stale)
+    ids = list(OutboxEmail.objects.filter(due).order_by("next_attempt_at", "id").values_list("id", flat=True)[:batch_size])
+    if not ids:
+        return []
+    # Conditional on the row still being due, so concurrent workers can't
+    # claim the same email twice.
+    OutboxEmail.objects.filter(due, id__in=ids).update(status="sending", claimed_at=now)
+    return list(OutboxEmail.objects.filter(id__in=ids, status="sending", claimed_at=now).order_by("id"))
+
+
+def backoff_delay(attempts, config):
+    return min(config["BACKOFF"] * 2 ** (attempts - 1), config["MAX_BACKOFF"])
+
+
+def send_batch(emails, connection=None, config=None):
+    """Send claimed emails over one connection; returns ``{"sent", "retried", "dead"}``."""
+    config = config or get_config()
+    result = {"sent": 0, "retried": 0, "dead": 0}
+    if not emails:
+        return result
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        # Nothing can be sent; put the whole batch back with backoff.
+        logger.warning("Could not open email connection: %s", e)
+        for email in emails:
+            _failed(email, e, config, result)
+        return result
+    try:
+        for email in emails:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.body,
+                from_email=email.from_email or None,
+                to=email.to,
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as e:
+                _failed(email, e, config, result)
+                continue
+            email.status = "sent"
+            email.sent_at = timezone.now()
+            email.attempts += 1
+            email.last_error = ""
+            email.save(update_fields=["status", "sent_at", "attempts", "last_error"])
+            result["sent"] += 1
+    finally:
+        connection.close()
+    return result
+
+
+def _failed(email, error, config, result):
+    email.attempts += 1
+    email.last_error = f"{type(error).__name__}: {error}"
+    if email.attempts >= config["MAX_ATTEMPTS"]:
+        email.status = "dead"
+        result["dead"] += 1
+        logger.error("Email %s dead-lettered after %d attempts: %s", email.pk, email.attempts, email.last_error)
+    else:
+        email.status = "pending"
+        email.next_attempt_at = timezone.now() + datetime.timedelta(seconds=backoff_delay(email.attempts, config))
+        result["retried"] += 1
+    email.save(update_fields=["status", "attempts", "last_error", "next_attempt_at"])
+
+
+def send_pending(batch_size=None, connection=None):
+    """Send every due email, batch by batch; returns the summed counters."""
+    config = get_config()
+    batch_size = batch_size or config["BATCH_SIZE"]
+    total = {"sent": 0, "retried": 0, "dead": 0}
+    while True:
+        emails = claim_batch(batch_size)
+        if not emails:
+            return total
+        for key, value in send_batch(emails, connection, config).items():
+            total[key] += value
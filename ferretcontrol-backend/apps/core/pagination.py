@@ -0,0 +1,139 @@
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_position(timestamp, pk, reverse=False, source=None):
+    payload = {"t": timestamp.isoformat(), "i": pk}
+    if source is not None:
+        payload["s"] = source
+    if reverse:
+        payload["r"] = 1
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode()
+
+
+def decode_position(token):
+    """
+    Return ``((timestamp, pk, source), reverse)``; ``source`` is None unless
+    the cursor was encoded by a merged feed. Raises ValueError on a
+    malformed token.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+        source = payload.get("s")
+        position = (datetime.fromisoformat(payload["t"]), int(payload["i"]),
+                    None if source is None else int(source))
+        return position, bool(payload.get("r"))
+    except (TypeError, ValueError, KeyError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over a descending (timestamp, id) pair.
+
+    Each page is fetched with ``WHERE (ts, id) < (last_ts, last_id)`` on a
+    composite index, so page 1000 costs the same as page 1. The cursors in
+    the response are opaque base64 tokens.
+    """
+    timestamp_field = "created_at"
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position, self.reverse = self.decode_cursor(request)
+
+        ts = self.timestamp_field
+        if self.reverse:
+            queryset = queryset.order_by(ts, "id")
+        else:
+            queryset = queryset.order_by(f"-{ts}", "-id")
+
+        if position is not None:
+            pos_ts, pos_id, _ = position
+            if self.reverse:
+                queryset = queryset.filter(
+                    Q(**{f"{ts}__gt": pos_ts}) | Q(**{ts: pos_ts, "id__gt": pos_id})
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(**{f"{ts}__lt": pos_ts}) | Q(**{ts: pos_ts, "id__lt": pos_id})
+                )
+
+        # One extra row tells us whether there is another page in this direction.
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+
+        self.page = results
+        if self.reverse:
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, obj, reverse):
+        token = encode_position(getattr(obj, self.timestamp_field), obj.pk, reverse)
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            return decode_position(token)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
@@ -0,0 +1,278 @@
+"""
+SQLite FTS5 full-text search for the asset, risk and control registers.
+
+Each ``SearchIndex`` copies the searchable text of a model into its own
+FTS5 table (a regular one, not external-content) whose rowid is the
+model's primary key. Signals keep the index in sync on save/delete
+and ``manage.py rebuild_search_index`` rebuilds it after bulk writes.
+``FullTextSearchFilter`` is a drop-in replacement for DRF's
+``SearchFilter``: it serves ``?search=`` from the index ranked by bm25
+and falls back to the regular ``icontains`` search when FTS5 is not
+available (other database engines, SQLite builds without FTS5, or an
+index table that has not been created yet).
+"""
+import logging
+
+from django.apps import apps
+from django.db import DatabaseError, connections, router, transaction
+from rest_framework import filters
+
+logger = logging.getLogger(__name__)
+
+
+class SearchIndex:
+    def __init__(self, name, model, fields, related=None):
+        self.name = name
+        self.model_label = model
+        self.fields = fields
+        # {"app.Model": "lookup"}: reindex rows of this model when a related row changes
+        self.related = related or {}
+
+    @property
+    def table(self):
+        return f"fts_{self.name}"
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    @property
+    def columns(self):
+        return [f.replace("__", "_") for f in self.fields]
+
+    def queryset(self):
+        related = sorted({f.rsplit("__", 1)[0] for f in self.fields if "__" in f})
+        qs = self.model._default_manager.all()
+        return qs.select_related(*related) if related else qs
+
+    def document(self, obj):
+        values = []
+        for field in self.fields:
+            value = obj
+            for attr in field.split("__"):
+                value = getattr(value, attr, None) if value is not None else None
+            values.append("" if value is None else str(value))
+        return values
+
+
+INDEXES = [
+    SearchIndex("assets", "assets.InformationAsset", ["name", "source", "tags", "description"]),
+    SearchIndex("risks", "risks.Risk", ["title", "description", "asset__name"],
+                related={"assets.InformationAsset": "asset"}),
+    SearchIndex("controls", "controls.Control", ["code", "name", "domain", "description"]),
+]
+
+
+def get_index(name):
+    for index in INDEXES:
+        if index.name == name:
+            return index
+    raise KeyError(name)
+
+
+_fts5_available = {}
+
+
+def fts5_available(using):
+    """True if the connection is SQLite compiled with FTS5 (cached per alias)."""
+    if using not in _fts5_available:
+        connection = connections[using]
+        ok = False
+        if connection.vendor == "sqlite":
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(x)")
+                    cursor.execute("DROP TABLE temp.fts5_probe")
+                ok = True
+            except DatabaseError:
+                ok = False
+        _fts5_available[using] = ok
+    return _fts5_available[using]
+
+
+def _db_for(index):
+    return router.db_for_write(index.model)
+
+
+_known_tables = set()
+
+
+def table_exists(index, using):
+    if (using, index.table) in _known_tables:
+        return True
+    with connections[using].cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [index.table])
+        exists = cursor.fetchone() is not None
+    if exists:
+        _known_tables.add((using, index.table))
+    return exists
+
+
+def create_index(index, using):
+    columns = ", ".join(index.columns)
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {index.table} "
+            f"USING fts5({columns}, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+
+def rebuild_index(index, using=None, batch_size=2000):
+    """Drop and repopulate an index from its model table; returns rows indexed."""
+    using = using or _db_for(index)
+    if not fts5_available(using):
+        return 0
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {index.table}")
+    _known_tables.discard((using, index.table))
+    create_index(index, using)
+    placeholders = ", ".join(["%s"] * (len(index.columns) + 1))
+    sql = f"INSERT INTO {index.table} (rowid, {', '.join(index.columns)}) VALUES ({placeholders})"
+    count = 0
+    batch = []
+    # One transaction: in autocommit SQLite would commit (and sync) every row
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        for obj in index.queryset().using(using).iterator(chunk_size=batch_size):
+            batch.append([obj.pk] + index.document(obj))
+            if len(batch) >= batch_size:
+                cursor.executemany(sql, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+            count += len(batch)
+    return count
+
+
+def _usable(index, using):
+    return fts5_available(using) and table_exists(index, using)
+
+
+def update_document(index, obj, using=None):
+    using = using or _db_for(index)
+    if not _usable(index, using):
+        return
+    placeholders = ", ".join(["%s"] * (len(index.columns) + 1))
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {index.table} WHERE rowid = %s", [obj.pk])
+        cursor.execute(
+            f"INSERT INTO {index.table} (rowid, {', '.join(index.columns)}) VALUES ({placeholders})",
+            [obj.pk] + index.document(obj),
+        )
+
+
+def index_documents(index, objs, using=None):
+    """Add freshly inserted rows (e.g. from bulk_create, which sends no signals)."""
+    using = using or _db_for(index)
+    if not objs or not _usable(index, using):
+        return
+    placeholders = ", ".join(["%s"] * (len(index.columns) + 1))
+    with connections[using].cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {index.table} (rowid, {', '.join(index.columns)}) VALUES ({placeholders})",
+            [[obj.pk] + index.document(obj) for obj in objs],
+        )
+
+
+def delete_document(index, pk, using=None):
+    using = using or _db_for(index)
+    if not _usable(index, using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {index.table} WHERE rowid = %s", [pk])
+
+
+def build_match_query(terms):
+    """Turn search terms into an FTS5 query: every term as a quoted prefix, ANDed."""
+    parts = []
+    for term in terms:
+        term = term.replace('"', '""').strip()
+        if term:
+            parts.append(f'"{term}"*')
+    return " AND ".join(parts)
+
+
+def connect_signals():
+    from django.db.models.signals import post_delete, post_save
+
+    for index in INDEXES:
+        def on_save(sender, instance, using, index=index, **kwargs):
+            try:
+                update_document(index, instance, using)
+            except DatabaseError:
+                logger.exception("Could not update search index %s", index.name)
+
+        def on_delete(sender, instance, using, index=index, **kwargs):
+            try:
+                delete_document(index, instance.pk, using)
+            except DatabaseError:
+                logger.exception("Could not update search index %s", index.name)
+
+        post_save.connect(on_save, sender=index.model_label, weak=False,
+                          dispatch_uid=f"fts_save_{index.name}")
+        post_delete.connect(on_delete, sender=index.model_label, weak=False,
+                            dispatch_uid=f"fts_delete_{index.name}")
+
+        for related_label, lookup in index.related.items():
+            def on_related_save(sender, instance, using, index=index, lookup=lookup, **kwargs):
+                if kwargs.get("created"):
+                    return
+                try:
+                    if not _usable(index, using):
+                        return
+                    for obj in index.queryset().using(using).filter(**{lookup: instance}):
+                        update_document(index, obj, using)
+                except DatabaseError:
+                    logger.exception("Could not update search index %s", index.name)
+
+            post_save.connect(on_related_save, sender=related_label, weak=False,
+                              dispatch_uid=f"fts_related_{index.name}_{related_label}")
+
+
+def create_missing_indexes(using, **kwargs):
+    """post_migrate hook: create and fill any index table that doesn't exist yet."""
+    if not fts5_available(using):
+        return
+    for index in INDEXES:
+        if router.db_for_write(index.model) != using:
+            continue
+        if not table_exists(index, using):
+            rebuild_index(index, using)
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    ``SearchFilter`` served from an FTS5 index.
+
+    Views set ``search_index`` to the name of an entry in ``INDEXES`` and
+    keep ``search_fields`` for the fallback path. Without an explicit
+    ``?ordering=`` results come back best match first.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        name = getattr(view, "search_index", None)
+        if not terms or not name:
+            return super().filter_queryset(request, queryset, view)
+
+        index = get_index(name)
+        using = queryset.db
+        if not _usable(index, using):
+            return super().filter_queryset(request, queryset, view)
+
+        match = build_match_query(terms)
+        if not match:
+            return super().filter_queryset(request, queryset, view)
+
+        # Join the index once; the MATCH drives the scan and rank comes with it
+        pk_column = f'"{queryset.model._meta.db_table}"."{queryset.model._meta.pk.column}"'
+        queryset = queryset.extra(
+            tables=[index.table],
+            where=[f"{index.table} MATCH %s", f"{index.table}.rowid = {pk_column}"],
+            params=[match],
+        )
+        if not request.query_params.get(filters.OrderingFilter.ordering_param):
+            queryset = queryset.extra(select={"search_rank": f"{index.table}.rank"})
+            queryset = queryset.order_by("search_rank", *queryset.query.order_by)
+        return queryset
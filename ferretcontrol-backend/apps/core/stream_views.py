@@ -0,0 +1,107 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core import signing
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from apps.accounts.authentication import CachedJWTAuthentication
+from .events import get_broker, get_config
+
+TICKET_SALT = "apps.core.stream_views.ticket"
+
+
+def issue_ticket(user):
+    return signing.TimestampSigner(salt=TICKET_SALT).sign(str(user.pk))
+
+
+def ticket_user(ticket):
+    """The active user a ticket was issued to, or None if it is invalid or expired."""
+    try:
+        pk = signing.TimestampSigner(salt=TICKET_SALT).unsign(ticket, max_age=get_config()["TICKET_TTL"])
+    except signing.BadSignature:
+        return None
+    return User.objects.filter(pk=pk, is_active=True).first()
+
+
+class StreamTicketView(APIView):
+    """
+    POST /api/stream/ticket/ — a short-lived ticket for ``/api/stream/?ticket=``.
+
+    EventSource can't send an Authorization header. Passing a ticket keeps
+    the access token out of URLs, and so out of proxy and server logs. The
+    ticket only opens the stream and expires after
+    EVENT_STREAM["TICKET_TTL"] seconds. Clients fetch a new one for every
+    (re)connect.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        return Response({"ticket": issue_ticket(request.user), "expires_in": get_config()["TICKET_TTL"]})
+
+
+@sync_to_async
+def authenticate_stream(request):
+    """JWT from the Authorization header, or a stream ticket from ``?ticket=``."""
+    ticket = request.GET.get("ticket")
+    if ticket:
+        return ticket_user(ticket)
+    auth = CachedJWTAuthentication()
+    try:
+        header = auth.get_header(request)
+        if not header:
+            return None
+        user = auth.get_user(auth.get_validated_token(auth.get_raw_token(header)))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    return user if user.is_active else None
+
+
+def format_event(event):
+    return f"id: {event.id}\nevent: {event.type}\ndata: {json.dumps(event.data)}\n\n"
+
+
+async def event_stream(request):
+    """
+    GET /api/stream/?ticket= — Server-Sent Events with ``notification``,
+    ``forum`` and (staff only) ``audit`` events. Needs an ASGI server;
+    resumes from the ``Last-Event-ID`` header or ``?last_event_id=`` (see
+    apps.core.events for the limits of resuming).
+    """
+    user = await authenticate_stream(request)
+    if user is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+
+    last_event_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    heartbeat = get_config()["HEARTBEAT"]
+    subscription = get_broker().subscribe(user, last_event_id)
+
+    async def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if event is None:
+                    break
+                yield format_event(event)
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,578 @@
+"""
+Synthetic data for benchmarks, load tests and production-scale fixtures.
+
+``generate(counts, seed)`` fills every register with plausible rows. Rows
+are produced lazily and inserted in batches, one transaction per model
+(see ``Generator.bulk``), so memory stays flat however many rows are
+asked for. Afterwards it does what the skipped signals would have done: tags,
+search index, heatmap, unread counters and collection versions. The same
+seed, options and ``now`` always produce the same data on an empty
+database. Hourly user-activity rollups cover the whole ``days`` span up to
+the hour before ``now``.
+Every generated user has the password SYNTHETIC_PASSWORD.
+
+Two knobs shape the data:
+
+* ``skew``: Zipf exponent for how activity is spread over users and
+  assets. With 0 every user is equally active. With the default 1.1 a
+  few users write most of the audit log and a few assets carry most of
+  the risks, as in production.
+* ``recency``: exponent for timestamps within the last ``days`` days.
+  With 1 they are uniform; higher values put more rows in recent days.
+"""
+import bisect
+import contextlib
+import datetime
+import itertools
+import operator
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.color import no_style
+from django.db import connections, router, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from apps.accounts.models import (
+    BroadcastNotification, BroadcastReceipt, NotificationReadState, SecurityNotification,
+    UserActivityRollup, UserProfile, UserSessionStatus,
+)
+from apps.accounts.notifications import LATEST_BROADCAST_KEY
+from apps.accounts.stats import hour_bucket
+from apps.assets.models import InformationAsset, Tag, assign_tags, parse_tags
+from apps.audit.models import AuditLog
+from apps.controls.models import Control, RiskControl
+from apps.controls.seeds import seed_controls
+from apps.forum.models import ForumPost
+from apps.risks import heatmap
+from apps.risks.models import Risk
+from . import flags
+from .models import OutboxEmail, SystemSetting
+from .search import INDEXES, rebuild_index
+from .versions import TRACKED_MODELS, bump
+
+SYNTHETIC_PASSWORD = "synthetic-password"
+
+DEFAULT_COUNTS = {
+    "users": 50,
+    "assets": 500,
+    "risks": 1000,
+    "controls": 40,
+    "risk_controls": 2000,
+    "audit": 5000,
+    "forum": 300,
+    "notifications": 2000,
+    "broadcasts": 200,
+    "outbox": 500,
+    "system_settings": 20,
+}
+
+PROFILES = {
+    "small": DEFAULT_COUNTS,
+    "medium": {
+        "users": 1000,
+        "assets": 10000,
+        "risks": 30000,
+        "controls": 100,
+        "risk_controls": 60000,
+        "audit": 100000,
+        "forum": 5000,
+        "notifications": 50000,
+        "broadcasts": 2000,
+        "outbox": 10000,
+        "system_settings": 50,
+    },
+    "large": {
+        "users": 10000,
+        "assets": 100000,
+        "risks": 300000,
+        "controls": 200,
+        "risk_controls": 600000,
+        "audit": 1000000,
+        "forum": 50000,
+        "notifications": 500000,
+        "broadcasts": 20000,
+        "outbox": 100000,
+        "system_settings": 100,
+    },
+}
+
+WORDS = [
+    "ventas", "clientes", "proveedores", "nómina", "facturación", "inventario", "backup",
+    "correo", "crm", "erp", "precios", "contratos", "logística", "marketing", "soporte",
+    "pagos", "auditoría", "reportes", "portal", "móvil",
+]
+SOURCES = ["Postgres ventas", "API proveedores", "S3 backups", "SharePoint", "SAP", "MySQL CRM"]
+TAGS = ["pii", "gdpr", "finanzas", "legacy", "cloud", "on-prem", "critico", "externo", "interno", "backup",
+        "pci", "rrhh", "ventas", "api", "cifrado"]
+THREATS = ["Fuga de datos en", "Acceso no autorizado a", "Pérdida de disponibilidad de",
+           "Ransomware en", "Configuración insegura de", "Error humano en"]
+ACTIONS = [("VIEW", 80), ("UPDATE", 10), ("CREATE", 8), ("DELETE", 2)]
+METHODS = {"VIEW": "GET", "CREATE": "POST", "UPDATE": "PATCH", "DELETE": "DELETE"}
+# Field types whose generated values need no conversion for the database
+PLAIN_TYPES = {
+    "AutoField", "BigAutoField", "IntegerField", "PositiveIntegerField", "BigIntegerField",
+    "CharField", "TextField", "BooleanField", "ForeignKey", "OneToOneField",
+}
+# Flags the code reads (apps.core.flags); the rest of SystemSetting is filler
+KNOWN_SETTINGS = [("login_defer_notifications", False, "Escribir las notificaciones de login en segundo plano")]
+ENTITIES = [("InformationAsset", "/api/assets/"), ("Risk", "/api/risks/"), ("Control", "/api/controls/")]
+
+
+def generate(counts=None, seed=0, days=90, skew=1.1, recency=1.5, batch_size=5000, now=None, log=None):
+    """
+    Create the rows described by ``counts`` (see DEFAULT_COUNTS); returns
+    rows created per model. Timestamps end at ``now`` (default: the current
+    time); pass a fixed one for byte-identical data across runs.
+    """
+    counts = {**DEFAULT_COUNTS, **(counts or {})}
+    gen = Generator(random.Random(seed), now or timezone.now(), days, skew, recency, batch_size,
+                    log or (lambda msg: None))
+    return gen.run(counts)
+
+
+@contextlib.contextmanager
+def explicit_timestamps(model, fields):
+    """Keep the given auto_now/auto_now_add values instead of overwriting them with now()."""
+    saved = [(field, field.auto_now, field.auto_now_add)
+             for field in (model._meta.get_field(name) for name in fields)]
+    for field, _, _ in saved:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class WeightedPicker:
+    """Zipf-weighted sampling from a list of values, in batches for speed."""
+
+    def __init__(self, rng, values, skew):
+        self.rng = rng
+        self.values = list(values)
+        order = list(range(len(self.values)))
+        rng.shuffle(order)  # heavy hitters are random rows, not the first ones
+        weights = [0.0] * len(self.values)
+        for rank, index in enumerate(order):
+            weights[index] = 1 / (rank + 1) ** skew
+        self.cum_weights = list(itertools.accumulate(weights))
+        self._buffer = []
+
+    def __bool__(self):
+        return bool(self.values)
+
+    def pick(self):
+        if not self._buffer:
+            self._buffer = self.rng.choices(self.values, cum_weights=self.cum_weights, k=1024)
+        return self._buffer.pop()
+
+
+class Generator:
+    def __init__(self, rng, now, days, skew, recency, batch_size, log):
+        self.rng = rng
+        self.now = now
+        self.span = max(days, 1) * 86400
+        self.skew = skew
+        self.recency = recency
+        self.batch_size = batch_size
+        self.log = log
+        self.created = {}
+
+    def run(self, counts):
+        users = self.users(counts["users"])
+        controls = self.controls(counts["controls"])
+        assets = self.assets(counts["assets"], users)
+        risks = self.risks(counts["risks"], assets)
+        self.risk_controls(counts["risk_controls"], risks, controls)
+        self.audit(counts["audit"], users)
+        self.forum(counts["forum"], users)
+        self.notifications(counts["notifications"], users)
+        self.broadcasts(counts["broadcasts"], users)
+        self.rollups()
+        self.outbox(counts["outbox"])
+        self.system_settings(counts["system_settings"])
+
+        # What the post_save signals would have done row by row
+        for index in INDEXES:
+            rebuild_index(index)
+        heatmap.rebuild()
+        cache.delete(LATEST_BROADCAST_KEY)
+        for name in sorted(set(TRACKED_MODELS.values())):
+            bump(name)
+        flags.invalidate()
+        return self.created
+
+    def bulk(self, model, rows, timestamps=(), after_chunk=None):
+        """
+        Insert ``rows`` (unsaved instances, any iterable) ``batch_size`` at a
+        time in one transaction. The columns and value conversion are the
+        ones bulk_create would use, but each batch goes out as one
+        ``executemany`` of a single-row INSERT: compiling bulk_create's
+        multi-row statements every ~90 rows capped generation at ~9k rows/s.
+        Primary keys are assigned here, so ``after_chunk`` gets saved rows.
+        """
+        alias = router.db_for_write(model)
+        connection = connections[alias]
+        fields = model._meta.concrete_fields
+        qn = connection.ops.quote_name
+        sql = "INSERT INTO {} ({}) VALUES ({})".format(
+            qn(model._meta.db_table),
+            ", ".join(qn(field.column) for field in fields),
+            ", ".join(["%s"] * len(fields)),
+        )
+        rows = iter(rows)
+        total = 0
+        with transaction.atomic(using=alias), explicit_timestamps(model, timestamps):
+            converters = [self.converter(field, connection) for field in fields]
+            next_pk = self.last_pk(model) + 1
+            with connection.cursor() as cursor:
+                while True:
+                    chunk = list(itertools.islice(rows, self.batch_size))
+                    if not chunk:
+                        break
+                    for obj in chunk:
+                        obj.pk = next_pk
+                        next_pk += 1
+                        obj._state.adding = False
+                        obj._state.db = alias
+                    cursor.executemany(sql, [
+                        [convert(obj) for convert in converters] for obj in chunk
+                    ])
+                    if after_chunk:
+                        after_chunk(chunk)
+                    total += len(chunk)
+                # Explicit ids leave sequences behind on backends that have them
+                for statement in connection.ops.sequence_reset_sql(no_style(), [model]):
+                    cursor.execute(statement)
+        label = model._meta.label
+        self.created[label] = self.created.get(label, 0) + total
+        self.log(f"{label}: {total}")
+        return total
+
+    def converter(self, field, connection):
+        """Function from instance to the field's database value, as bulk_create would send it."""
+        if field.get_internal_type() in PLAIN_TYPES and not getattr(field, "auto_now", False):
+            # Generated values are already ints/strs/bools; the drivers take them
+            # as they are, and the full conversion would double the cost per row.
+            return operator.attrgetter(field.attname)
+        return lambda obj: field.get_db_prep_save(field.pre_save(obj, True), connection)
+
+    def last_pk(self, model):
+        return model.objects.aggregate(last=Max("pk"))["last"] or 0
+
+    def when(self):
+        """A timestamp within the span, skewed toward now by ``recency``."""
+        return self.now - datetime.timedelta(seconds=self.span * self.rng.random() ** self.recency)
+
+    def ip(self):
+        return f"10.{self.rng.randrange(4)}.{self.rng.randrange(256)}.{self.rng.randrange(1, 255)}"
+
+    def users(self, n):
+        rng = self.rng
+        # Fixed salt so the same seed gives the same rows
+        password = make_password(SYNTHETIC_PASSWORD, salt="synthetic")
+        start = User.objects.count()
+        before = self.last_pk(User)
+
+        def rows():
+            for i in range(start, start + n):
+                joined = self.when()
+                roll = rng.random()
+                if roll < 0.2:
+                    last_login = None
+                elif roll < 0.5:
+                    last_login = self.now - datetime.timedelta(seconds=rng.randrange(86400))
+                else:
+                    last_login = joined + (self.now - joined) * rng.random()
+                yield User(
+                    username=f"user{i:06d}",
+                    email=f"user{i:06d}@example.com",
+                    password=password,
+                    is_staff=i % 20 == 0,
+                    last_login=last_login,
+                    date_joined=joined,
+                )
+
+        self.bulk(User, rows())
+        ids = list(User.objects.filter(pk__gt=before).order_by("pk").values_list("pk", flat=True))
+        self.bulk(UserProfile, (
+            UserProfile(user_id=pk, display_name=f"Usuario {pk}", bio=rng.choice(WORDS)) for pk in ids
+        ))
+        self.bulk(UserSessionStatus, (
+            UserSessionStatus(user_id=pk, is_logged_in=rng.random() < 0.1, last_ip=self.ip(), last_login_at=self.when())
+            for pk in ids
+        ), timestamps=["last_login_at"])
+        return WeightedPicker(rng, ids, self.skew)
+
+    def controls(self, n):
+        rng = self.rng
+        seed_controls()
+        existing = Control.objects.count()
+        self.bulk(Control, (
+            Control(code=f"X.{i}", name=f"Control sintético {i}",
+                    domain=rng.choice(["Organizational", "People", "Technological"]),
+                    description=f"Control de {rng.choice(WORDS)}.")
+            for i in range(existing, n)
+        ))
+        return list(Control.objects.order_by("pk").values_list("pk", flat=True))
+
+    def assets(self, n, users):
+        rng = self.rng
+        types = [t for t, _ in InformationAsset.ASSET_TYPES]
+        classifications = [c for c, _ in InformationAsset.CLASSIFICATIONS]
+        criticality = [c for c, _ in InformationAsset.CRITICALITY]
+        before = self.last_pk(InformationAsset)
+        # Create the tags up front in a fixed order; assign_tags would insert them in set order
+        Tag.objects.bulk_create([Tag(name=name) for name in sorted(parse_tags(",".join(TAGS)))],
+                                ignore_conflicts=True)
+
+        def rows():
+            for i in range(n):
+                yield InformationAsset(
+                    name=f"{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)} {i}",
+                    asset_type=rng.choice(types),
+                    source=rng.choice(SOURCES),
+                    owner_id=users.pick() if users and rng.random() < 0.9 else None,
+                    classification=rng.choices(classifications, weights=[2, 5, 3, 1])[0],
+                    criticality=rng.choice(criticality),
+                    tags=",".join(rng.sample(TAGS, rng.randrange(4))),
+                    description=f"Activo de {rng.choice(WORDS)} gestionado por {rng.choice(WORDS)}.",
+                    created_at=self.when(),
+                )
+
+        self.bulk(InformationAsset, rows(), timestamps=["created_at"], after_chunk=assign_tags)
+        return WeightedPicker(rng, InformationAsset.objects.filter(pk__gt=before).order_by("pk")
+                              .values_list("pk", "name", "created_at"), self.skew)
+
+    def risks(self, n, assets):
+        if not assets:
+            return []
+        rng = self.rng
+        before = self.last_pk(Risk)
+
+        def rows():
+            for i in range(n):
+                asset_id, asset_name, asset_created = assets.pick()
+                risk = Risk(
+                    asset_id=asset_id,
+                    title=f"{rng.choice(THREATS)} {asset_name}",
+                    description=f"Riesgo sintético {i}.",
+                    likelihood=rng.randint(1, 5),
+                    impact=rng.randint(1, 5),
+                    status=rng.choices(["open", "treating", "closed"], weights=[5, 3, 2])[0],
+                    created_at=asset_created + (self.now - asset_created) * rng.random(),
+                )
+                risk.recalc()
+                yield risk
+
+        self.bulk(Risk, rows(), timestamps=["created_at"])
+        return list(Risk.objects.filter(pk__gt=before).order_by("pk").values_list("pk", flat=True))
+
+    def risk_controls(self, n, risks, controls):
+        if not risks or not controls:
+            return
+        rng = self.rng
+        n = min(n, len(risks) * len(controls))
+        # Spread n links over the risks (each risk gets n // R or one more),
+        # every risk's controls sampled without replacement so pairs are unique.
+        base, extra = divmod(n, len(risks))
+        with_extra = set(rng.sample(range(len(risks)), extra))
+
+        def rows():
+            for index, risk_id in enumerate(risks):
+                k = base + (index in with_extra)
+                for control_id in rng.sample(controls, k):
+                    yield RiskControl(risk_id=risk_id, control_id=control_id, applied=rng.random() < 0.4,
+                                      evidence="Evidencia adjunta" if rng.random() < 0.3 else "")
+
+        self.bulk(RiskControl, rows())
+
+    def audit(self, n, users):
+        rng = self.rng
+        actions, weights = zip(*ACTIONS)
+        cum_weights = list(itertools.accumulate(weights))
+
+        def rows():
+            for _ in range(n):
+                entity, path = rng.choice(ENTITIES)
+                action = rng.choices(actions, cum_weights=cum_weights)[0]
+                yield AuditLog(
+                    user_id=users.pick() if users and rng.random() < 0.95 else None,
+                    action=action,
+                    entity=entity,
+                    path=path,
+                    method=METHODS[action],
+                    ip=self.ip(),
+                    user_agent="Mozilla/5.0 (synthetic)",
+                    success=rng.random() < 0.97,
+                    timestamp=self.when(),
+                    meta={"status_code": 200},
+                )
+
+        self.bulk(AuditLog, rows())
+
+    def forum(self, n, users):
+        if not users or n <= 0:
+            return
+        rng = self.rng
+        before = self.last_pk(ForumPost)
+        self.bulk(ForumPost, (
+            ForumPost(author_id=users.pick(), content=f"Tema sobre {rng.choice(WORDS)} y {rng.choice(WORDS)}.",
+                      created_at=self.when())
+            for _ in range(max(1, n // 4))
+        ), timestamps=["created_at"])
+        # (id, thread root, created_at) of every post a reply can answer
+        posts = list(ForumPost.objects.filter(pk__gt=before).order_by("pk").values_list("pk", "thread_root_id", "created_at"))
+
+        def remember(chunk):
+            posts.extend((p.pk, p.thread_root_id, p.created_at) for p in chunk)
+
+        def rows():
+            for _ in range(n - len(posts)):
+                parent_id, root_id, parent_created = rng.choice(posts)
+                yield ForumPost(author_id=users.pick(), content=f"Respuesta sobre {rng.choice(WORDS)}.",
+                                parent_id=parent_id, thread_root_id=root_id or parent_id,
+                                created_at=parent_created + (self.now - parent_created) * rng.random() ** 3)
+
+        # Replies become possible parents as soon as their chunk is written
+        self.bulk(ForumPost, rows(), timestamps=["created_at"], after_chunk=remember)
+
+    def notifications(self, n, users):
+        if not users:
+            return
+        rng = self.rng
+        types = [t for t, _ in SecurityNotification.ALERT_TYPES]
+        titles = dict(SecurityNotification.ALERT_TYPES)
+
+        def rows():
+            for _ in range(n):
+                alert_type = rng.choices(types, weights=[8, 1, 3])[0]
+                created = self.when()
+                yield SecurityNotification(
+                    user_id=users.pick(),
+                    title=titles[alert_type],
+                    message="Notificación sintética",
+                    alert_type=alert_type,
+                    # Older notifications are more likely to have been read
+                    is_read=rng.random() < 0.5 + 0.45 * (self.now - created).total_seconds() / self.span,
+                    ip_address=self.ip(),
+                    created_at=created,
+                )
+
+        self.bulk(SecurityNotification, rows(), timestamps=["created_at"])
+        # notify() keeps the denormalized unread counters; recount them once here
+        unread = SecurityNotification.objects.filter(is_read=False).values("user_id").annotate(n=Count("id"))
+        NotificationReadState.objects.bulk_create(
+            [NotificationReadState(user_id=row["user_id"], unread_personal=row["n"]) for row in unread],
+            batch_size=self.batch_size,
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=["unread_personal"],
+        )
+
+    def broadcasts(self, n, users):
+        if not users or n <= 0:
+            return
+        rng = self.rng
+        types = [t for t, _ in SecurityNotification.ALERT_TYPES]
+        titles = dict(SecurityNotification.ALERT_TYPES)
+        before = self.last_pk(BroadcastNotification)
+        self.bulk(BroadcastNotification, (
+            BroadcastNotification(title=titles[alert_type], message=f"Aviso sobre {rng.choice(WORDS)}.",
+                                  alert_type=alert_type, created_by_id=users.pick(), created_at=self.when())
+            for alert_type in rng.choices(types, weights=[1, 2, 8], k=n)
+        ), timestamps=["created_at"])
+        # The feed pages by (created_at, id), so ids needn't follow the timestamps
+        sent = list(BroadcastNotification.objects.filter(pk__gt=before).order_by("pk")
+                    .values_list("pk", "created_at", "created_by_id"))
+        joined = dict(User.objects.filter(pk__in=users.values).values_list("pk", "date_joined"))
+
+        # Most users have pressed "mark all read" at some point (the watermark);
+        # some also read a few newer broadcasts one by one (receipts).
+        watermarks = {}
+        receipts = []
+        for user_id in users.values:
+            above = 0
+            if rng.random() < 0.6:
+                above = min(int(len(sent) * rng.random() ** 0.5), len(sent) - 1)
+                watermarks[user_id] = sent[above][0]
+                above += 1
+            if rng.random() < 0.3 and above < len(sent):
+                # A few random tries instead of listing every visible broadcast per user
+                wanted = rng.randrange(1, 6)
+                for index in rng.sample(range(above, len(sent)), min(len(sent) - above, wanted * 3)):
+                    pk, created, author = sent[index]
+                    if created >= joined[user_id] and author != user_id:
+                        receipts.append(BroadcastReceipt(user_id=user_id, broadcast_id=pk,
+                                                         read_at=created + (self.now - created) * rng.random()))
+                        wanted -= 1
+                        if not wanted:
+                            break
+        self.bulk(BroadcastReceipt, receipts, timestamps=["read_at"])
+        # unread_broadcasts catches up lazily from broadcast_counted_until, so only the watermark is set
+        NotificationReadState.objects.bulk_create(
+            [NotificationReadState(user_id=user_id, broadcast_read_until=pk) for user_id, pk in watermarks.items()],
+            batch_size=self.batch_size,
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=["broadcast_read_until"],
+        )
+
+    def rollups(self):
+        """One UserActivityRollup per hour of the span, as the hourly cron would have left them."""
+        rng = self.rng
+        users = list(User.objects.values_list("date_joined", "last_login"))
+        joined = sorted(date_joined for date_joined, _ in users)
+        never = sorted(date_joined for date_joined, last_login in users if last_login is None)
+        last = hour_bucket(self.now)
+        first = last - datetime.timedelta(seconds=self.span)
+        existing = set(UserActivityRollup.objects.filter(hour__gte=first).values_list("hour", flat=True))
+
+        def rows():
+            hour = first
+            while hour < last:
+                if hour not in existing:
+                    total = bisect.bisect_right(joined, hour)
+                    inactive = bisect.bisect_right(never, hour)
+                    active = min(round((total - inactive) * rng.uniform(0.1, 0.4)), total - inactive)
+                    yield UserActivityRollup(hour=hour, total_users=total, active_users=active,
+                                             inactive_users=inactive, updated_at=hour + datetime.timedelta(hours=1))
+                hour += datetime.timedelta(hours=1)
+
+        self.bulk(UserActivityRollup, rows(), timestamps=["updated_at"])
+
+    def outbox(self, n):
+        rng = self.rng
+        statuses = ["sent", "pending", "dead"]
+
+        def rows():
+            for i in range(n):
+                created = self.when()
+                status = rng.choices(statuses, weights=[95, 4, 1])[0]
+                attempts = {"sent": 1, "pending": 0, "dead": 5}[status]
+                yield OutboxEmail(
+                    subject="Código de Recuperación - FerretControl",
+                    body=f"Tu código de verificación es: {rng.randint(100000, 999999)}",
+                    to=[f"user{i % 1000:06d}@example.com"],
+                    status=status,
+                    attempts=attempts,
+                    next_attempt_at=created,
+                    last_error="SMTPServerDisconnected: Connection unexpectedly closed" if status == "dead" else "",
+                    created_at=created,
+                    sent_at=created + datetime.timedelta(seconds=rng.randrange(1, 60)) if status == "sent" else None,
+                )
+
+        self.bulk(OutboxEmail, rows(), timestamps=["created_at"])
+
+    def system_settings(self, n):
+        rng = self.rng
+        existing = set(SystemSetting.objects.values_list("key", flat=True))
+        rows = [SystemSetting(key=key, value=value, description=description)
+                for key, value, description in KNOWN_SETTINGS]
+        rows += [SystemSetting(key=f"feature_{rng.choice(WORDS)}_{i}", value=rng.random() < 0.5,
+                               description=f"Opción sintética {i}")
+                 for i in range(max(0, n - len(rows)))]
+        self.bulk(SystemSetting, [row for row in rows if row.key not in existing])
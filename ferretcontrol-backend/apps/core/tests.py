@@ -1,3 +1,263 @@
-from django.test import TestCase
+import datetime
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import HttpResponse
+from asgiref.sync import iscoroutinefunction
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from apps.accounts.models import BroadcastNotification, PasswordResetCode, UserActivityRollup
+from apps.assets.models import InformationAsset
+from apps.audit.models import AuditLog
+from apps.controls.models import Control
+from .instrumentation import SQLInstrumentationMiddleware
+from .models import OutboxEmail, SystemSetting
+from .outbox import claim_batch, enqueue, get_config, send_batch, send_pending
+from .pagination import KeysetPagination, decode_position, encode_position
+from .versions import bump
+
+
+class FailingBackend:
+    """Email backend whose every send fails, like an SMTP outage."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def open(self):
+        return True
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        raise ConnectionRefusedError("SMTP caído")
+
+
+@override_settings(
+    AUDIT_BUFFER={"ENABLED": False},
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    EMAIL_OUTBOX={"MAX_ATTEMPTS": 3, "BACKOFF": 30, "MAX_BACKOFF": 3600, "CLAIM_TIMEOUT": 300},
+)
+class OutboxTests(TestCase):
+    def test_password_reset_enqueues_inside_the_transaction(self):
+        User.objects.create_user("ana", email="ana@example.com")
+        client = APIClient()
+
+        response = client.post("/api/auth/password_reset/request/", {"email": "ana@example.com"})
+        self.assertEqual(response.status_code, 200)
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.to, ["ana@example.com"])
+        self.assertIn(PasswordResetCode.objects.get().code, email.body)
+        self.assertEqual(mail.outbox, [])  # nothing is sent from the request
+
+        # If the email can't be stored, the code isn't kept either
+        with mock.patch("apps.accounts.password_views.enqueue", side_effect=RuntimeError("db")):
+            with self.assertRaises(RuntimeError):
+                client.post("/api/auth/password_reset/request/", {"email": "ana@example.com"})
+        self.assertEqual(PasswordResetCode.objects.count(), 1)
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+
+        self.assertEqual(send_pending(), {"sent": 1, "retried": 0, "dead": 0})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["ana@example.com"])
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ("sent", 1))
+
+    def test_claim_batch_never_claims_a_row_twice(self):
+        emails = [enqueue(f"s{i}", "m", ["a@example.com"]) for i in range(3)]
+
+        first = claim_batch(2)
+        second = claim_batch(2)
+        self.assertEqual([e.pk for e in first], [emails[0].pk, emails[1].pk])
+        self.assertEqual([e.pk for e in second], [emails[2].pk])
+        self.assertEqual(claim_batch(2), [])
+        self.assertEqual(OutboxEmail.objects.filter(status="sending").count(), 3)
+
+    def test_failed_send_backs_off(self):
+        email = enqueue("s", "m", ["a@example.com"])
+        before = timezone.now()
+
+        result = send_pending(connection=FailingBackend())
+        self.assertEqual(result, {"sent": 0, "retried": 1, "dead": 0})
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ("pending", 1))
+        self.assertIn("SMTP caído", email.last_error)
+        self.assertGreaterEqual(email.next_attempt_at, before + datetime.timedelta(seconds=30))
+
+        # Not due yet; the next delay is doubled
+        self.assertEqual(claim_batch(10), [])
+        claimed = claim_batch(10, now=email.next_attempt_at)
+        self.assertEqual([e.pk for e in claimed], [email.pk])
+        before = timezone.now()
+        send_batch(claimed, FailingBackend())
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ("pending", 2))
+        self.assertGreaterEqual(email.next_attempt_at, before + datetime.timedelta(seconds=60))
+        self.assertEqual(mail.outbox, [])
+
+    def test_dead_letter_after_max_attempts(self):
+        email = enqueue("s", "m", ["a@example.com"])
+        OutboxEmail.objects.filter(pk=email.pk).update(attempts=get_config()["MAX_ATTEMPTS"] - 1)
+
+        result = send_pending(connection=FailingBackend())
+        self.assertEqual(result, {"sent": 0, "retried": 0, "dead": 1})
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ("dead", 3))
+        # Dead rows are never claimed again
+        self.assertEqual(claim_batch(10, now=timezone.now() + datetime.timedelta(days=1)), [])
+
+    def test_stale_sending_rows_are_reclaimed(self):
+        email = enqueue("s", "m", ["a@example.com"])
+        claimed_at = timezone.now() - datetime.timedelta(seconds=301)
+        OutboxEmail.objects.filter(pk=email.pk).update(status="sending", claimed_at=claimed_at)
+        fresh = enqueue("t", "m", ["b@example.com"])
+        OutboxEmail.objects.filter(pk=fresh.pk).update(status="sending", claimed_at=timezone.now())
+
+        # Only the abandoned one is taken back; the fresh claim belongs to a live worker
+        self.assertEqual(send_pending(), {"sent": 1, "retried": 0, "dead": 0})
+        self.assertEqual([m.subject for m in mail.outbox], ["s"])
+        email.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual(email.status, "sent")
+        self.assertEqual(fresh.status, "sending")
+
+
+@override_settings(AUDIT_BUFFER={"ENABLED": False})
+class GenerateFixturesTests(TestCase):
+    def test_every_count_is_a_command_option(self):
+        out = StringIO()
+        call_command(
+            "generate_fixtures", users=5, assets=10, risks=10, controls=5, risk_controls=10, audit=10,
+            forum=8, notifications=10, broadcasts=10, outbox=10, system_settings=3,
+            seed=1, days=2, until="2026-10-01T12:00:00", stdout=out,
+        )
+        self.assertIn("Generated", out.getvalue())
+        self.assertEqual(User.objects.count(), 5)
+        self.assertEqual(BroadcastNotification.objects.count(), 10)
+        self.assertEqual(OutboxEmail.objects.count(), 10)
+        self.assertEqual(SystemSetting.objects.count(), 3)
+        self.assertEqual(UserActivityRollup.objects.count(), 48)
+        self.assertTrue(Control.objects.exists())
+
+
+@override_settings(AUDIT_BUFFER={"ENABLED": False})
+class DashboardSummaryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("viewer"))
+
+    def test_audit_writes_keep_the_cached_summary(self):
+        self.assertEqual(self.client.get("/api/dashboard/summary/").data["assets"]["total"], 0)
+
+        # What an audit buffer flush does while someone browses
+        AuditLog.objects.create(action="VIEW", entity="Risk")
+        bump("audit")
+        with self.assertNumQueries(0):
+            summary = self.client.get("/api/dashboard/summary/").data
+        self.assertEqual(summary["audit"]["last_24h"], 0)
+
+        InformationAsset.objects.create(name="CRM", asset_type="database")
+        summary = self.client.get("/api/dashboard/summary/").data
+        self.assertEqual(summary["assets"]["total"], 1)
+        self.assertEqual(summary["audit"]["last_24h"], 1)
+
+
+@override_settings(AUDIT_BUFFER={"ENABLED": False}, SQL_INSTRUMENTATION={"SAMPLE_RATE": 1.0})
+class SQLInstrumentationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("viewer", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_server_timing_on_sampled_requests(self):
+        response = self.client.get("/api/dashboard/summary/")
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ queries", serialize;dur=')
+
+    def test_streaming_responses_are_not_measured(self):
+        response = self.client.get("/api/audit/export/?type=ndjson")
+        self.assertTrue(response.streaming)
+        self.assertNotIn("Server-Timing", response)
+
+    async def test_async_stack_stays_async(self):
+        async def view(request):
+            return HttpResponse("ok")
+
+        middleware = SQLInstrumentationMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(AsyncRequestFactory().get("/api/stream/"))
+        self.assertIn("total;dur=", response["Server-Timing"])
+
+
+@override_settings(AUDIT_BUFFER={"ENABLED": False})
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        base = timezone.now() - datetime.timedelta(days=1)
+        # Three rows per timestamp, so every page boundary falls inside a tie
+        self.logs = [
+            AuditLog.objects.create(action="VIEW", entity="Risk", timestamp=base + datetime.timedelta(minutes=i // 3))
+            for i in range(10)
+        ]
+        self.expected = [log.id for log in sorted(self.logs, key=lambda log: (log.timestamp, log.id), reverse=True)]
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("auditor", is_staff=True))
+
+    def ids(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.data["results"]]
+
+    def test_ties_on_timestamp_are_broken_by_id(self):
+        url, pages = "/api/audit/?page_size=2", []
+        while url:
+            response = self.client.get(url)
+            pages.append(self.ids(response))
+            url = response.data["next"]
+        self.assertEqual([i for page in pages for i in page], self.expected)
+        self.assertEqual([len(page) for page in pages], [2, 2, 2, 2, 2])
+
+    def test_next_and_previous_round_trip(self):
+        first = self.client.get("/api/audit/?page_size=4")
+        self.assertIsNone(first.data["previous"])
+        second = self.client.get(first.data["next"])
+        third = self.client.get(second.data["next"])
+        self.assertEqual(self.ids(third), self.expected[8:])
+        self.assertIsNone(third.data["next"])
+
+        back = self.client.get(third.data["previous"])
+        self.assertEqual(self.ids(back), self.ids(second))
+        self.assertIsNotNone(back.data["previous"])
+        self.assertEqual(self.ids(self.client.get(back.data["next"])), self.expected[8:])
+        start = self.client.get(back.data["previous"])
+        self.assertEqual(self.ids(start), self.expected[:4])
+        self.assertIsNone(start.data["previous"])
+        self.assertEqual(self.ids(self.client.get(start.data["next"])), self.ids(second))
+
+    def test_invalid_cursor_is_not_found(self):
+        for token in ("nope", "%%%", encode_position(timezone.now(), 1)[:-4], "eyJ0IjoxfQ=="):
+            response = self.client.get("/api/audit/", {"cursor": token})
+            self.assertEqual(response.status_code, 404, token)
+        with self.assertRaises(ValueError):
+            decode_position("eyJ0IjoieCIsImkiOjF9")  # {"t":"x","i":1}
+
+        timestamp = timezone.now()
+        self.assertEqual(decode_position(encode_position(timestamp, 7, reverse=True)), ((timestamp, 7, None), True))
+
+    def test_page_size_is_clamped(self):
+        paginator = KeysetPagination()
+        factory = APIRequestFactory()
+        cases = {"": 50, "10": 10, "0": 50, "-3": 50, "abc": 50, "500": 500, "9999": 500}
+        for value, size in cases.items():
+            request = Request(factory.get("/", {"page_size": value} if value else {}))
+            self.assertEqual(paginator.get_page_size(request), size, value)
+
+        self.assertEqual(len(self.ids(self.client.get("/api/audit/?page_size=9999"))), 10)
+        self.assertEqual(len(self.ids(self.client.get("/api/audit/?page_size=0"))), 10)
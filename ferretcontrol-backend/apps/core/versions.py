@@ -0,0 +1,126 @@
+"""
+Cache-backed version counters for collections ("assets", "risks", ...).
+
+Writers call ``bump(name)``; readers fold ``get_versions(...)`` into their
+cache keys or ETags, so a write invalidates every derived cache entry at
+once without having to know or delete the individual keys. ``bump`` is
+an atomic ``incr``; next to each counter the time of the last write is
+kept for Last-Modified (``last_modified``).
+
+Counters start from the clock (in microseconds), so a flushed or expired
+counter never hands out an old version again.
+
+Workers only see each other's bumps through a shared cache (see
+settings_production). With a per-process LocMemCache, versions expire
+after COLLECTION_VERSIONS["LOCAL_TTL"] seconds instead of never. A
+worker that missed another worker's write then picks up a fresh version
+after at most that long, rather than answering 304 indefinitely.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+KEY_PREFIX = "collection-version:"
+MODIFIED_PREFIX = "collection-modified:"
+
+DEFAULTS = {
+    "LOCAL_TTL": 30,    # seconds a version lives in a process-local cache
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, "COLLECTION_VERSIONS", {}))
+    return config
+
+
+def version_ttl():
+    """None (never expire) for a shared cache, LOCAL_TTL for a per-process one."""
+    if isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache):
+        return get_config()["LOCAL_TTL"]
+    return None
+
+
+def _initial():
+    return int(time.time() * 1_000_000)
+
+
+def _read(names):
+    keys = [KEY_PREFIX + name for name in names] + [MODIFIED_PREFIX + name for name in names]
+    found = cache.get_many(keys)
+    missing = [name for name in names if KEY_PREFIX + name not in found or MODIFIED_PREFIX + name not in found]
+    if missing:
+        ttl = version_ttl()
+        for name in missing:
+            if KEY_PREFIX + name not in found:
+                # A new counter: anything cached against the old one is stale
+                cache.add(KEY_PREFIX + name, _initial(), ttl)
+                cache.set(MODIFIED_PREFIX + name, time.time(), ttl)
+            else:
+                cache.add(MODIFIED_PREFIX + name, time.time(), ttl)
+        found.update(cache.get_many([prefix + name for name in missing for prefix in (KEY_PREFIX, MODIFIED_PREFIX)]))
+    return found
+
+
+def get_versions(*names):
+    found = _read(names)
+    return tuple(found.get(KEY_PREFIX + name, 0) for name in names)
+
+
+def get_version(name):
+    return get_versions(name)[0]
+
+
+def get_validators(*names):
+    """``(versions, last_modified)``: the versions plus the latest write time (epoch seconds)."""
+    found = _read(names)
+    versions = tuple(found.get(KEY_PREFIX + name, 0) for name in names)
+    modified = [found[MODIFIED_PREFIX + name] for name in names if MODIFIED_PREFIX + name in found]
+    return versions, (int(max(modified)) if modified else None)
+
+
+def bump(name):
+    key = KEY_PREFIX + name
+    ttl = version_ttl()
+    version = _initial()
+    if not cache.add(key, version, ttl):
+        try:
+            version = cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr()
+            cache.add(key, version, ttl)
+    cache.set(MODIFIED_PREFIX + name, time.time(), ttl)
+    return version
+
+
+# Models whose writes bump a collection version (connected in CoreConfig.ready).
+# Code that writes through queryset.update()/bulk_create() must bump by hand.
+TRACKED_MODELS = {
+    "auth.User": "users",
+    "accounts.UserProfile": "users",
+    "accounts.UserSessionStatus": "users",
+    "accounts.SecurityNotification": "notifications",
+    "accounts.BroadcastNotification": "notifications",
+    "accounts.BroadcastReceipt": "notifications",
+    "assets.InformationAsset": "assets",
+    "risks.Risk": "risks",
+    "controls.Control": "controls",
+    "controls.RiskControl": "risk_controls",
+    "audit.AuditLog": "audit",
+    "core.SystemSetting": "settings",
+    "forum.ForumPost": "forum",
+}
+
+
+def connect_signals():
+    from django.db.models.signals import post_delete, post_save
+
+    for label, name in TRACKED_MODELS.items():
+        def on_change(sender, name=name, **kwargs):
+            bump(name)
+
+        uid = label.replace(".", "_").lower()
+        post_save.connect(on_change, sender=label, weak=False, dispatch_uid=f"version_save_{uid}")
+        post_delete.connect(on_change, sender=label, weak=False, dispatch_uid=f"version_delete_{uid}")
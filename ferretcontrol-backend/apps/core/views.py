@@ -2,14 +2,16 @@ from rest_framework import viewsets
 from rest_framework.permissions import IsAdminUser
 from .models import SystemSetting
 from rest_framework import serializers
+from .conditional import ConditionalGetMixin
 
 class SystemSettingSerializer(serializers.ModelSerializer):
     class Meta:
         model = SystemSetting
         fields = '__all__'
 
-class SystemSettingViewSet(viewsets.ModelViewSet):
+class SystemSettingViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = SystemSetting.objects.all()
+    etag_collections = ("settings",)
     serializer_class = SystemSettingSerializer
     # Only admins should change system settings
     permission_classes = [IsAdminUser]
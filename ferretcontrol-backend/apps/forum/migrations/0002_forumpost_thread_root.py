@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_thread_root(apps, schema_editor):
+    ForumPost = apps.get_model("forum", "ForumPost")
+    parents = dict(ForumPost.objects.values_list("id", "parent_id"))
+    for post_id, parent_id in parents.items():
+        if parent_id is None:
+            continue
+        root = parent_id
+        while parents.get(root) is not None:
+            root = parents[root]
+        ForumPost.objects.filter(id=post_id).update(thread_root_id=root)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="forumpost",
+            name="thread_root",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="thread_posts",
+                to="forum.forumpost",
+            ),
+        ),
+        migrations.RunPython(backfill_thread_root, migrations.RunPython.noop),
+    ]
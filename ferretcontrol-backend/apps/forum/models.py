@@ -6,6 +6,15 @@ class ForumPost(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     parent = models.ForeignKey('self', null=True, blank=True, on_delete=models.CASCADE, related_name='replies')
+    # Top-level post of the thread (NULL for top-level posts), so a whole
+    # thread loads with one `thread_root IN (...)` query.
+    thread_root = models.ForeignKey('self', null=True, blank=True, editable=False,
+                                    on_delete=models.CASCADE, related_name='thread_posts')
+
+    def save(self, *args, **kwargs):
+        if self.parent_id and not self.thread_root_id:
+            self.thread_root_id = self.parent.thread_root_id or self.parent_id
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.author.username} - {self.created_at}"
@@ -1,23 +1,79 @@
+from collections import defaultdict
+
+from django.conf import settings
 from rest_framework import serializers
 from .models import ForumPost
 from django.contrib.auth.models import User
 
+
+def load_thread_children(roots):
+    """
+    Fetch every reply of the given top-level posts in a single query and
+    group them by parent id, oldest first.
+    """
+    root_ids = [root.pk for root in roots]
+    children = defaultdict(list)
+    if not root_ids:
+        return children
+    replies = (
+        ForumPost.objects.filter(thread_root_id__in=root_ids)
+        .select_related('author__profile')
+        .order_by('created_at', 'id')
+    )
+    for reply in replies:
+        children[reply.parent_id].append(reply)
+    return children
+
+
+class ForumThreadListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        if 'thread_children' not in self.context:
+            roots = list(data.all() if hasattr(data, 'all') else data)
+            self.context['thread_children'] = load_thread_children(roots)
+            data = roots
+        return super().to_representation(data)
+
+
 class ForumPostSerializer(serializers.ModelSerializer):
     author_username = serializers.CharField(source='author.username', read_only=True)
     author_avatar = serializers.SerializerMethodField()
     replies = serializers.SerializerMethodField()
+    reply_count = serializers.SerializerMethodField()
 
     class Meta:
         model = ForumPost
-        fields = ['id', 'author', 'author_username', 'author_avatar', 'content', 'created_at', 'parent', 'replies']
+        fields = ['id', 'author', 'author_username', 'author_avatar', 'content', 'created_at', 'parent', 'replies', 'reply_count']
         read_only_fields = ['author', 'created_at']
+        list_serializer_class = ForumThreadListSerializer
+
+    def validate_parent(self, parent):
+        # thread_root is derived from parent once; moving a post between
+        # threads would orphan it and its replies from both of them.
+        if self.instance is not None and parent != self.instance.parent:
+            raise serializers.ValidationError("No se puede mover un mensaje a otro hilo.")
+        return parent
 
     def get_author_avatar(self, obj):
         if hasattr(obj.author, 'profile') and obj.author.profile.avatar:
             return obj.author.profile.avatar.url
         return None
 
+    def _children(self, obj):
+        if 'thread_children' not in self.context:
+            # Single post (retrieve/create): load its thread on first access.
+            root = obj if obj.thread_root_id is None else obj.thread_root
+            self.context['thread_children'] = load_thread_children([root])
+        return self.context['thread_children'].get(obj.pk, [])
+
+    def get_reply_count(self, obj):
+        return len(self._children(obj))
+
     def get_replies(self, obj):
-        if obj.replies.exists():
-            return ForumPostSerializer(obj.replies.all(), many=True).data
-        return []
+        depth = self.context.get('thread_depth', 0)
+        if depth >= settings.FORUM_THREAD_MAX_DEPTH:
+            return []
+        children = self._children(obj)[:settings.FORUM_THREAD_MAX_REPLIES]
+        if not children:
+            return []
+        context = dict(self.context, thread_depth=depth + 1)
+        return ForumPostSerializer(children, many=True, context=context).data
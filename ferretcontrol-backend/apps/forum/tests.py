@@ -1,3 +1,69 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from apps.accounts.models import UserProfile
+from .models import ForumPost
+
+
+@override_settings(AUDIT_BUFFER={"ENABLED": False})
+class ForumThreadQueryCountTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("author")
+        UserProfile.objects.create(user=self.user, display_name="Author")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_thread(self, depth, width=2):
+        """A top-level post with ``width`` replies per post, ``depth`` levels deep."""
+        root = ForumPost.objects.create(author=self.user, content="root")
+        level = [root]
+        for _ in range(depth):
+            level = [
+                ForumPost.objects.create(author=self.user, content="reply", parent=post)
+                for post in level for _ in range(width)
+            ]
+        return root
+
+    def test_list_runs_in_fixed_number_of_queries(self):
+        self.add_thread(depth=1)
+        with self.assertNumQueries(2):  # top-level posts + every reply of those threads
+            response = self.client.get("/api/forum/")
+        self.assertEqual(len(response.json()), 1)
+
+        for _ in range(4):
+            self.add_thread(depth=3)
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/forum/")
+        threads = response.json()
+        self.assertEqual(len(threads), 5)
+        deepest = threads[0]["replies"][0]["replies"][0]["replies"][0]
+        self.assertEqual(deepest["content"], "reply")
+        self.assertEqual(threads[0]["reply_count"], 2)
+
+    def test_retrieve_runs_in_fixed_number_of_queries(self):
+        root = self.add_thread(depth=3)
+        with self.assertNumQueries(2):
+            response = self.client.get(f"/api/forum/{root.pk}/")
+        self.assertEqual(len(response.json()["replies"][0]["replies"]), 2)
+
+    def test_reply_gets_thread_root(self):
+        root = self.add_thread(depth=0)
+        response = self.client.post("/api/forum/", {"content": "hola", "parent": root.pk})
+        self.assertEqual(response.status_code, 201)
+        reply = ForumPost.objects.get(pk=response.json()["id"])
+        nested = ForumPost.objects.create(author=self.user, content="x", parent=reply)
+        self.assertEqual(reply.thread_root_id, root.pk)
+        self.assertEqual(nested.thread_root_id, root.pk)
+
+    def test_parent_cannot_change_on_update(self):
+        first = self.add_thread(depth=1)
+        second = self.add_thread(depth=0)
+        response = self.client.patch(f"/api/forum/{first.pk}/", {"parent": second.pk})
+        self.assertEqual(response.status_code, 400)
+        first.refresh_from_db()
+        self.assertIsNone(first.parent_id)
+
+        response = self.client.patch(f"/api/forum/{first.pk}/", {"content": "editado"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["reply_count"], 2)
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class RisksConfig(AppConfig):
     name = "apps.risks"
+
+    def ready(self):
+        from . import heatmap
+
+        heatmap.connect_signals()
@@ -0,0 +1,161 @@
+"""
+Risk heatmap: counts of risks per (likelihood, impact, status, asset
+classification), stored in RiskHeatmapCell.
+
+Risk saves and deletes, and asset classification changes, move counts
+between cells as they happen, so reading the matrix never scans Risk.
+Risk.save() and InformationAsset.save() run in a transaction (deletes
+already do), so the read of the stored cell and the move are atomic;
+with the IMMEDIATE transactions of settings_production, concurrent
+edits of the same risk are serialized.
+Writes that bypass signals (queryset.update(), bulk_create()) must be
+followed by ``manage.py rebuild_risk_heatmap``.
+"""
+from django.db import transaction
+from django.db.models import Count, F
+
+from apps.assets.models import InformationAsset
+from .models import Risk, RiskHeatmapCell
+
+SCALE = range(1, 6)
+
+
+def _clamp(value):
+    return min(max(int(value), SCALE[0]), SCALE[-1])
+
+
+def cell_key(likelihood, impact, status, classification):
+    return (_clamp(likelihood), _clamp(impact), status, classification)
+
+
+def adjust(key, delta):
+    if not delta:
+        return
+    likelihood, impact, status, classification = key
+    fields = dict(likelihood=likelihood, impact=impact, status=status, classification=classification)
+    if not RiskHeatmapCell.objects.filter(**fields).update(count=F("count") + delta):
+        RiskHeatmapCell.objects.get_or_create(**fields)
+        RiskHeatmapCell.objects.filter(**fields).update(count=F("count") + delta)
+
+
+def move(old, new, n=1):
+    if old == new:
+        return
+    if old is not None:
+        adjust(old, -n)
+    if new is not None:
+        adjust(new, n)
+
+
+def rebuild():
+    """Recompute every cell from the Risk table; returns the number of risks counted."""
+    counts = {}
+    rows = (
+        Risk.objects.values("likelihood", "impact", "status", "asset__classification")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    for row in rows:
+        key = cell_key(row["likelihood"], row["impact"], row["status"], row["asset__classification"])
+        counts[key] = counts.get(key, 0) + row["n"]
+    with transaction.atomic():
+        RiskHeatmapCell.objects.all().delete()
+        RiskHeatmapCell.objects.bulk_create([
+            RiskHeatmapCell(likelihood=l, impact=i, status=s, classification=c, count=n)
+            for (l, i, s, c), n in counts.items()
+        ])
+    return sum(counts.values())
+
+
+def matrix(statuses=None, classifications=None):
+    """
+    5x5 matrix indexed ``[likelihood - 1][impact - 1]`` plus totals, read
+    from at most 5 * 5 * statuses * classifications cells.
+    """
+    cells = RiskHeatmapCell.objects.filter(count__gt=0)
+    if statuses:
+        cells = cells.filter(status__in=statuses)
+    if classifications:
+        cells = cells.filter(classification__in=classifications)
+
+    grid = [[0 for _ in SCALE] for _ in SCALE]
+    by_level = {level: 0 for level, _ in Risk.LEVEL}
+    by_status = {}
+    by_classification = {}
+    for cell in cells.values("likelihood", "impact", "status", "classification", "count"):
+        n = cell["count"]
+        grid[cell["likelihood"] - 1][cell["impact"] - 1] += n
+        by_level[Risk.level_for_score(cell["likelihood"] * cell["impact"])] += n
+        by_status[cell["status"]] = by_status.get(cell["status"], 0) + n
+        by_classification[cell["classification"]] = by_classification.get(cell["classification"], 0) + n
+    return {
+        "likelihood": list(SCALE),
+        "impact": list(SCALE),
+        "matrix": grid,
+        "total": sum(by_status.values()),
+        "by_level": by_level,
+        "by_status": by_status,
+        "by_classification": by_classification,
+    }
+
+
+def _stored_key(risk_id):
+    row = (
+        Risk.objects.filter(pk=risk_id)
+        .values_list("likelihood", "impact", "status", "asset__classification")
+        .first()
+    )
+    return cell_key(*row) if row else None
+
+
+def connect_signals():
+    from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+
+    def before_risk_save(sender, instance, raw=False, **kwargs):
+        if raw:
+            return
+        instance._heatmap_old_key = _stored_key(instance.pk) if instance.pk else None
+
+    def after_risk_save(sender, instance, raw=False, **kwargs):
+        if raw:
+            return
+        new = cell_key(instance.likelihood, instance.impact, instance.status, instance.asset.classification)
+        move(getattr(instance, "_heatmap_old_key", None), new)
+        instance._heatmap_old_key = new
+
+    def before_risk_delete(sender, instance, **kwargs):
+        instance._heatmap_old_key = _stored_key(instance.pk)
+
+    def after_risk_delete(sender, instance, **kwargs):
+        move(getattr(instance, "_heatmap_old_key", None), None)
+
+    def before_asset_save(sender, instance, raw=False, **kwargs):
+        if raw or not instance.pk:
+            return
+        instance._heatmap_old_classification = (
+            InformationAsset.objects.filter(pk=instance.pk).values_list("classification", flat=True).first()
+        )
+
+    def after_asset_save(sender, instance, created, raw=False, **kwargs):
+        old = getattr(instance, "_heatmap_old_classification", None)
+        if raw or created or old is None or old == instance.classification:
+            return
+        rows = (
+            Risk.objects.filter(asset=instance)
+            .values("likelihood", "impact", "status")
+            .annotate(n=Count("id"))
+            .order_by()
+        )
+        for row in rows:
+            move(
+                cell_key(row["likelihood"], row["impact"], row["status"], old),
+                cell_key(row["likelihood"], row["impact"], row["status"], instance.classification),
+                row["n"],
+            )
+
+    pre_save.connect(before_risk_save, sender=Risk, dispatch_uid="heatmap_risk_pre_save")
+    post_save.connect(after_risk_save, sender=Risk, dispatch_uid="heatmap_risk_post_save")
+    pre_delete.connect(before_risk_delete, sender=Risk, dispatch_uid="heatmap_risk_pre_delete")
+    post_delete.connect(after_risk_delete, sender=Risk, dispatch_uid="heatmap_risk_post_delete")
+    pre_save.connect(before_asset_save, sender=InformationAsset, dispatch_uid="heatmap_asset_pre_save")
+    post_save.connect(after_asset_save, sender=InformationAsset, dispatch_uid="heatmap_asset_post_save")
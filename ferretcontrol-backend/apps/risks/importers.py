@@ -0,0 +1,42 @@
+from collections import Counter
+
+from rest_framework import serializers
+
+from apps.assets.models import InformationAsset
+from apps.core.bulk_import import BulkImporter
+from apps.core.search import get_index, index_documents
+from . import heatmap
+from .models import Risk
+from .serializers import RiskImportSerializer
+
+
+class RiskImporter(BulkImporter):
+    model = Risk
+    serializer_class = RiskImportSerializer
+    version = "risks"
+
+    def prepare_chunk(self, rows):
+        ids = set()
+        for row in rows:
+            try:
+                ids.add(int(row.get("asset")))
+            except (TypeError, ValueError):
+                pass
+        return {"assets": InformationAsset.objects.in_bulk(ids)}
+
+    def build(self, data, context):
+        asset = context["assets"].get(data.pop("asset"))
+        if asset is None:
+            raise serializers.ValidationError({"asset": ["El activo no existe."]})
+        risk = Risk(asset=asset, **data)
+        # bulk_create skips save(), so score and level are set here
+        risk.recalc()
+        return risk
+
+    def after_insert(self, objs):
+        index_documents(get_index("risks"), objs)
+        cells = Counter(
+            heatmap.cell_key(r.likelihood, r.impact, r.status, r.asset.classification) for r in objs
+        )
+        for key, n in cells.items():
+            heatmap.adjust(key, n)
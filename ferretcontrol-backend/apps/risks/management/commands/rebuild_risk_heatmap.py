@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from apps.core.versions import bump
+from apps.risks.heatmap import rebuild
+
+class Command(BaseCommand):
+    help = "Recompute the risk heatmap table from the Risk table (run after bulk imports)"
+
+    def handle(self, *args, **options):
+        n = rebuild()
+        bump("risks")
+        self.stdout.write(self.style.SUCCESS(f"Heatmap rebuilt from {n} risks"))
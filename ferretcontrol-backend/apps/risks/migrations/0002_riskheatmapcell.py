@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:43
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_heatmap(apps, schema_editor):
+    Risk = apps.get_model("risks", "Risk")
+    RiskHeatmapCell = apps.get_model("risks", "RiskHeatmapCell")
+    counts = {}
+    rows = (
+        Risk.objects.values("likelihood", "impact", "status", "asset__classification")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    for row in rows:
+        key = (
+            min(max(row["likelihood"], 1), 5),
+            min(max(row["impact"], 1), 5),
+            row["status"],
+            row["asset__classification"],
+        )
+        counts[key] = counts.get(key, 0) + row["n"]
+    RiskHeatmapCell.objects.bulk_create(
+        [
+            RiskHeatmapCell(likelihood=l, impact=i, status=s, classification=c, count=n)
+            for (l, i, s, c), n in counts.items()
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("risks", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RiskHeatmapCell",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("likelihood", models.IntegerField()),
+                ("impact", models.IntegerField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("open", "Open"),
+                            ("treating", "Treating"),
+                            ("closed", "Closed"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "classification",
+                    models.CharField(
+                        choices=[
+                            ("public", "Public"),
+                            ("internal", "Internal"),
+                            ("confidential", "Confidential"),
+                            ("restricted", "Restricted"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+            ],
+            options={
+                "unique_together": {
+                    ("likelihood", "impact", "status", "classification")
+                },
+            },
+        ),
+        migrations.RunPython(fill_heatmap, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, router, transaction
 from apps.assets.models import InformationAsset
 
 class Risk(models.Model):
@@ -27,21 +27,46 @@ class Risk(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
-    def recalc(self):
-        s = int(self.likelihood) * int(self.impact)
-        self.score = s
+    @staticmethod
+    def level_for_score(s):
         if s <= 4:
-            self.level = "low"
+            return "low"
         elif s <= 9:
-            self.level = "medium"
+            return "medium"
         elif s <= 16:
-            self.level = "high"
-        else:
-            self.level = "critical"
+            return "high"
+        return "critical"
+
+    def recalc(self):
+        s = int(self.likelihood) * int(self.impact)
+        self.score = s
+        self.level = self.level_for_score(s)
 
     def save(self, *args, **kwargs):
         self.recalc()
-        super().save(*args, **kwargs)
+        # The heatmap signals read the stored cell before the save and move
+        # the count after it; one transaction keeps concurrent edits of the
+        # same risk from both moving it out of the same old cell.
+        with transaction.atomic(using=kwargs.get("using") or router.db_for_write(Risk, instance=self)):
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.title} ({self.level})"
+
+
+class RiskHeatmapCell(models.Model):
+    """
+    Materialized likelihood x impact matrix, split by risk status and asset
+    classification. Kept up to date by the signals in apps.risks.heatmap.
+    """
+    likelihood = models.IntegerField()
+    impact = models.IntegerField()
+    status = models.CharField(max_length=20, choices=Risk.STATUS)
+    classification = models.CharField(max_length=20, choices=InformationAsset.CLASSIFICATIONS)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("likelihood", "impact", "status", "classification")
+
+    def __str__(self):
+        return f"{self.likelihood}x{self.impact} {self.status}/{self.classification}: {self.count}"
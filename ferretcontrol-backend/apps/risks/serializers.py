@@ -7,3 +7,12 @@ class RiskSerializer(serializers.ModelSerializer):
     class Meta:
         model = Risk
         fields = "__all__"
+
+
+class RiskImportSerializer(serializers.ModelSerializer):
+    """Row validation for bulk imports; assets are resolved once per chunk."""
+    asset = serializers.IntegerField()
+
+    class Meta:
+        model = Risk
+        exclude = ["id", "score", "level", "created_at"]
@@ -1,3 +1,84 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.assets.models import InformationAsset
+from . import heatmap
+from .models import Risk
+
+
+@override_settings(AUDIT_BUFFER={"ENABLED": False})
+class RiskHeatmapTests(TestCase):
+    def setUp(self):
+        self.asset = InformationAsset.objects.create(name="CRM", asset_type="database", classification="internal")
+        self.other = InformationAsset.objects.create(name="ERP", asset_type="database", classification="public")
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("analyst"))
+
+    def assertMatchesRebuild(self):
+        live = heatmap.matrix()
+        heatmap.rebuild()
+        self.assertEqual(live, heatmap.matrix())
+        return live
+
+    def test_create_update_and_delete(self):
+        response = self.client.post("/api/risks/", {"asset": self.asset.pk, "title": "Fuga", "likelihood": 4, "impact": 5})
+        self.assertEqual(response.status_code, 201)
+        Risk.objects.create(asset=self.other, title="Caída", likelihood=2, impact=2)
+        live = self.assertMatchesRebuild()
+        self.assertEqual(live["matrix"][3][4], 1)
+        self.assertEqual(live["by_classification"], {"internal": 1, "public": 1})
+
+        risk = Risk.objects.get(title="Fuga")
+        response = self.client.patch(f"/api/risks/{risk.pk}/", {"likelihood": 1, "status": "treating"})
+        self.assertEqual(response.status_code, 200)
+        live = self.assertMatchesRebuild()
+        self.assertEqual((live["matrix"][3][4], live["matrix"][0][4]), (0, 1))
+        self.assertEqual(live["by_status"], {"open": 1, "treating": 1})
+
+        # A stale instance still moves the count out of the stored cell
+        stale = Risk.objects.get(pk=risk.pk)
+        Risk.objects.get(pk=risk.pk).save()
+        stale.impact = 3
+        stale.save()
+        self.assertMatchesRebuild()
+
+        risk.delete()
+        live = self.assertMatchesRebuild()
+        self.assertEqual(live["total"], 1)
+
+        self.other.delete()  # cascades to its risks
+        self.assertEqual(self.assertMatchesRebuild()["total"], 0)
+
+    def test_asset_reclassification_moves_its_risks(self):
+        for likelihood in (1, 3, 3):
+            Risk.objects.create(asset=self.asset, title="r", likelihood=likelihood, impact=2)
+        Risk.objects.create(asset=self.other, title="r", likelihood=3, impact=2)
+
+        response = self.client.patch(f"/api/assets/{self.asset.pk}/", {"classification": "restricted"})
+        self.assertEqual(response.status_code, 200)
+        live = self.assertMatchesRebuild()
+        self.assertEqual(live["by_classification"], {"restricted": 3, "public": 1})
+        self.assertEqual(live["matrix"][2][1], 3)
+        self.assertEqual(heatmap.matrix(classifications=["restricted"])["matrix"][2][1], 2)
+
+    def test_stored_cell_is_read_inside_the_save_transaction(self):
+        risk = Risk.objects.create(asset=self.asset, title="r", likelihood=2, impact=2)
+        outer = len(connection.atomic_blocks)
+        depths = []
+
+        def stored_key(risk_id):
+            depths.append(len(connection.atomic_blocks))
+            return stored_key.wrapped(risk_id)
+
+        stored_key.wrapped = heatmap._stored_key
+        with mock.patch.object(heatmap, "_stored_key", stored_key):
+            risk.likelihood = 5
+            risk.save()
+            risk.delete()
+        self.assertEqual(len(depths), 2)
+        self.assertTrue(all(depth > outer for depth in depths))
+        self.assertMatchesRebuild()
@@ -1,11 +1,43 @@
 from rest_framework import viewsets, filters
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from apps.core.search import FullTextSearchFilter
+from . import heatmap
 from .models import Risk
 from .serializers import RiskSerializer
+from apps.core.bulk_import import import_response
+from apps.core.conditional import ConditionalGetMixin
+from .importers import RiskImporter
 
-class RiskViewSet(viewsets.ModelViewSet):
+class RiskViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'head', 'put', 'patch']
     queryset = Risk.objects.select_related("asset").all().order_by("-created_at")
+    etag_collections = ("risks", "assets")
     serializer_class = RiskSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [FullTextSearchFilter, filters.OrderingFilter]
+    search_index = "risks"
     search_fields = ["title", "description", "asset__name"]
     ordering_fields = ["created_at", "score", "level", "status"]
+
+    @action(detail=False, methods=["get"])
+    def heatmap(self, request):
+        """
+        GET /api/risks/heatmap/?status=open,treating&classification=restricted
+        Likelihood x impact matrix read from the materialized heatmap table.
+        """
+        return self.conditional_response(self._heatmap, request)
+
+    def _heatmap(self, request):
+        def csv_param(name):
+            value = request.query_params.get(name, "")
+            return [v for v in value.split(",") if v]
+
+        return Response(heatmap.matrix(
+            statuses=csv_param("status"),
+            classifications=csv_param("classification"),
+        ))
+
+    @action(detail=False, methods=["post"], url_path="import")
+    def import_records(self, request):
+        """POST /api/risks/import/ — bulk load from CSV or NDJSON (``asset`` is the asset id)."""
+        return import_response(RiskImporter, request)
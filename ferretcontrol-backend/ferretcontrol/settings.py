@@ -54,6 +54,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost so its "total" covers the whole stack
+    "apps.core.instrumentation.SQLInstrumentationMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -150,7 +152,7 @@ DEFAULT_FROM_EMAIL = 'FerretControl <rpieroalexandro@gmail.com>'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.accounts.authentication.CachedJWTAuthentication",
     ),
      "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
@@ -162,7 +164,81 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=2),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
 }
+# Seconds an authenticated user stays cached by CachedJWTAuthentication
+AUTH_USER_CACHE_TTL = 60
 
 # CORS Configuration
 CORS_ALLOW_ALL_ORIGINS = True  # For development only
 
+
+# Audit middleware writes through an in-process buffer (apps.audit.buffer)
+AUDIT_BUFFER = {
+    "ENABLED": True,
+    "MAX_QUEUE": 10000,
+    "BATCH_SIZE": 200,
+    "FLUSH_INTERVAL": 1.0,
+    "OVERFLOW": "drop",  # "drop" or "sync"
+}
+
+# Audit retention: rows older than AUDIT_RETENTION_DAYS are moved to
+# gzip NDJSON day segments by `manage.py archive_audit`.
+AUDIT_RETENTION_DAYS = 90
+AUDIT_ARCHIVE_DIR = BASE_DIR / "audit_archive"
+
+# Forum threads are loaded in one query and nested in memory up to these limits
+FORUM_THREAD_MAX_DEPTH = 10
+FORUM_THREAD_MAX_REPLIES = 100
+
+# Cache (per-process memory by default; point this at a shared backend such
+# as Redis in production so invalidations reach every worker)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+# Collection versions behind ETags and cache keys (apps.core.versions). In a
+# per-process cache they expire after LOCAL_TTL seconds, bounding how long
+# a worker can miss another worker's write.
+COLLECTION_VERSIONS = {
+    "LOCAL_TTL": 30,
+}
+
+# Seconds the aggregated /api/dashboard/summary/ response is cached
+DASHBOARD_SUMMARY_TTL = 15
+
+# Server-Sent Events at /api/stream/ (served by ASGI, see ferretcontrol/asgi.py)
+EVENT_STREAM = {
+    "BROKER": "apps.core.events.InProcessBroker",
+    "HEARTBEAT": 15,
+    "HISTORY": 1000,
+    "QUEUE_SIZE": 500,
+    "TICKET_TTL": 30,
+}
+
+# Write the informational "login successful" notification in a background
+# thread after the token response (security alerts are always inline)
+LOGIN_DEFER_NOTIFICATIONS = False
+
+# Seconds between checks of the shared "settings" version by get_flag()
+FLAGS_RECHECK_INTERVAL = 1.0
+
+# Outbox worker (manage.py send_outbox), see apps/core/outbox.py
+EMAIL_OUTBOX = {
+    "BATCH_SIZE": 50,
+    "MAX_ATTEMPTS": 5,
+    "BACKOFF": 30,
+    "MAX_BACKOFF": 3600,
+    "CLAIM_TIMEOUT": 300,
+}
+
+# Sampled per-request SQL timing: Server-Timing header and slow-request log
+# (see apps/core/instrumentation.py)
+SQL_INSTRUMENTATION = {
+    "ENABLED": True,
+    "SAMPLE_RATE": 1.0 if DEBUG else 0.05,
+    "SLOW_MS": 500,
+    "MAX_QUERIES": 50,
+    "TOP_STATEMENTS": 5,
+    "SERVER_TIMING": True,
+}
@@ -0,0 +1,81 @@
+"""
+Production database profile:
+
+    DJANGO_SETTINGS_MODULE=ferretcontrol.settings_production
+
+The main database gets the tuned SQLite profile from ferretcontrol.database.
+The append-heavy audit tables go to their own file (audit.sqlite3), so
+audit inserts never wait for the register's write lock. Set
+SEPARATE_NOTIFICATIONS_DB to move the notification tables out as well.
+Migrate every database, the side ones first: a data migration run on
+"default" (accounts 0006) reads the notification tables through the
+router, so they must already exist in their file:
+
+    python manage.py migrate --database notifications   # if enabled
+    python manage.py migrate --database audit
+    python manage.py migrate
+
+To move existing audit rows into the new file:
+
+    python manage.py dumpdata audit --database default -o audit.json
+    python manage.py loaddata audit.json --database audit
+
+The side databases hold foreign keys into auth_user, which lives in
+another file. SQLite can't check those, so foreign-key enforcement is
+off there (and the ferretcontrol.sqlite_side backend skips Django's
+post-migration and loaddata check) and the ORM never joins across the
+files. For the same reason
+users can't be deleted in this layout: the delete cascade can't reach
+the other files. The API has no user DELETE; deactivate users instead.
+
+Every worker process shares one Redis cache (REDIS_URL; needs the
+``redis`` package): the collection versions, feature flags, /me and JWT
+user caches and the stats cache all assume that a write seen by one
+worker is seen by the others. Redis also makes the version counters'
+add() and incr() atomic (SET NX, INCR), which a file or database cache
+can't, and each access is one round trip instead of file I/O.
+
+DEBUG, SECRET_KEY and ALLOWED_HOSTS still have to be set for the
+deployment.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+from .database import sqlite_database
+
+SEPARATE_NOTIFICATIONS_DB = False
+
+# FKs into auth_user point at another file; see above
+SIDE_DATABASE_PRAGMAS = {"foreign_keys": "OFF"}
+SIDE_DATABASE_ENGINE = "ferretcontrol.sqlite_side"
+
+DATABASES = {
+    "default": sqlite_database(BASE_DIR / "db.sqlite3"),
+    "audit": sqlite_database(BASE_DIR / "audit.sqlite3", pragmas=SIDE_DATABASE_PRAGMAS,
+                             engine=SIDE_DATABASE_ENGINE),
+}
+# App labels or "app.Model" labels -> database alias (apps.core.db_routers)
+DATABASE_APPS_MAPPING = {
+    "audit": "audit",
+}
+
+if SEPARATE_NOTIFICATIONS_DB:
+    DATABASES["notifications"] = sqlite_database(BASE_DIR / "notifications.sqlite3",
+                                                  pragmas=SIDE_DATABASE_PRAGMAS, engine=SIDE_DATABASE_ENGINE)
+    DATABASE_APPS_MAPPING.update({
+        "accounts.SecurityNotification": "notifications",
+        "accounts.BroadcastNotification": "notifications",
+        "accounts.BroadcastReceipt": "notifications",
+        "accounts.NotificationReadState": "notifications",
+    })
+
+DATABASE_ROUTERS = ["apps.core.db_routers.AppDatabaseRouter"]
+
+# Shared by every worker process; see above
+REDIS_URL = "redis://127.0.0.1:6379/1"
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+        "KEY_PREFIX": "ferretcontrol",
+    }
+}
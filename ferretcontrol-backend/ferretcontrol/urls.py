@@ -20,18 +20,19 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 from apps.assets.views import InformationAssetViewSet
 from apps.risks.views import RiskViewSet
 from apps.controls.views import ControlViewSet, RiskControlViewSet
 from apps.audit.views import AuditLogViewSet
 from apps.accounts.views import UserViewSet
-from apps.accounts.stats_views import AccessControlStatsView
-from apps.accounts.auth_views import CustomTokenObtainPairView, LogoutView
+from apps.accounts.stats_views import AccessControlStatsView, AccessControlTrendView
+from apps.accounts.auth_views import CustomTokenObtainPairView, LogoutView, VersionedTokenRefreshView
 from apps.accounts.notification_views import SecurityNotificationViewSet
 from apps.accounts.password_views import RequestPasswordResetView, ResetPasswordView
 from apps.core.views import SystemSettingViewSet
+from apps.core.dashboard_views import DashboardSummaryView
+from apps.core.stream_views import StreamTicketView, event_stream
 from apps.forum.views import ForumPostViewSet
 
 router = DefaultRouter()
@@ -50,11 +51,15 @@ urlpatterns = [
 
     # Auth JWT
     path("api/auth/token/", CustomTokenObtainPairView.as_view(), name="token_obtain_pair"),
-    path("api/auth/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("api/auth/refresh/", VersionedTokenRefreshView.as_view(), name="token_refresh"),
     path("api/auth/logout/", LogoutView.as_view(), name="logout"),
     path("api/auth/password_reset/request/", RequestPasswordResetView.as_view(), name="password_reset_request"),
     path("api/auth/password_reset/confirm/", ResetPasswordView.as_view(), name="password_reset_confirm"),
 
     path("api/", include(router.urls)),
     path("api/access-control/stats/", AccessControlStatsView.as_view(), name="access_control_stats"),
+    path("api/access-control/stats/trend/", AccessControlTrendView.as_view(), name="access_control_trend"),
+    path("api/dashboard/summary/", DashboardSummaryView.as_view(), name="dashboard_summary"),
+    path("api/stream/", event_stream, name="event_stream"),
+    path("api/stream/ticket/", StreamTicketView.as_view(), name="event_stream_ticket"),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -27,11 +27,8 @@ export default function Sidebar() {
         if (user) {
             const loadAvatar = async () => {
                 try {
-                    const res = await api.get(`/api/users/?search=${user.username}`);
-                    if (res.data && res.data.length > 0) {
-                        const u = res.data.find(u => u.username === user.username);
-                        if (u && u.avatar) setAvatarUrl(u.avatar);
-                    }
+                    const res = await api.get("/api/users/me/");
+                    if (res.data.avatar) setAvatarUrl(res.data.avatar);
                 } catch (e) { console.error(e); }
             };
             loadAvatar();
@@ -0,0 +1,21 @@
+// Tiny inline trend line for the hourly user rollups (/api/access-control/stats/trend/)
+export default function Sparkline({ values, color = "#3b82f6", width = 80, height = 24 }) {
+    if (!values || values.length < 2) return null;
+    const max = Math.max(...values);
+    const min = Math.min(...values);
+    const span = max - min || 1;
+    const points = values
+        .map((v, i) => `${(i / (values.length - 1)) * width},${height - ((v - min) / span) * (height - 2) - 1}`)
+        .join(" ");
+    const delta = values[values.length - 1] - values[0];
+    return (
+        <span style={{ display: "inline-flex", alignItems: "center", gap: 6 }} title={`Últimas ${values.length} horas`}>
+            <svg width={width} height={height} viewBox={`0 0 ${width} ${height}`}>
+                <polyline points={points} fill="none" stroke={color} strokeWidth="1.5" />
+            </svg>
+            <span style={{ fontSize: "0.75rem", color: "#64748b" }}>
+                {delta > 0 ? `+${delta}` : delta}
+            </span>
+        </span>
+    );
+}
@@ -21,8 +21,44 @@ export function NotificationProvider({ children }) {
     useEffect(() => {
         if (user) {
             checkNotifications();
-            const interval = setInterval(checkNotifications, 15000); // Poll every 15s
-            return () => clearInterval(interval);
+            // Live updates from the event stream; polling stays as a slow fallback
+            let stream = null;
+            let retry = null;
+            let closed = false;
+            let lastEventId = null;
+
+            const connect = async () => {
+                try {
+                    // A fresh short-lived ticket per connection, so the access
+                    // token never ends up in a URL and a refreshed token is used
+                    const res = await api.post("/api/stream/ticket/");
+                    if (closed) return;
+                    const params = new URLSearchParams({ ticket: res.data.ticket });
+                    if (lastEventId) params.set("last_event_id", lastEventId);
+                    stream = new EventSource(`${api.defaults.baseURL}/api/stream/?${params}`);
+                    stream.addEventListener("notification", (event) => {
+                        lastEventId = event.lastEventId;
+                        checkNotifications();
+                    });
+                    stream.onerror = () => {
+                        // The browser would retry with the same, soon expired,
+                        // ticket; reconnect with a new one and catch up
+                        stream.close();
+                        retry = setTimeout(() => connect().then(checkNotifications), 5000);
+                    };
+                } catch (error) {
+                    if (!closed) retry = setTimeout(connect, 30000);
+                }
+            };
+            connect();
+
+            const interval = setInterval(checkNotifications, 60000);
+            return () => {
+                closed = true;
+                if (stream) stream.close();
+                clearTimeout(retry);
+                clearInterval(interval);
+            };
         } else {
             setUnreadCount(0);
         }
@@ -1,6 +1,7 @@
 import { useEffect, useState } from "react";
 import api from "../api/client";
 import { Users, UserCheck, UserX, ShieldAlert, BadgeCheck, Clock, Calendar } from "lucide-react";
+import Sparkline from "../components/Sparkline";
 import "./AccessControl.css";
 
 export default function AccessControl() {
@@ -10,6 +11,7 @@ export default function AccessControl() {
         inactive_users: 0,
         security_alerts: 0
     });
+    const [trend, setTrend] = useState([]);
     const [users, setUsers] = useState([]);
     const [loading, setLoading] = useState(true);
 
@@ -17,12 +19,14 @@ export default function AccessControl() {
         const loadData = async () => {
             try {
                 // Parallel fetch for better performance
-                const [statsRes, usersRes] = await Promise.all([
+                const [statsRes, usersRes, trendRes] = await Promise.all([
                     api.get("/api/access-control/stats/"),
-                    api.get("/api/users/")
+                    api.get("/api/users/"),
+                    api.get("/api/access-control/stats/trend/?hours=24")
                 ]);
                 setStats(statsRes.data);
                 setUsers(usersRes.data);
+                setTrend(trendRes.data.results);
             } catch (error) {
                 console.error("Failed to load access control data", error);
             } finally {
@@ -73,6 +77,7 @@ export default function AccessControl() {
                     <div className="stat-info">
                         <span className="stat-value">{stats.active_users}</span>
                         <span className="stat-label">Activos (24h)</span>
+                        <Sparkline values={trend.map(t => t.active_users)} color="#10b981" />
                     </div>
                 </div>
                 <div className="stat-card stat-gray">
@@ -80,6 +85,7 @@ export default function AccessControl() {
                     <div className="stat-info">
                         <span className="stat-value">{stats.inactive_users}</span>
                         <span className="stat-label">Inactivos</span>
+                        <Sparkline values={trend.map(t => t.inactive_users)} color="#64748b" />
                     </div>
                 </div>
                 <div className="stat-card stat-red">
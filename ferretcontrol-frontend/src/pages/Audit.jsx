@@ -10,21 +10,48 @@ import "./Audit.css";
 
 export default function Audit() {
     const [items, setItems] = useState([]);
+    const [next, setNext] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [search, setSearch] = useState("");
     const [currentPage, setCurrentPage] = useState(1);
     const itemsPerPage = 20;
 
     const load = async (query = "") => {
         try {
-            const url = query ? `/api/audit/?ordering=-timestamp&search=${query}` : "/api/audit/?ordering=-timestamp";
+            const url = query ? `/api/audit/?page_size=500&search=${encodeURIComponent(query)}` : "/api/audit/?page_size=500";
             const res = await api.get(url);
-            setItems(res.data);
+            setItems(res.data.results);
+            setNext(res.data.next);
             setCurrentPage(1);
         } catch (e) { console.error(e); }
     };
 
+    // Older entries: follow the keyset cursor of the last page loaded
+    const loadMore = async () => {
+        if (!next) return;
+        setLoadingMore(true);
+        try {
+            const res = await api.get(next);
+            setItems(prev => [...prev, ...res.data.results]);
+            setNext(res.data.next);
+        } catch (e) { console.error(e); }
+        setLoadingMore(false);
+    };
+
     useEffect(() => { load(); }, []);
 
+    const exportCsv = async () => {
+        try {
+            const url = search ? `/api/audit/export/?type=csv&search=${search}` : "/api/audit/export/?type=csv";
+            const res = await api.get(url, { responseType: "blob" });
+            const link = document.createElement("a");
+            link.href = URL.createObjectURL(res.data);
+            link.download = "auditoria.csv";
+            link.click();
+            URL.revokeObjectURL(link.href);
+        } catch (e) { console.error(e); }
+    };
+
     const handleSearch = (e) => {
         setSearch(e.target.value);
         // Basic client-side search if API doesn't support generic search well yet, 
@@ -94,6 +121,9 @@ export default function Audit() {
                     <button className="btn-add" onClick={() => load(search)} title="Refrescar">
                         <RefreshCw size={18} />
                     </button>
+                    <button className="btn-add" onClick={exportCsv} title="Exportar CSV">
+                        <Download size={18} />
+                    </button>
                 </div>
             </div>
 
@@ -213,6 +243,13 @@ export default function Audit() {
                         </button>
                     </div>
                 )}
+                {next && (
+                    <div style={{ display: "flex", justifyContent: "center", marginTop: 12 }}>
+                        <button className="action-btn" onClick={loadMore} disabled={loadingMore}>
+                            {loadingMore ? "Cargando..." : "Cargar registros anteriores"}
+                        </button>
+                    </div>
+                )}
             </div>
         </div>
     );
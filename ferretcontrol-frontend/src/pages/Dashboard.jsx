@@ -8,17 +8,20 @@ import "./Dashboard.css";
 
 export default function Dashboard() {
     const [assetsCount, setAssetsCount] = useState(0);
-    const [risks, setRisks] = useState([]);
+    const [risksTotal, setRisksTotal] = useState(0);
+    const [risksByLevel, setRisksByLevel] = useState({});
+    const [recentRisks, setRecentRisks] = useState([]);
     const [audit, setAudit] = useState([]);
 
     const load = async () => {
         try {
-            const a = await api.get("/api/assets/");
-            const r = await api.get("/api/risks/?ordering=-created_at");
-            const l = await api.get("/api/audit/?ordering=-timestamp");
-            setAssetsCount(a.data.length);
-            setRisks(r.data); // Keep all for charts
-            setAudit(l.data.slice(0, 5)); // Only 5 for table
+            // Counts and recent items are aggregated server-side
+            const { data } = await api.get("/api/dashboard/summary/?recent=5");
+            setAssetsCount(data.assets.total);
+            setRisksTotal(data.risks.total);
+            setRisksByLevel(data.risks.by_level);
+            setRecentRisks(data.risks.recent);
+            setAudit(data.audit.recent);
         } catch (e) {
             console.error("Dashboard load failed", e);
         }
@@ -30,12 +33,6 @@ export default function Dashboard() {
         return () => clearInterval(t);
     }, []);
 
-    // Process data for charts
-    const risksByLevel = risks.reduce((acc, x) => {
-        acc[x.level] = (acc[x.level] || 0) + 1;
-        return acc;
-    }, {});
-
     const chartData = [
         { name: 'Critical', value: risksByLevel.critical || 0, fill: '#ef4444' },
         { name: 'High', value: risksByLevel.high || 0, fill: '#f97316' },
@@ -49,7 +46,7 @@ export default function Dashboard() {
         { name: 'Tue', risks: 7 },
         { name: 'Wed', risks: 5 },
         { name: 'Thu', risks: 11 },
-        { name: 'Fri', risks: risks.length },
+        { name: 'Fri', risks: risksTotal },
     ];
 
     return (
@@ -67,7 +64,7 @@ export default function Dashboard() {
                 />
                 <Card
                     title="Riesgos Totales"
-                    value={risks.length}
+                    value={risksTotal}
                     icon={<ShieldAlert size={24} color="#d32f2f" />}
                     trend="+5%"
                     trendColor="red"
@@ -130,7 +127,7 @@ export default function Dashboard() {
                     <h3>Últimos Riesgos Registrados</h3>
                     <Table
                         headers={["Activo", "Título", "Nivel", "Score", "Estado"]}
-                        rows={risks.slice(0, 5).map(r => [
+                        rows={recentRisks.map(r => [
                             r.asset_name,
                             r.title,
                             <span className={`badge badge-${r.level}`}>{r.level}</span>,
@@ -26,24 +26,20 @@ export default function Profile() {
 
     const loadProfile = async () => {
         try {
-            const res = await api.get(`/api/users/?search=${authUser.username}`);
-            if (res.data && res.data.length > 0) {
-                const userData = res.data.find(u => u.username === authUser.username);
-                if (userData) {
-                    setUserId(userData.id);
-                    setProfile({
-                        display_name: userData.display_name || "",
-                        bio: userData.bio || "",
-                        social_links: userData.social_links || {},
-                        avatar: userData.avatar,
-                        email: userData.email, // Read only usually
-                        date_joined: userData.date_joined,
-                        is_staff: userData.is_staff
-                    });
-                    if (userData.avatar) {
-                        setPreview(userData.avatar);
-                    }
-                }
+            const res = await api.get("/api/users/me/");
+            const userData = res.data;
+            setUserId(userData.id);
+            setProfile({
+                display_name: userData.display_name || "",
+                bio: userData.bio || "",
+                social_links: userData.social_links || {},
+                avatar: userData.avatar,
+                email: userData.email, // Read only usually
+                date_joined: userData.date_joined,
+                is_staff: userData.is_staff
+            });
+            if (userData.avatar) {
+                setPreview(userData.avatar);
             }
         } catch (error) {
             console.error("Failed to load profile", error);
@@ -8,6 +8,8 @@ import "./SecurityAlerts.css";
 
 export default function SecurityAlerts() {
     const [alerts, setAlerts] = useState([]);
+    const [next, setNext] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [search, setSearch] = useState("");
     const { refreshNotifications } = useNotifications();
     const [currentPage, setCurrentPage] = useState(1);
@@ -15,13 +17,28 @@ export default function SecurityAlerts() {
 
     const loadAlerts = async () => {
         try {
-            const res = await api.get("/api/notifications/?ordering=-created_at");
-            setAlerts(res.data);
+            const res = await api.get("/api/notifications/?page_size=500");
+            setAlerts(res.data.results);
+            setNext(res.data.next);
         } catch (error) {
             console.error("Error loading alerts", error);
         }
     };
 
+    // Older alerts: follow the feed cursor of the last page loaded
+    const loadMore = async () => {
+        if (!next) return;
+        setLoadingMore(true);
+        try {
+            const res = await api.get(next);
+            setAlerts(prev => [...prev, ...res.data.results]);
+            setNext(res.data.next);
+        } catch (error) {
+            console.error("Error loading alerts", error);
+        }
+        setLoadingMore(false);
+    };
+
     useEffect(() => {
         loadAlerts();
     }, []);
@@ -112,8 +129,8 @@ export default function SecurityAlerts() {
             <div className="alerts-summary">
                 <div className="summary-card">
                     <span className="summary-label">Total Notificaciones</span>
-                    <span className="summary-value">{totalAlerts}</span>
-                    <span className="summary-sub">Histórico completo</span>
+                    <span className="summary-value">{totalAlerts}{next ? "+" : ""}</span>
+                    <span className="summary-sub">{next ? "Cargadas hasta ahora" : "Histórico completo"}</span>
                 </div>
                 <div className="summary-card">
                     <span className="summary-label">Nuevas / No Leídas</span>
@@ -224,6 +241,13 @@ export default function SecurityAlerts() {
                         </button>
                     </div>
                 )}
+                {next && (
+                    <div style={{ display: "flex", justifyContent: "center", marginTop: 12 }}>
+                        <button className="action-btn" onClick={loadMore} disabled={loadingMore}>
+                            {loadingMore ? "Cargando..." : "Cargar alertas anteriores"}
+                        </button>
+                    </div>
+                )}
             </div>
         </div>
     );
@@ -1,6 +1,7 @@
 import { useEffect, useState } from "react";
 import api from "../api/client";
 import { Plus, Search, Edit2, User, Shield, Lock, CheckCircle, XCircle, X, ChevronLeft, ChevronRight, Mail, Clock, Calendar } from "lucide-react";
+import Sparkline from "../components/Sparkline";
 import "./Users.css";
 // Reuse generic table/modal styles from Risks/Assets via CSS importing or duplication 
 // (Allocated in Users.css for self-containment)
@@ -8,6 +9,7 @@ import "./Users.css";
 export default function Users({ embedded = false }) {
     const [users, setUsers] = useState([]);
     const [stats, setStats] = useState({ total_users: 0, active_users: 0, inactive_users: 0, security_alerts: 0 });
+    const [trend, setTrend] = useState([]);
     const [search, setSearch] = useState("");
     const [isModalOpen, setIsModalOpen] = useState(false);
 
@@ -26,12 +28,14 @@ export default function Users({ embedded = false }) {
 
     const load = async () => {
         try {
-            const [usersRes, statsRes] = await Promise.all([
+            const [usersRes, statsRes, trendRes] = await Promise.all([
                 api.get("/api/users/"),
-                api.get("/api/access-control/stats/")
+                api.get("/api/access-control/stats/"),
+                api.get("/api/access-control/stats/trend/?hours=24")
             ]);
             setUsers(usersRes.data);
             setStats(statsRes.data);
+            setTrend(trendRes.data.results);
             setCurrentPage(1);
         } catch (error) {
             console.error("Failed to load data", error);
@@ -164,6 +168,7 @@ export default function Users({ embedded = false }) {
                             {stats.active_users}
                         </span>
                         <span className="summary-sub">Usuarios online recientes</span>
+                        <Sparkline values={trend.map(t => t.active_users)} color="#10b981" />
                     </div>
                     <div className="summary-card">
                         <span className="summary-label">Inactivos (Sin Login)</span>
@@ -171,6 +176,7 @@ export default function Users({ embedded = false }) {
                             {stats.inactive_users}
                         </span>
                         <span className="summary-sub">Nunca han accedido</span>
+                        <Sparkline values={trend.map(t => t.inactive_users)} color="#64748b" />
                     </div>
                     <div className="summary-card">
                         <span className="summary-label">Alertas Seguridad</span>